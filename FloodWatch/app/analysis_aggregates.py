@@ -0,0 +1,395 @@
+import numpy as np
+import pandas as pd
+
+# Probability bands used by the analysis endpoints (lower bounds)
+SEVERITY_THRESHOLDS = [0.4, 0.6, 0.8]
+PROBABILITY_BINS = [0, 0.2, 0.4, 0.6, 0.8, 1.0]
+PROBABILITY_LABELS = ['Very Low', 'Low', 'Medium', 'High', 'Critical']
+PRECIP_BINS = [0, 10, 30, 50, 100, float('inf')]
+PRECIP_LABELS = ['No Rain', 'Light', 'Moderate', 'Heavy', 'Extreme']
+RESERVOIR_BINS = [0, 40, 60, 80, 95, 100]
+RESERVOIR_LABELS = ['Low', 'Normal', 'High', 'Very High', 'Critical']
+
+
+def prediction_aggregates(snapshot):
+    """Analysis aggregates of a 7DAY_PREDICTIONS snapshot, built once per version"""
+    return snapshot.derive('analysis', lambda snap: build_prediction_aggregates(snap.frame))
+
+
+def risk_zone_aggregates(snapshot):
+    """Analysis aggregates of a RISK_ZONES snapshot, built once per version"""
+    return snapshot.derive('analysis', lambda snap: build_risk_zone_aggregates(snap.frame))
+
+
+def compare_city_metrics(snapshot, cities, start_date=None, end_date=None):
+    """
+    Comparison metrics for a list of cities from one grouped aggregation.
+
+    Names resolve to the categorical codes of the snapshot's normalized-city
+    index, so only the rows of the requested cities (within the optional
+    inclusive date window) are read. Returns the code of each requested city
+    (-1 when unknown), a code -> position map for cities with rows, and one
+    array per metric.
+    """
+    frame = snapshot.frame
+    index = snapshot.index()
+    codes = [index.city_code(city) for city in cities]
+    requested = sorted({code for code in codes if code >= 0})
+    rows = np.concatenate(
+        [index.city_rows(index.city_keys[code]) for code in requested] or [np.array([], dtype=np.int64)]
+    )
+
+    if start_date is not None or end_date is not None:
+        dates = frame['Date'].to_numpy()[rows]
+        in_window = np.ones(len(rows), dtype=bool)
+        if start_date is not None:
+            in_window &= dates >= start_date
+        if end_date is not None:
+            in_window &= dates <= end_date
+        rows = rows[in_window]
+
+    # One grouped pass: rows are bucketed by city code and reduced with bincount
+    group_codes, groups = np.unique(index.city_codes[rows], return_inverse=True)
+    n = len(group_codes)
+
+    def grouped_mean(column):
+        values = frame[column].to_numpy(dtype=float)[rows]
+        valid = ~np.isnan(values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (np.bincount(groups[valid], weights=values[valid], minlength=n)
+                    / np.bincount(groups[valid], minlength=n))
+
+    peak_probability = np.full(n, np.nan)
+    np.fmax.at(peak_probability, groups, frame['Flood_Probability'].to_numpy(dtype=float)[rows])
+
+    return {
+        'codes': codes,
+        'rows': {int(code): i for i, code in enumerate(group_codes)},
+        'high_risk_days': np.bincount(
+            groups, weights=frame['Predicted_Flood_Risk'].to_numpy()[rows], minlength=n
+        ).astype(np.int64),
+        'total_forecast_days': np.bincount(groups, minlength=n),
+        'average_probability': grouped_mean('Flood_Probability'),
+        'peak_probability': peak_probability,
+        'average_precipitation': grouped_mean('Weather_Precip'),
+        'average_reservoir_fill': grouped_mean('Max_Reservoir_Fill')
+    }
+
+
+def _first_by_count(counts, group_col, value_col, tie_col, tie_ascending=True):
+    """Per group, the value with the highest count (ties broken on tie_col)"""
+    ranked = counts.sort_values(
+        [group_col, 'count', tie_col], ascending=[True, False, tie_ascending], kind='stable'
+    )
+    return ranked.drop_duplicates(group_col).set_index(group_col)[value_col]
+
+
+def build_prediction_aggregates(df):
+    """
+    Payloads for /overview, /trends, /performance-metrics and /weather-impact.
+
+    One groupby per key (City, Date, precipitation x reservoir band) feeds
+    every endpoint; time-dependent fields (generated_at, last_updated) are
+    added by the routes.
+    """
+    total = len(df)
+    risk = df['Predicted_Flood_Risk']
+    probability = df['Flood_Probability']
+    high_risk = risk == 1
+    high_risk_count = int(high_risk.sum())
+
+    by_city = df.groupby('City').agg(
+        High_Risk_Days=('Predicted_Flood_Risk', 'sum'),
+        Total_Days=('Predicted_Flood_Risk', 'count'),
+        Avg_Probability=('Flood_Probability', 'mean'),
+        Risk_Variability=('Flood_Probability', 'std'),
+        Peak_Probability=('Flood_Probability', 'max')
+    )
+    by_date = df.groupby('Date').agg(
+        High_Risk_Cities=('Predicted_Flood_Risk', 'sum'),
+        Total_Cities=('Predicted_Flood_Risk', 'count'),
+        Avg_Probability=('Flood_Probability', 'mean'),
+        Max_Probability=('Flood_Probability', 'max'),
+        Avg_Precipitation=('Weather_Precip', 'mean'),
+        Avg_Reservoir_Fill=('Max_Reservoir_Fill', 'mean'),
+        Rows=('Flood_Probability', 'size')
+    )
+    cities_monitored = len(by_city)
+    forecast_days = len(by_date)
+
+    summary = {
+        'total_predictions': total,
+        'high_risk_predictions': high_risk_count,
+        'high_risk_percentage': round((high_risk_count / total) * 100, 1),
+        'unique_cities': cities_monitored,
+        'forecast_days': forecast_days,
+        'average_flood_probability': round(probability.mean(), 3),
+        'risk_category_distribution': (
+            df['Risk_Category'].value_counts().to_dict() if 'Risk_Category' in df.columns else {}
+        )
+    }
+
+    # Overview
+    heavy_rain = df['Weather_Precip'] > 30
+    reservoir_full = df['Max_Reservoir_Fill'] > 80
+    top_risk_cities = by_city[['High_Risk_Days', 'Avg_Probability']].rename(columns={
+        'High_Risk_Days': 'Predicted_Flood_Risk', 'Avg_Probability': 'Flood_Probability'
+    }).sort_values('Flood_Probability', ascending=False).head(5)
+    overview = {
+        'overview': summary,
+        'insights': {
+            'top_risk_cities': top_risk_cities.reset_index(),
+            'daily_risk_progression': by_date['High_Risk_Cities'].to_dict(),
+            'risk_factor_analysis': {
+                'weather_driven_risks': int((heavy_rain & high_risk).sum()),
+                'reservoir_driven_risks': int((reservoir_full & high_risk).sum()),
+                'combined_factor_risks': int((heavy_rain & reservoir_full & high_risk).sum()),
+                'total_high_risk': high_risk_count
+            }
+        }
+    }
+
+    # Trends
+    daily_trends = by_date.drop(columns='Rows').round(3)
+    city_trends = by_city.round(3)
+    risk_progression = [
+        {
+            'date': date,
+            'day_number': day_number,
+            'high_risk_cities': int(row.High_Risk_Cities),
+            'average_probability': round(row.Avg_Probability, 3),
+            'total_cities': int(row.Rows)
+        }
+        for day_number, (date, row) in enumerate(by_date.iterrows(), start=1)
+    ]
+    trends = {
+        'daily_trends': daily_trends.reset_index(),
+        'city_trends': city_trends.reset_index(),
+        'risk_progression': risk_progression,
+        'trend_insights': {
+            'forecast_period': f"{forecast_days} days",
+            'cities_monitored': cities_monitored,
+            'peak_risk_date': max(risk_progression, key=lambda x: x['high_risk_cities'])['date'],
+            'most_consistent_high_risk_city': city_trends['High_Risk_Days'].idxmax()
+        }
+    }
+
+    # Performance metrics: one binning pass for the severity bands
+    valid_probability = probability.dropna().to_numpy()
+    low, medium, high, critical = np.bincount(
+        np.searchsorted(SEVERITY_THRESHOLDS, valid_probability, side='right'), minlength=4
+    ).tolist()
+    complete_records = int(df.notna().all(axis=1).sum())
+    performance = {
+        'coverage': {
+            'total_predictions': total,
+            'cities_monitored': cities_monitored,
+            'forecast_days': forecast_days,
+            'data_completeness_percent': round((complete_records / total) * 100, 1)
+        },
+        'prediction_distribution': {
+            'high_risk_predictions': high_risk_count,
+            'low_risk_predictions': total - high_risk_count,
+            'high_risk_percentage': round((high_risk_count / total) * 100, 1)
+        },
+        'confidence_metrics': {
+            'average_confidence': round(probability.mean(), 3),
+            'high_confidence_predictions': critical,
+            'high_confidence_percentage': round((critical / total) * 100, 1)
+        },
+        'risk_severity_distribution': {
+            'critical': critical,
+            'high': high,
+            'medium': medium,
+            'low': low
+        }
+    }
+
+    return {
+        'summary': summary,
+        'overview': overview,
+        'trends': trends,
+        'performance': performance,
+        'weather_impact': _weather_impact(df)
+    }
+
+
+def _weather_impact(df):
+    """Flood risk by precipitation band, reservoir band and both, from one grouped pass"""
+    cells = pd.DataFrame({
+        'Precip_Category': pd.cut(df['Weather_Precip'], bins=PRECIP_BINS, labels=PRECIP_LABELS),
+        'Reservoir_Category': pd.cut(df['Max_Reservoir_Fill'], bins=RESERVOIR_BINS, labels=RESERVOIR_LABELS),
+        'Risk': df['Predicted_Flood_Risk'],
+        'Probability': df['Flood_Probability']
+    }).groupby(['Precip_Category', 'Reservoir_Category'], observed=True, dropna=False).agg(
+        risk_sum=('Risk', 'sum'),
+        risk_count=('Risk', 'count'),
+        probability_sum=('Probability', 'sum'),
+        probability_count=('Probability', 'count')
+    )
+
+    def impact(sums):
+        result = pd.DataFrame({
+            'High_Risk_Count': sums['risk_sum'],
+            'Total_Count': sums['risk_count'],
+            'Risk_Rate': sums['risk_sum'] / sums['risk_count'],
+            'Avg_Probability': sums['probability_sum'] / sums['probability_count']
+        })
+        return result[result['Total_Count'] > 0].round(3)
+
+    # Rows outside a band (NaN) count towards the other band's totals only
+    weather_impact = impact(cells.groupby(level='Precip_Category', observed=True).sum())
+    reservoir_impact = impact(cells.groupby(level='Reservoir_Category', observed=True).sum())
+
+    both = cells.reset_index().dropna(subset=['Precip_Category', 'Reservoir_Category'])
+    combined_analysis = pd.DataFrame({
+        'Precip_Category': both['Precip_Category'],
+        'Reservoir_Category': both['Reservoir_Category'],
+        'Predicted_Flood_Risk': both['risk_sum'] / both['risk_count'],
+        'Flood_Probability': both['probability_sum'] / both['probability_count']
+    }).round(3).reset_index(drop=True)
+
+    correlation = df[['Weather_Precip', 'Max_Reservoir_Fill', 'Predicted_Flood_Risk', 'Flood_Probability']].corr()
+    correlations = {
+        'precipitation_vs_flood_risk': correlation.at['Weather_Precip', 'Predicted_Flood_Risk'],
+        'reservoir_vs_flood_risk': correlation.at['Max_Reservoir_Fill', 'Predicted_Flood_Risk'],
+        'precipitation_vs_probability': correlation.at['Weather_Precip', 'Flood_Probability'],
+        'reservoir_vs_probability': correlation.at['Max_Reservoir_Fill', 'Flood_Probability']
+    }
+
+    return {
+        'weather_impact_analysis': {
+            'by_precipitation': weather_impact.reset_index(),
+            'by_reservoir_levels': reservoir_impact.reset_index(),
+            'combined_conditions': combined_analysis
+        },
+        'correlations': {k: round(v, 3) for k, v in correlations.items()},
+        'insights': {
+            'highest_risk_precipitation_category': weather_impact['Risk_Rate'].idxmax(),
+            'highest_risk_reservoir_category': reservoir_impact['Risk_Rate'].idxmax(),
+            'total_predictions_analyzed': len(df)
+        }
+    }
+
+
+def build_risk_zone_aggregates(df):
+    """
+    Payloads for /risk-distribution, /risk-factors and /alert-summary.
+
+    City x Risk_Level x Primary_Risk_Factor counts are taken in one pass and
+    rolled up for the per-city modes and the factor/level cross-table.
+    """
+    cube = df.assign(_position=np.arange(len(df))).groupby(
+        ['City', 'Risk_Level', 'Primary_Risk_Factor'], sort=False, dropna=False
+    ).agg(count=('_position', 'size'), first=('_position', 'min')).reset_index()
+
+    # Most common Risk_Level per city (Series.mode: ties go to the smallest value)
+    level_counts = cube.dropna(subset=['City', 'Risk_Level']).groupby(
+        ['City', 'Risk_Level'], as_index=False
+    )['count'].sum()
+    city_risk_level = _first_by_count(level_counts, 'City', 'Risk_Level', 'Risk_Level')
+
+    # Most common Primary_Risk_Factor per city (value_counts: ties go to the first seen)
+    factor_counts = cube.dropna(subset=['City', 'Primary_Risk_Factor']).groupby(
+        ['City', 'Primary_Risk_Factor'], as_index=False
+    ).agg(count=('count', 'sum'), first=('first', 'min'))
+    geographic_factors = _first_by_count(factor_counts, 'City', 'Primary_Risk_Factor', 'first').to_dict()
+
+    factor_by_risk = cube.dropna(subset=['Primary_Risk_Factor', 'Risk_Level']).groupby(
+        ['Primary_Risk_Factor', 'Risk_Level']
+    )['count'].sum().unstack(fill_value=0)
+
+    city_means = df.groupby('City').agg({
+        'Flood_Probability': 'mean',
+        'Precipitation_mm': 'mean',
+        'Max_Reservoir_Fill_Percent': 'mean'
+    })
+    city_risk_dist = pd.concat(
+        [city_risk_level.reindex(city_means.index).rename('Risk_Level'), city_means], axis=1
+    ).round(3)
+    city_risk_dist.index.name = 'City'
+
+    probability_bins = pd.cut(df['Flood_Probability'], bins=PROBABILITY_BINS, labels=PROBABILITY_LABELS)
+    probability_dist = probability_bins.value_counts().to_dict()
+
+    factor_distribution = df['Primary_Risk_Factor'].value_counts().to_dict()
+    factor_probability = df.groupby('Primary_Risk_Factor').agg({
+        'Flood_Probability': ['mean', 'count', 'std'],
+        'Precipitation_mm': 'mean',
+        'Max_Reservoir_Fill_Percent': 'mean'
+    }).round(3)
+    factor_probability.columns = [
+        'Avg_Probability', 'Count', 'Probability_StdDev',
+        'Avg_Precipitation', 'Avg_Reservoir_Fill'
+    ]
+
+    risk_distribution = {
+        'risk_distribution': {
+            'by_risk_level': df['Risk_Level'].value_counts().to_dict(),
+            'by_alert_level': df['Alert_Level'].value_counts().to_dict(),
+            'by_probability_range': {str(k): int(v) for k, v in probability_dist.items() if pd.notna(k)},
+            'by_primary_factor': factor_distribution
+        },
+        'geographic_distribution': city_risk_dist.reset_index(),
+        'statistics': {
+            'total_zones': len(df),
+            'average_probability': round(df['Flood_Probability'].mean(), 3),
+            'max_probability': round(df['Flood_Probability'].max(), 3),
+            'cities_monitored': df['City'].nunique(),
+            'dates_covered': df['Date'].nunique()
+        }
+    }
+
+    risk_factors = {
+        'risk_factor_analysis': {
+            'distribution': factor_distribution,
+            'by_risk_level': factor_by_risk.to_dict(),
+            'statistics': factor_probability.reset_index(),
+            'geographic_distribution': geographic_factors
+        },
+        'insights': {
+            'most_common_factor': max(factor_distribution.items(), key=lambda x: x[1])[0],
+            'total_risk_zones': len(df),
+            'factors_identified': len(factor_distribution)
+        }
+    }
+
+    return {
+        'risk_distribution': risk_distribution,
+        'risk_factors': risk_factors,
+        'alert_summary': _alert_summary(df)
+    }
+
+
+def _alert_summary(df):
+    """Alerts for the latest forecast date"""
+    latest_date = df['Date'].max()
+    latest_data = df[df['Date'] == latest_date]
+    alert_levels = latest_data['Alert_Level']
+
+    cities_by_alert = {
+        alert_level: latest_data.loc[alert_levels == alert_level, 'City'].tolist()
+        for alert_level in ['RED', 'ORANGE', 'YELLOW', 'GREEN']
+    }
+    priority_cities = latest_data[alert_levels.isin(['RED', 'ORANGE'])].sort_values(
+        'Flood_Probability', ascending=False
+    )[['City', 'Alert_Level', 'Flood_Probability', 'Primary_Risk_Factor']]
+
+    return {
+        'alert_summary': {
+            'alert_date': latest_date,
+            'alert_distribution': alert_levels.value_counts().to_dict(),
+            'cities_by_alert_level': cities_by_alert,
+            'priority_cities': priority_cities
+        },
+        'risk_analysis': {
+            'risk_factors_by_alert': latest_data.groupby('Alert_Level')['Primary_Risk_Factor'].value_counts().to_dict(),
+            'total_cities_monitored': len(latest_data),
+            'cities_requiring_immediate_attention': len(priority_cities)
+        },
+        'recommendations': {
+            'immediate_action_required': len(cities_by_alert['RED']) > 0,
+            'monitoring_required': len(cities_by_alert['ORANGE']) > 0,
+            'total_alerts_active': int((alert_levels != 'GREEN').sum())
+        }
+    }
@@ -7,7 +7,11 @@ import os
 from forecast_routes import forecast_bp
 from data_routes import data_bp
 from analysis_routes import analysis_bp
+from batch_routes import batch_bp
+from tile_routes import tiles_bp
 from data_loader import DataLoader
+from compression import init_compression
+from projection import init_projection
 
 # Get the directory where this script is located
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -22,6 +26,14 @@ def create_app():
     # Register blueprints
     app.register_blueprint(forecast_bp, url_prefix='/api/forecast')
     app.register_blueprint(data_bp, url_prefix='/api/data')
+    app.register_blueprint(analysis_bp, url_prefix='/api/analysis')
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')
+    app.register_blueprint(tiles_bp, url_prefix='/api/tiles')
+    
+    # gzip/brotli responses negotiated from Accept-Encoding
+    init_compression(app)
+    # Registered last so it runs before compression
+    init_projection(app)
     
     @app.route('/')
     def index():
@@ -39,7 +51,24 @@ def create_app():
                 'data': [
                     '/api/data/cities',
                     '/api/data/risk-zones',
-                    '/api/data/plotting'
+                    '/api/data/plotting',
+                    '/api/data/nearby',
+                    '/api/data/clusters'
+                ],
+                'analysis': [
+                    '/api/analysis/overview',
+                    '/api/analysis/trends',
+                    '/api/analysis/risk-distribution',
+                    '/api/analysis/risk-factors',
+                    '/api/analysis/weather-impact',
+                    '/api/analysis/performance-metrics',
+                    '/api/analysis/alert-summary'
+                ],
+                'batch': [
+                    '/api/batch (POST)'
+                ],
+                'tiles': [
+                    '/api/tiles/<z>/<x>/<y>.mvt'
                 ],
             },
             'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -55,6 +84,7 @@ def create_app():
             'message': 'Enhanced Maharashtra FloodML API is running',
             'version': '3.0.0',
             'data_files': data_status,
+            'data_run': app.data_loader.current().run_id,
             'features': [
                 '7-day flood forecasting',
                 'Real-time risk assessment',
@@ -0,0 +1,163 @@
+"""
+ASGI entry point for the FloodWatch API.
+
+Serves the same Flask app (all blueprints) from an asyncio event loop:
+sockets, request bodies and response writes are handled by the loop, and
+only the view itself runs on a bounded thread pool. A slow or idle client
+therefore costs a coroutine, not a worker thread, and at most
+Config.ASYNC_WORKER_THREADS views run at once. Requests beyond
+Config.ASYNC_MAX_QUEUED waiting for a thread are answered 503 straight away.
+
+    uvicorn asgi:create_asgi_app --factory --host 0.0.0.0 --port 5000
+    python asgi.py                                  # same, HOST/PORT from the environment
+
+Importing this module does not build the app (and load the data); uvicorn
+calls create_asgi_app() once per worker.
+"""
+import asyncio
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from config import Config
+
+OVERLOADED_BODY = b'{"error": "Server busy, please retry"}'
+
+
+class AsyncFloodWatchApp:
+    """ASGI 3 application running a WSGI app's views on a bounded thread pool"""
+
+    def __init__(self, wsgi_app, max_threads=None, max_queued=None):
+        self.wsgi_app = wsgi_app
+        self.max_threads = max_threads or Config.ASYNC_WORKER_THREADS
+        self.max_queued = Config.ASYNC_MAX_QUEUED if max_queued is None else max_queued
+        self.executor = ThreadPoolExecutor(self.max_threads, thread_name_prefix='floodwatch-view')
+        # Requests running or waiting for a thread (only touched on the event loop)
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._http(scope, receive, send)
+        else:
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Load the snapshot set before the first request arrives
+                data_loader = getattr(self.wsgi_app, 'data_loader', None)
+                if data_loader is not None:
+                    await asyncio.get_running_loop().run_in_executor(self.executor, data_loader.current)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _http(self, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body', False):
+                break
+
+        if self.in_flight >= self.max_threads + self.max_queued:
+            await self._send(send, '503 SERVICE UNAVAILABLE',
+                             [('Content-Type', 'application/json'), ('Retry-After', '1')],
+                             OVERLOADED_BODY)
+            return
+
+        self.in_flight += 1
+        try:
+            status, headers, chunks = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._run_wsgi, build_environ(scope, bytes(body))
+            )
+        finally:
+            self.in_flight -= 1
+        await self._send(send, status, headers, b''.join(chunks))
+
+    @staticmethod
+    async def _send(send, status, headers, body):
+        await send({
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    def _run_wsgi(self, environ):
+        """Call the WSGI app and collect its whole response (runs on the pool)"""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = headers
+            return chunks.append
+
+        chunks = []
+        result = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                if chunk:
+                    chunks.append(chunk)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return response['status'], response['headers'], chunks
+
+
+def build_environ(scope, body):
+    """WSGI environ for an ASGI http scope"""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    client = scope.get('client')
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0] if client else '',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'CONTENT_LENGTH': str(len(body)),
+    }
+    for raw_name, raw_value in scope.get('headers', []):
+        name = raw_name.decode('latin-1').upper().replace('-', '_')
+        value = raw_value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+            continue
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+def create_asgi_app():
+    from app import create_app
+    return AsyncFloodWatchApp(create_app())
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    host = os.environ.get('HOST', '0.0.0.0')
+    port = int(os.environ.get('PORT', '5000'))
+    app = create_asgi_app()
+    print(f"Starting async server at http://{host}:{port} ({app.max_threads} view threads, uvicorn)")
+    uvicorn.run(app, host=host, port=port, log_level='warning')
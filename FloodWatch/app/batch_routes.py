@@ -0,0 +1,165 @@
+from flask import Blueprint, jsonify, request, current_app
+from config import Config
+from forecast_routes import (
+    build_city_forecast_payload, build_date_forecast_payload,
+    build_daily_summary_payload, build_city_summary_payload, segment_summaries
+)
+from json_encoding import json_response
+from projection import parse_fields, parse_fields_arg
+import numpy as np
+
+batch_bp = Blueprint('batch', __name__)
+
+# Sub-query types, mapped to the data files they read
+QUERY_TYPES = {
+    'city_forecast': ('7DAY_PREDICTIONS',),
+    'date_forecast': ('7DAY_PREDICTIONS',),
+    'coordinates': ('CITIES', '7DAY_PREDICTIONS'),
+    'daily_summary': ('DAILY_SUMMARY',),
+    'city_summary': ('CITY_SUMMARY',),
+    'summary': ('7DAY_PREDICTIONS',)
+}
+
+# Parameter each sub-query type requires
+REQUIRED_PARAMS = {
+    'city_forecast': 'city',
+    'date_forecast': 'date',
+    'coordinates': 'city'
+}
+
+
+class BatchError(ValueError):
+    """Malformed batch request body (answered with 400)"""
+
+
+def parse_batch_queries(body):
+    """Validate the request body and return its list of sub-queries"""
+    if not isinstance(body, dict) or not isinstance(body.get('queries'), list):
+        raise BatchError("Request body must be a JSON object with a 'queries' list")
+    queries = body['queries']
+    if not queries:
+        raise BatchError("'queries' must not be empty")
+    if len(queries) > Config.MAX_BATCH_QUERIES:
+        raise BatchError(f"At most {Config.MAX_BATCH_QUERIES} queries per batch")
+    fields = body.get('fields')
+    if fields is not None and not isinstance(fields, str) and not (
+            isinstance(fields, list) and all(isinstance(name, str) for name in fields)):
+        raise BatchError("'fields' must be a comma-separated string or a list of column names")
+
+    for i, query in enumerate(queries):
+        if not isinstance(query, dict) or query.get('type') not in QUERY_TYPES:
+            raise BatchError(f"queries[{i}]: 'type' must be one of {', '.join(QUERY_TYPES)}")
+        param = REQUIRED_PARAMS.get(query['type'])
+        if param is not None and not isinstance(query.get(param), str):
+            raise BatchError(f"queries[{i}]: '{param}' is required for {query['type']}")
+    return queries
+
+
+def resolve_forecasts(predictions, keys, lookup, build_payload):
+    """Payload per distinct city/date key (None when it has no rows).
+
+    Row positions of every key are gathered into one take from the snapshot
+    and the per-key summaries come from one segmented reduction over it.
+    """
+    rows = {key: lookup(key) for key in keys}
+    found = [key for key in rows if len(rows[key]) > 0]
+    payloads = dict.fromkeys(rows)
+    if not found:
+        return payloads
+
+    bounds = np.concatenate(([0], np.cumsum([len(rows[key]) for key in found])))
+    frame = predictions.frame.iloc[np.concatenate([rows[key] for key in found])]
+    summaries = segment_summaries(frame, bounds)
+    for i, key in enumerate(found):
+        payloads[key] = build_payload(key, frame.iloc[bounds[i]:bounds[i + 1]], summaries, i)
+    return payloads
+
+
+@batch_bp.route('', methods=['POST'])
+def run_batch():
+    """Resolve several forecast, coordinate and summary queries in one round trip.
+
+    Body: {"queries": [{"type": "city_forecast", "city": "Pune"},
+                       {"type": "date_forecast", "date": "2025-08-21"},
+                       {"type": "coordinates", "city": "Pune"},
+                       {"type": "daily_summary"}, {"type": "city_summary"},
+                       {"type": "summary"}, ...],
+           "fields": "City,Date,Flood_Probability"}   (optional)
+
+    Every query is answered from the same data version. Results come back
+    in request order, each with the payload of the matching single endpoint
+    or its 404 error; an optional "id" on a query is echoed back.
+    """
+    try:
+        body = request.get_json(silent=True)
+        queries = parse_batch_queries(body)
+        fields = parse_fields(body.get('fields')) or parse_fields_arg()
+
+        data_loader = current_app.data_loader
+        predictions = data_loader.snapshot('7DAY_PREDICTIONS')
+        types = {query['type'] for query in queries}
+
+        city_forecasts = date_forecasts = {}
+        if predictions is not None:
+            index = predictions.index()
+            if 'city_forecast' in types:
+                city_forecasts = resolve_forecasts(
+                    predictions, {q['city'] for q in queries if q['type'] == 'city_forecast'},
+                    index.city_rows, build_city_forecast_payload
+                )
+            if 'date_forecast' in types:
+                date_forecasts = resolve_forecasts(
+                    predictions, {q['date'] for q in queries if q['type'] == 'date_forecast'},
+                    index.date_rows, build_date_forecast_payload
+                )
+
+        daily_summary = data_loader.snapshot('DAILY_SUMMARY') if 'daily_summary' in types else None
+        city_summary = data_loader.snapshot('CITY_SUMMARY') if 'city_summary' in types else None
+
+        results = []
+        for query in queries:
+            query_type = query['type']
+            data = error = None
+            if query_type == 'city_forecast':
+                data = city_forecasts.get(query['city'])
+                error = f"No forecast data available for {query['city']}"
+            elif query_type == 'date_forecast':
+                data = date_forecasts.get(query['date'])
+                error = f"No forecast data available for {query['date']}"
+            elif query_type == 'coordinates':
+                lat, lon = data_loader.get_city_coordinates(query['city'])
+                if lat is not None and lon is not None:
+                    data = {'city': query['city'], 'coordinates': {'latitude': lat, 'longitude': lon}}
+                error = f"Coordinates not found for {query['city']}"
+            elif query_type == 'daily_summary':
+                if daily_summary is not None:
+                    data = build_daily_summary_payload(daily_summary.frame)
+                error = 'No daily summary available'
+            elif query_type == 'city_summary':
+                if city_summary is not None:
+                    data = build_city_summary_payload(city_summary.frame)
+                error = 'No city summary available'
+            elif query_type == 'summary':
+                data = data_loader.get_summary_stats()
+                error = 'No prediction data available'
+
+            result = {'type': query_type}
+            if 'id' in query:
+                result['id'] = query['id']
+            if data is not None:
+                result.update(status=200, data=data)
+            else:
+                result.update(status=404, error=error)
+            results.append(result)
+
+        data_keys = sorted({key for query_type in types for key in QUERY_TYPES[query_type]})
+        return json_response({
+            'data_version': data_loader.data_version(data_keys),
+            'count': len(results),
+            'results': results
+        }, fields=fields)
+
+    except BatchError as e:
+        return jsonify({'error': Config.ERROR_MESSAGES['INVALID_PARAMETERS'], 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,189 @@
+"""
+Hierarchical point clustering of risk-zone locations (supercluster-style).
+
+The tree is built once per risk-zones snapshot and date. Locations start
+as points above Config.CLUSTER_MAX_ZOOM. Going down one zoom at a time,
+every element not yet merged at that zoom takes all unmerged neighbours
+within Config.CLUSTER_RADIUS_PX screen pixels (one KD-tree query per level
+for all elements) and they become one cluster at their count-weighted
+centre. An element without neighbours is carried to the next level as it
+is, keeping its id. Each cluster aggregates the max/mean flood
+probability, the RED/ORANGE alert counts and the worst risk category and
+alert level of its locations.
+
+A map view then only reads the level of its zoom: elements are sorted by
+x so a bbox costs a binary search plus the elements inside it, and the
+payload stays about the same size however many locations there are.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+from config import Config
+from vector_tiles import ALERT_LEVELS, RISK_LEVELS, location_summaries, mercator
+
+# Aggregates carried by every element, summed or maxed when elements merge
+_SUMMED = ('count', 'probability_sum', 'probability_count', 'red_alerts', 'orange_alerts')
+_MAXED = ('max_probability', 'alert_rank', 'risk_rank')
+
+
+def inverse_mercator(x, y):
+    """(lat, lon) in degrees for normalised Web Mercator coordinates"""
+    lon = np.asarray(x, dtype=float) * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(y, dtype=float)))))
+    return lat, lon
+
+
+class ClusterTree:
+    """Cluster levels for zooms CLUSTER_MIN_ZOOM..CLUSTER_MAX_ZOOM + 1 (the raw locations)"""
+
+    def __init__(self, snapshot, date=None):
+        s = location_summaries(snapshot, date)
+        self.cities = s['city']
+        x, y = mercator(s['latitude'], s['longitude'])
+        n = len(x)
+        leaves = {
+            'x': x, 'y': y,
+            'id': np.arange(n, dtype=np.int64),
+            'location': np.arange(n, dtype=np.int64),
+            'count': np.ones(n, dtype=np.int64),
+            'probability_sum': s['probability_sum'],
+            'probability_count': s['probability_count'],
+            'max_probability': s['max_probability'],
+            'red_alerts': s['red_days'],
+            'orange_alerts': s['orange_days'],
+            'alert_rank': s['alert_rank'],
+            'risk_rank': s['risk_rank']
+        }
+
+        self.min_zoom = Config.CLUSTER_MIN_ZOOM
+        self.max_zoom = Config.CLUSTER_MAX_ZOOM
+        # Zoom at which each cluster id was formed (it splits one zoom deeper)
+        self.formed_at = {}
+        self._next_id = n
+        self.levels = {self.max_zoom + 1: leaves}
+        for zoom in range(self.max_zoom, self.min_zoom - 1, -1):
+            self.levels[zoom] = self._merge(self.levels[zoom + 1], zoom)
+        for level in self.levels.values():
+            order = np.argsort(level['x'], kind='stable')
+            for name in list(level):
+                level[name] = level[name][order]
+
+    def _merge(self, level, zoom):
+        """Cluster the elements of the level above into the level for zoom"""
+        n = len(level['x'])
+        level['parent'] = np.full(n, -1, dtype=np.int64)
+        if n == 0:
+            return {name: values[:0] for name, values in level.items() if name != 'parent'}
+
+        radius = Config.CLUSTER_RADIUS_PX / (256.0 * (1 << zoom))
+        points = np.column_stack((level['x'], level['y']))
+        neighbours = cKDTree(points).query_ball_point(points, radius)
+
+        group = np.full(n, -1, dtype=np.int64)
+        groups = 0
+        for i in range(n):
+            if group[i] >= 0:
+                continue
+            members = [j for j in neighbours[i] if group[j] < 0]
+            group[members] = groups
+            groups += 1
+
+        sizes = np.bincount(group, minlength=groups)
+        merged = {
+            name: np.bincount(group, weights=level[name], minlength=groups).astype(level[name].dtype)
+            for name in _SUMMED
+        }
+        for name in _MAXED:
+            values = np.full(groups, np.nan if name == 'max_probability' else -1, dtype=level[name].dtype)
+            (np.fmax if name == 'max_probability' else np.maximum).at(values, group, level[name])
+            merged[name] = values
+        weights = level['count'].astype(float)
+        merged['x'] = np.bincount(group, weights=level['x'] * weights, minlength=groups) / merged['count']
+        merged['y'] = np.bincount(group, weights=level['y'] * weights, minlength=groups) / merged['count']
+
+        # Singletons keep their id, location and exact position; groups get a new cluster id
+        first = np.full(groups, n, dtype=np.int64)
+        np.minimum.at(first, group, np.arange(n))
+        single = sizes == 1
+        ids = np.empty(groups, dtype=np.int64)
+        ids[single] = level['id'][first[single]]
+        new_ids = np.arange(self._next_id, self._next_id + (~single).sum(), dtype=np.int64)
+        ids[~single] = new_ids
+        self._next_id += len(new_ids)
+        self.formed_at.update(dict.fromkeys(new_ids.tolist(), zoom))
+        merged['x'][single] = level['x'][first[single]]
+        merged['y'][single] = level['y'][first[single]]
+        merged['id'] = ids
+        merged['location'] = np.where(single, level['location'][first], -1)
+
+        level['parent'] = np.where(single[group], -1, ids[group])
+        return merged
+
+    def _level_for(self, zoom):
+        return self.levels[min(max(zoom, self.min_zoom), self.max_zoom + 1)]
+
+    def query(self, zoom, bbox=None):
+        """Elements of the zoom level inside an optional (west, south, east, north) box"""
+        level = self._level_for(zoom)
+        if bbox is None:
+            return self._describe(level, np.arange(len(level['x'])))
+
+        west, south, east, north = bbox
+        x_ranges = ([((west + 180) / 360, (east + 180) / 360)] if west <= east else
+                    [((west + 180) / 360, 1.0), (0.0, (east + 180) / 360)])
+        max_y, min_y = mercator([south, north], [0, 0])[1]
+        selected = []
+        for x_min, x_max in x_ranges:
+            rows = np.arange(np.searchsorted(level['x'], x_min, side='left'),
+                             np.searchsorted(level['x'], x_max, side='right'))
+            selected.append(rows[(level['y'][rows] >= min_y) & (level['y'][rows] <= max_y)])
+        return self._describe(level, np.unique(np.concatenate(selected)))
+
+    def children(self, cluster_id):
+        """Elements one zoom below where a cluster formed, or None for an unknown id"""
+        zoom = self.formed_at.get(cluster_id)
+        if zoom is None:
+            return None
+        level = self.levels[zoom + 1]
+        return self._describe(level, np.flatnonzero(level['parent'] == cluster_id))
+
+    def _describe(self, level, rows):
+        lat, lon = inverse_mercator(level['x'][rows], level['y'][rows])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = level['probability_sum'][rows] / level['probability_count'][rows]
+
+        elements = []
+        for i, row in enumerate(rows):
+            location = level['location'][row]
+            element = {
+                'id': int(level['id'][row]),
+                'cluster': bool(location < 0),
+                'latitude': round(float(lat[i]), 5),
+                'longitude': round(float(lon[i]), 5),
+                'city_count': int(level['count'][row]),
+                'max_probability': _rounded(level['max_probability'][row]),
+                'mean_probability': _rounded(mean[i]),
+                'red_alerts': int(level['red_alerts'][row]),
+                'orange_alerts': int(level['orange_alerts'][row]),
+                'worst_risk_category': _label(RISK_LEVELS, level['risk_rank'][row]),
+                'worst_alert_level': _label(ALERT_LEVELS, level['alert_rank'][row])
+            }
+            if location < 0:
+                element['expansion_zoom'] = self.formed_at[element['id']] + 1
+            else:
+                element['city'] = self.cities[location]
+            elements.append(element)
+        return elements
+
+
+def _rounded(value):
+    return None if np.isnan(value) else round(float(value), 3)
+
+
+def _label(levels, rank):
+    return levels[rank] if rank >= 0 else None
+
+
+def risk_zone_clusters(snapshot, date=None):
+    """ClusterTree of a risk-zones snapshot for a date (or all dates), built once per snapshot"""
+    return snapshot.derive(f"clusters:{date or ''}", lambda snap: ClusterTree(snap, date))
@@ -0,0 +1,128 @@
+import json
+
+import numpy as np
+import pandas as pd
+from flask import after_this_request, current_app, request
+
+from json_encoding import format_datetimes, encode_json
+from projection import project_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # Arrow output is optional
+    pa = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack output is optional
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+MSGPACK_MIMETYPE = 'application/msgpack'
+# Older spelling still sent by many msgpack clients
+MSGPACK_LEGACY_MIMETYPE = 'application/x-msgpack'
+
+# Columnar formats that can be produced here, by response mimetype
+COLUMNAR_MIMETYPES = tuple(
+    mimetype for mimetype, module in (
+        (ARROW_STREAM_MIMETYPE, pa), (MSGPACK_MIMETYPE, msgpack)
+    ) if module is not None
+)
+
+# ETag suffix per columnar representation (see http_cache.conditional_get)
+FORMAT_ETAG_SUFFIXES = {ARROW_STREAM_MIMETYPE: 'arrow', MSGPACK_MIMETYPE: 'msgpack'}
+
+# Key under which the response envelope is stored in the Arrow schema metadata
+ARROW_METADATA_KEY = b'floodwatch'
+
+
+def negotiate_format():
+    """Columnar mimetype the client prefers over JSON, or None to serve JSON.
+
+    JSON wins ties (e.g. Accept: */*), so only clients that explicitly ask
+    for Arrow or MessagePack get them. Responses are marked Vary: Accept.
+    """
+    @after_this_request
+    def add_vary(response):
+        response.vary.add('Accept')
+        return response
+
+    offered = (JSON_MIMETYPE,) + COLUMNAR_MIMETYPES
+    if msgpack is not None:
+        offered += (MSGPACK_LEGACY_MIMETYPE,)
+    best = request.accept_mimetypes.best_match(offered, default=JSON_MIMETYPE)
+    if best == JSON_MIMETYPE:
+        return None
+    return MSGPACK_MIMETYPE if best == MSGPACK_LEGACY_MIMETYPE else best
+
+
+def _dictionary_encode_strings(table):
+    """Dictionary-encode string columns whose values repeat (City, Date, labels)"""
+    columns = []
+    for field, column in zip(table.schema, table.columns):
+        if pa.types.is_string(field.type) or pa.types.is_large_string(field.type):
+            if pc.count_distinct(column).as_py() * 2 <= len(column):
+                column = column.dictionary_encode()
+        columns.append(column)
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+
+def frame_to_arrow(df, metadata=None):
+    """Serialize a DataFrame as an Arrow IPC stream (one record batch)"""
+    table = _dictionary_encode_strings(pa.Table.from_pandas(df, preserve_index=False))
+    if metadata is not None:
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}), ARROW_METADATA_KEY: encode_json(metadata)
+        })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _column_values(values):
+    """One column as a flat list; NaN/NaT become None"""
+    if values.dtype.kind in 'iub':
+        return values.tolist()
+    missing = pd.isna(values)
+    if not missing.any():
+        return values.tolist()
+    return np.where(missing, None, values).tolist()
+
+
+def frame_to_msgpack(df, envelope, table_key):
+    """Serialize the envelope with df stored column-wise under table_key.
+
+    The table is {'columns': [names], 'data': {name: [values]}}; columns are
+    converted with ndarray.tolist() rather than row by row.
+    """
+    df = format_datetimes(df)
+    table = {
+        'columns': [str(col) for col in df.columns],
+        'data': {str(col): _column_values(df[col].to_numpy()) for col in df.columns}
+    }
+    # Envelope values (summaries, filters) go through the JSON encoder so
+    # numpy scalars and NaN are handled the same way as in JSON responses
+    document = json.loads(encode_json(envelope)) if envelope else {}
+    document[table_key] = table
+    return msgpack.packb(document, use_bin_type=True)
+
+
+def columnar_response(payload, table_key, table, mimetype, fields=None):
+    """Respond with the rows of table in a columnar format.
+
+    payload is the JSON response payload; its table_key entry is replaced by
+    the table. For Arrow the rest of the payload travels as JSON in the
+    schema metadata under b'floodwatch'; for MessagePack it is the
+    surrounding map.
+    """
+    envelope = {key: value for key, value in payload.items() if key != table_key}
+    table = project_columns(table, fields)
+
+    if mimetype == ARROW_STREAM_MIMETYPE:
+        body = frame_to_arrow(table, envelope)
+    else:
+        body = frame_to_msgpack(table, envelope, table_key)
+    return current_app.response_class(body, mimetype=mimetype)
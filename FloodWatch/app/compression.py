@@ -0,0 +1,110 @@
+import gzip
+import threading
+
+from flask import request
+
+from config import Config
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Content-Encoding tokens we can produce, in order of preference
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+# Response types worth compressing (JSON/text, the columnar formats and vector
+# tiles); images etc. are left alone
+COMPRESSIBLE_MIMETYPES = (
+    'application/json', 'text/', 'application/vnd.apache.arrow.stream', 'application/msgpack',
+    'application/vnd.mapbox-vector-tile'
+)
+
+
+def compress(body, encoding, level):
+    """Compress bytes with the given Content-Encoding"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    if encoding == 'gzip':
+        # mtime=0 keeps the output (and its length) deterministic
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def negotiate_encoding():
+    """Best supported encoding from Accept-Encoding, or None for identity"""
+    accept = request.accept_encodings
+    best, best_quality = None, 0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = accept[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(response):
+    mimetype = response.mimetype or ''
+    return any(mimetype.startswith(prefix) for prefix in COMPRESSIBLE_MIMETYPES)
+
+
+class EncodedDocument:
+    """JSON body plus its compressed variants, created once and then reused.
+
+    Variants are built lazily at the static (highest) levels the first time
+    a client asks for that encoding, and live as long as the document does,
+    i.e. for one data version when stored through DataLoader.derive.
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding):
+        """(body, encoding) to send for the negotiated encoding"""
+        if encoding is None or len(self.body) < Config.COMPRESSION_MIN_SIZE:
+            return self.body, None
+        data = self._variants.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._variants.get(encoding)
+                if data is None:
+                    data = compress(self.body, encoding, Config.STATIC_COMPRESSION_LEVELS[encoding])
+                    self._variants[encoding] = data
+        return data, encoding
+
+
+def _tag_representation(response, encoding):
+    """Mark a response so caches keep one entry per negotiated encoding"""
+    response.vary.add('Accept-Encoding')
+    etag, weak = response.get_etag()
+    if encoding and etag and not etag.endswith(f"-{encoding}"):
+        response.set_etag(f"{etag}-{encoding}", weak)
+
+
+def compress_response(response):
+    """after_request hook: gzip/brotli-encode JSON responses on the fly.
+
+    Responses that already carry a Content-Encoding (precompressed cached
+    documents) only get their ETag/Vary adjusted. Bodies smaller than
+    Config.COMPRESSION_MIN_SIZE are sent as is.
+    """
+    if response.status_code != 200 or response.direct_passthrough or not is_compressible(response):
+        return response
+
+    negotiated = negotiate_encoding()
+    if response.headers.get('Content-Encoding') is None and negotiated is not None:
+        body = response.get_data()
+        if len(body) >= Config.COMPRESSION_MIN_SIZE:
+            response.set_data(compress(body, negotiated, Config.DYNAMIC_COMPRESSION_LEVELS[negotiated]))
+            response.headers['Content-Encoding'] = negotiated
+
+    # The ETag names the negotiated encoding even when a small body is sent
+    # as is, so http_cache.conditional_get can tell which tag a client holds
+    _tag_representation(response, negotiated)
+    return response
+
+
+def init_compression(app):
+    """Enable Accept-Encoding negotiated response compression on an app"""
+    app.after_request(compress_response)
@@ -25,9 +25,60 @@ class Config:
     # Response settings
     MAX_RECORDS_PER_REQUEST = 1000
     DEFAULT_PAGINATION_SIZE = 50
+    # Sub-queries accepted by one POST /api/batch
+    MAX_BATCH_QUERIES = 200
+    # Cities returned by /api/data/nearby when neither limit nor radius_km is given
+    DEFAULT_NEARBY_LIMIT = 10
     
-    # Cache settings (if implementing caching later)
+    # Cache settings
     CACHE_TIMEOUT = timedelta(minutes=30)
+    # How often enhanced_forecast.py / enhanced_plotting.py are expected to run.
+    # HTTP max-age counts down to the next expected run after the data files' mtime.
+    FORECAST_RUN_INTERVAL = timedelta(
+        hours=float(os.environ.get('FORECAST_RUN_INTERVAL_HOURS', '24'))
+    )
+    
+    # Opt-in: parsed data files are published once to this directory (default:
+    # a per-data-dir folder under /dev/shm, left in place across restarts) and
+    # memory-mapped by every worker, which then shares the numeric columns
+    SHARED_SNAPSHOTS = os.environ.get('FLOODWATCH_SHARED_SNAPSHOTS', '0').lower() in ('true', '1', 'yes')
+    SHARED_SNAPSHOT_DIR = os.environ.get('FLOODWATCH_SNAPSHOT_DIR')
+    
+    # Pipeline runs are written to data/runs/<run id>/ and published by
+    # renaming data/CURRENT. A background thread checks the pointer (and, for
+    # files written straight to data/, their mtime/size) every
+    # SNAPSHOT_RELOAD_INTERVAL seconds and swaps in the new snapshot set;
+    # 0 disables the thread (DataLoader.reload() must then be called).
+    RUNS_DIR = 'data/runs'
+    CURRENT_RUN_POINTER = 'data/CURRENT'
+    SNAPSHOT_RELOAD_INTERVAL = float(os.environ.get('FLOODWATCH_RELOAD_INTERVAL', '2'))
+    
+    # Compression settings (gzip always; brotli when the brotli package is installed).
+    # Cached documents are compressed once per data version at the static levels;
+    # other responses of at least COMPRESSION_MIN_SIZE bytes at the dynamic levels.
+    COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+    STATIC_COMPRESSION_LEVELS = {'br': 11, 'gzip': 9}
+    DYNAMIC_COMPRESSION_LEVELS = {'br': 4, 'gzip': 6}
+    
+    # Async serving mode (asgi.py): views run on at most ASYNC_WORKER_THREADS
+    # threads; requests beyond ASYNC_MAX_QUEUED waiting for one get a 503
+    ASYNC_WORKER_THREADS = int(os.environ.get('FLOODWATCH_ASYNC_THREADS', '8'))
+    ASYNC_MAX_QUEUED = int(os.environ.get('FLOODWATCH_ASYNC_MAX_QUEUED', '2048'))
+    
+    # Vector tiles (/api/tiles/<z>/<x>/<y>): locations sharing a TILE_CLUSTER_PX
+    # screen-pixel grid cell at a zoom are merged into one point. Up to
+    # TILE_CACHE_SIZE encoded tiles are kept per snapshot and date.
+    TILE_MAX_ZOOM = 16
+    TILE_EXTENT = 4096
+    TILE_BUFFER = 64  # in TILE_EXTENT units, so markers on a tile edge are not clipped
+    TILE_CLUSTER_PX = 16
+    TILE_CACHE_SIZE = int(os.environ.get('FLOODWATCH_TILE_CACHE_SIZE', '4096'))
+    
+    # Map clusters (/api/data/clusters): elements within CLUSTER_RADIUS_PX screen
+    # pixels (256-px tiles) merge, from CLUSTER_MAX_ZOOM down to CLUSTER_MIN_ZOOM
+    CLUSTER_RADIUS_PX = 40
+    CLUSTER_MIN_ZOOM = 0
+    CLUSTER_MAX_ZOOM = 16
     
     # CORS settings
     CORS_ORIGINS = ['*']  # Configure as needed for production
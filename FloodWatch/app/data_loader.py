@@ -1,8 +1,218 @@
 import pandas as pd
-import csv
 import os
+import threading
+import time
 from datetime import datetime
 import numpy as np
+from flask import g, has_request_context
+
+from config import Config
+from analysis_aggregates import prediction_aggregates
+from shared_snapshots import SHARED_SNAPSHOTS_AVAILABLE, SharedSnapshotStore, default_snapshot_dir
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet artifacts are optional; CSV is always readable
+    pq = None
+
+# Column dtypes for the CSVs produced by enhanced_forecast.py / enhanced_plotting.py.
+# Text columns (City, Date, categories) are left to pandas so dates stay as the
+# 'YYYY-MM-DD' strings the routes compare against.
+FRAME_DTYPES = {
+    '7DAY_PREDICTIONS': {
+        'Latitude': 'float64', 'Longitude': 'float64',
+        'Predicted_Flood_Risk': 'int64', 'Flood_Probability': 'float64',
+        'Weather_Precip': 'float64', 'Max_Reservoir_Fill': 'float64'
+    },
+    'FINAL_PLOT': {
+        'Latitude': 'float64', 'Longitude': 'float64',
+        'Precipitation': 'float64', 'Max_Reservoir_Fill': 'float64',
+        'Flood_Risk': 'int64', 'Flood_Probability': 'float64'
+    },
+    'RISK_ZONES': {
+        'Latitude': 'float64', 'Longitude': 'float64',
+        'Precipitation_mm': 'float64', 'Max_Reservoir_Fill_Percent': 'float64',
+        'Flood_Probability': 'float64', 'Binary_Risk': 'int64'
+    },
+    'DAILY_SUMMARY': {
+        'High_Risk_Cities': 'int64', 'Avg_Flood_Probability': 'float64',
+        'Max_Flood_Probability': 'float64', 'Min_Flood_Probability': 'float64',
+        'Total_Cities': 'int64', 'Avg_Precipitation': 'float64',
+        'Avg_Reservoir_Fill': 'float64', 'Critical_Risk_Cities': 'int64',
+        'High_Confidence_Cities': 'int64'
+    },
+    'CITY_SUMMARY': {
+        'Total_High_Risk_Days': 'int64', 'Avg_Flood_Probability': 'float64',
+        'Peak_Flood_Probability': 'float64', 'Risk_Variability': 'float64',
+        'Avg_Precipitation': 'float64', 'Avg_Reservoir_Fill': 'float64',
+        'Latitude': 'float64', 'Longitude': 'float64',
+        'Critical_Risk_Days': 'int64', 'High_Confidence_Days': 'int64'
+    },
+    'CITIES': {
+        'latitude': 'float64', 'longitude': 'float64'
+    }
+}
+
+
+class DataSnapshot:
+    """In-memory copy of one data file, valid for a single (mtime, size) version"""
+
+    def __init__(self, key, path, signature, frame):
+        self.key = key
+        self.path = path
+        self.signature = signature
+        self.frame = frame
+        self._records = None
+        self._derived = {}
+
+    @property
+    def version(self):
+        """Short token identifying this version of the file"""
+        mtime_ns, size = self.signature
+        return f"{mtime_ns:x}-{size:x}"
+
+    def records(self):
+        """Rows as a list of dicts, built once per snapshot"""
+        if self._records is None:
+            self._records = self.frame.to_dict('records')
+        return self._records
+
+    def derive(self, name, builder):
+        """Compute builder(self) once and keep it for the lifetime of this snapshot"""
+        value = self._derived.get(name)
+        if value is None:
+            value = builder(self)
+            self._derived[name] = value
+        return value
+
+    def index(self):
+        """City/date lookup index over this snapshot's rows"""
+        return self.derive('index', lambda snap: FrameIndex(snap.frame))
+
+    def take(self, rows, as_frame=False):
+        """Rows at the given positions, as records or as a DataFrame slice"""
+        if as_frame:
+            return self.frame.iloc[rows]
+        records = self.records()
+        return [records[i] for i in rows]
+
+
+def normalize_city(name):
+    """Key used for case-insensitive city lookups"""
+    return str(name).lower()
+
+
+class FrameIndex:
+    """Hash indexes over a snapshot frame.
+
+    Rows are addressed by position. Cities map to a contiguous range of a
+    city-sorted permutation (file order is kept within a city), dates map
+    to their row positions, and the high-risk mask is precomputed when the
+    frame carries Predicted_Flood_Risk.
+    """
+
+    def __init__(self, frame, city_col='City', date_col='Date'):
+        self.size = len(frame)
+
+        if city_col in frame.columns:
+            keys = frame[city_col].astype(str).str.lower().to_numpy()
+            self.order = np.argsort(keys, kind='stable')
+            unique_keys, starts, counts = np.unique(
+                keys[self.order], return_index=True, return_counts=True
+            )
+            self.city_ranges = {
+                key: (int(start), int(start + count))
+                for key, start, count in zip(unique_keys, starts, counts)
+            }
+            # Categorical code of each row's normalized city (position in city_keys)
+            self.city_keys = unique_keys
+            self.city_codes = np.empty(self.size, dtype=np.int64)
+            self.city_codes[self.order] = np.repeat(np.arange(len(unique_keys)), counts)
+        else:
+            self.order = np.arange(self.size)
+            self.city_ranges = {}
+            self.city_keys = np.array([], dtype=object)
+            self.city_codes = np.full(self.size, -1, dtype=np.int64)
+
+        if date_col in frame.columns:
+            self.date_positions = {
+                date: np.asarray(rows)
+                for date, rows in frame.groupby(date_col, sort=False).indices.items()
+            }
+        else:
+            self.date_positions = {}
+
+        if 'Predicted_Flood_Risk' in frame.columns:
+            self.high_risk_mask = frame['Predicted_Flood_Risk'].to_numpy() == 1
+        else:
+            self.high_risk_mask = np.zeros(self.size, dtype=bool)
+        self.high_risk_rows = np.flatnonzero(self.high_risk_mask)
+
+    def city_rows(self, city_name):
+        """Row positions for a city (case-insensitive), in file order"""
+        bounds = self.city_ranges.get(normalize_city(city_name))
+        if bounds is None:
+            return self.order[:0]
+        return self.order[bounds[0]:bounds[1]]
+
+    def city_code(self, city_name):
+        """Categorical code of a city (case-insensitive), or -1 when unknown"""
+        bounds = self.city_ranges.get(normalize_city(city_name))
+        return -1 if bounds is None else int(self.city_codes[self.order[bounds[0]]])
+
+    def date_rows(self, date):
+        """Row positions for a forecast date, in file order"""
+        return self.date_positions.get(date, self.order[:0])
+
+    def select(self, city=None, date=None):
+        """Row positions (ascending) matching an optional city and date"""
+        rows = None
+        if city:
+            # Positions within a city are ascending because the sort was stable
+            rows = self.city_rows(city)
+        if date:
+            date_rows = self.date_rows(date)
+            rows = date_rows if rows is None else np.intersect1d(rows, date_rows, assume_unique=True)
+        return np.arange(self.size) if rows is None else rows
+
+    def high_risk_rows_for(self, date=None):
+        """Row positions with Predicted_Flood_Risk == 1, optionally for one date"""
+        if not date:
+            return self.high_risk_rows
+        rows = self.date_rows(date)
+        return rows[self.high_risk_mask[rows]]
+
+
+class SnapshotSet:
+    """Snapshots of every data file for one published run, swapped in as a whole.
+
+    A set is never modified after it is built. Requests read through the set
+    they started with, so a reload only replaces DataLoader's reference and
+    requests already in flight finish on the previous data.
+    """
+
+    def __init__(self, run_id, files, snapshots):
+        # Published run directory name, or None when serving data/ directly
+        self.run_id = run_id
+        # key -> (path, (mtime_ns, size) or None) as seen when the set was built
+        self.files = files
+        # key -> DataSnapshot, or None when the file is missing
+        self.snapshots = snapshots
+
+    def data_version(self, keys):
+        """Version token for a set of data files"""
+        parts = []
+        for key in keys:
+            signature = self.files[key][1]
+            parts.append(f"{key}:{signature[0]:x}-{signature[1]:x}" if signature else f"{key}:missing")
+        prefix = f"{self.run_id}|" if self.run_id else ''
+        return prefix + '|'.join(parts)
+
+    def last_modified(self, keys):
+        """Most recent modification time (epoch seconds) among the given data files"""
+        mtimes = [self.files[key][1][0] / 1e9 for key in keys if self.files[key][1] is not None]
+        return max(mtimes) if mtimes else None
+
 
 class DataLoader:
     """Centralized data loader for all CSV files generated by enhanced forecast/plotting"""
@@ -13,6 +223,275 @@ class DataLoader:
         self.project_root = os.path.abspath(os.path.join(base_dir, '..'))
         # Read data from the root-level data/ directory
         self.data_dir = os.path.join(self.project_root, 'data')
+        # SnapshotSet served to new requests; replaced (never mutated) on reload
+        self._current = None
+        self._derived = {}
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        # Process that owns the watcher thread (threads do not survive a fork)
+        self._watcher_pid = None
+        # Parsed frames shared with the other worker processes through mmap
+        self._shared = None
+        if Config.SHARED_SNAPSHOTS and SHARED_SNAPSHOTS_AVAILABLE:
+            self._shared = SharedSnapshotStore(
+                Config.SHARED_SNAPSHOT_DIR or default_snapshot_dir(self.data_dir)
+            )
+
+    def _published_run(self):
+        """(run id, directory) named by data/CURRENT, or (None, data/) without one"""
+        try:
+            with open(os.path.join(self.project_root, Config.CURRENT_RUN_POINTER)) as f:
+                run_id = f.read().strip()
+        except OSError:
+            return None, self.data_dir
+        run_dir = os.path.join(self.project_root, Config.RUNS_DIR, run_id)
+        if not run_id or not os.path.isdir(run_dir):
+            print(f"Published run '{run_id}' not found, serving {self.data_dir}")
+            return None, self.data_dir
+        return run_id, run_dir
+
+    def _csv_path(self, key, run_dir=None):
+        """CSV path for a data key: the run's copy, else the one in data/ (e.g. cities.csv)"""
+        name = os.path.basename(Config.DATA_FILES[key])
+        if run_dir is not None and run_dir != self.data_dir:
+            run_path = os.path.join(run_dir, name)
+            if os.path.exists(run_path) or os.path.exists(os.path.splitext(run_path)[0] + '.parquet'):
+                return run_path
+        return os.path.join(self.data_dir, name)
+
+    def _file_path(self, key, run_dir=None):
+        """Path of the file backing a data key.
+
+        The pipeline writes <name>.parquet next to each <name>.csv; the
+        Parquet file is used when pyarrow is available and it is at least as
+        new as the CSV (so a CSV written by an older script still wins).
+        """
+        csv_path = self._csv_path(key, run_dir)
+        if pq is None:
+            return csv_path
+        parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+        parquet_signature = self._stat_signature(parquet_path)
+        if parquet_signature is None:
+            return csv_path
+        csv_signature = self._stat_signature(csv_path)
+        if csv_signature is not None and csv_signature[0] > parquet_signature[0]:
+            return csv_path
+        return parquet_path
+
+    @staticmethod
+    def _read_table(key, path, columns=None, filters=None):
+        """Read a CSV or (memory-mapped) Parquet data file into a DataFrame"""
+        if path.endswith('.parquet'):
+            df = pq.read_table(path, columns=columns, filters=filters, memory_map=True).to_pandas()
+            dtypes = {col: dtype for col, dtype in FRAME_DTYPES.get(key, {}).items() if col in df.columns}
+            return df.astype(dtypes) if dtypes else df
+        return pd.read_csv(path, usecols=columns, dtype=FRAME_DTYPES.get(key))
+
+    def _read_frame(self, key, path):
+        """Parse a data file into a typed DataFrame"""
+        df = self._read_table(key, path)
+
+        if key == 'DAILY_SUMMARY':
+            # Reset index to get Date as a column if it's in the index
+            if 'Date' not in df.columns and df.index.name == 'Date':
+                df = df.reset_index()
+        elif key == 'CITY_SUMMARY':
+            # Reset index to get City as a column if it's in the index
+            if 'City' not in df.columns and df.index.name == 'City':
+                df = df.reset_index()
+
+            # Handle the Risk_Category column properly
+            if 'Overall_Risk_Category' in df.columns:
+                df['Risk_Category'] = df['Overall_Risk_Category']
+            elif 'Risk_Category' not in df.columns:
+                # Create Risk_Category based on Avg_Flood_Probability if it doesn't exist
+                df['Risk_Category'] = df['Avg_Flood_Probability'].apply(
+                    lambda x: 'Critical' if x >= 0.8 else 
+                             'High' if x >= 0.6 else 
+                             'Medium' if x >= 0.4 else 'Low'
+                )
+        return df
+
+    @staticmethod
+    def _stat_signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _scan(self):
+        """Published run id and the (path, signature) of every data file in it"""
+        run_id, run_dir = self._published_run()
+        files = {}
+        for key in Config.DATA_FILES:
+            path = self._file_path(key, run_dir)
+            files[key] = (path, self._stat_signature(path))
+        return run_id, files
+
+    def _build_set(self, run_id, files, previous=None):
+        """Parse the scanned files into a SnapshotSet, reusing unchanged snapshots"""
+        snapshots = {}
+        for key, (path, signature) in files.items():
+            old = previous.snapshots.get(key) if previous is not None else None
+            if signature is None:
+                snapshots[key] = None
+            elif old is not None and old.path == path and old.signature == signature:
+                snapshots[key] = old
+            else:
+                # A malformed file only loses its own snapshot; the others still load
+                try:
+                    frame = self._load_frame(key, path, signature)
+                except Exception as e:
+                    print(f"Error loading {key} from {path}: {e}")
+                    snapshots[key] = None
+                    continue
+                snapshots[key] = DataSnapshot(key, path, signature, frame)
+        return SnapshotSet(run_id, files, snapshots)
+
+    def current(self):
+        """The SnapshotSet for this request.
+
+        The first call within a request pins the set on flask.g, so every
+        lookup made while serving that request sees the same data version
+        even if a reload happens half-way. Only the very first load in a
+        process parses synchronously; later versions are loaded by the
+        watcher thread and never block a request.
+        """
+        in_request = has_request_context()
+        if in_request:
+            pinned = g.get('snapshot_set')
+            if pinned is not None:
+                return pinned
+
+        snapshot_set = self._current
+        if snapshot_set is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = self._build_set(*self._scan())
+                snapshot_set = self._current
+        self._ensure_watcher()
+
+        if in_request:
+            g.snapshot_set = snapshot_set
+        return snapshot_set
+
+    def reload(self):
+        """Build a new SnapshotSet if the published run or any data file changed.
+
+        Parsing happens off to the side; the new set replaces the current
+        one with a single reference assignment. Returns True if it swapped.
+        """
+        with self._reload_lock:
+            current = self._current
+            run_id, files = self._scan()
+            if current is not None and current.run_id == run_id and current.files == files:
+                return False
+            self._current = self._build_set(run_id, files, current)
+            return True
+
+    def _ensure_watcher(self):
+        """Start the reload thread once per process"""
+        if Config.SNAPSHOT_RELOAD_INTERVAL <= 0 or self._watcher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            threading.Thread(target=self._watch, name='snapshot-reload', daemon=True).start()
+
+    def _watch(self):
+        while True:
+            time.sleep(Config.SNAPSHOT_RELOAD_INTERVAL)
+            try:
+                self.reload()
+            except Exception as e:
+                # Keep serving the previous set; the next poll retries
+                print(f"Snapshot reload failed, keeping the current data: {e}")
+
+    def data_version(self, keys):
+        """Version token for a set of data files (no I/O; from the current set)"""
+        return self.current().data_version(keys)
+
+    def last_modified(self, keys):
+        """Most recent modification time (epoch seconds) among the given data files"""
+        return self.current().last_modified(keys)
+
+    def snapshot(self, key):
+        """Return the DataSnapshot of a data file in the current set, or None if it is missing"""
+        return self.current().snapshots[key]
+
+    def _load_frame(self, key, path, signature):
+        """Parsed frame for a file version, attached from the shared store when enabled"""
+        if self._shared is not None:
+            try:
+                return self._shared.load(key, signature, lambda: self._read_frame(key, path))
+            except OSError as e:
+                print(f"Shared snapshot unavailable for {key}, parsing locally: {e}")
+        return self._read_frame(key, path)
+
+    def derive(self, name, keys, builder):
+        """Compute builder(snapshots) once per combined version of several data files.
+
+        snapshots maps each key to its DataSnapshot (or None when the file is
+        missing). The result is recomputed only when one of the files changes.
+        """
+        snapshot_set = self.current()
+        snapshots = {key: snapshot_set.snapshots[key] for key in keys}
+        versions = tuple(snap.version if snap is not None else None for snap in snapshots.values())
+
+        cached = self._derived.get(name)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+
+        value = builder(snapshots)
+        self._derived[name] = (versions, value)
+        return value
+
+    def load_date_range(self, key, start_date=None, end_date=None, columns=None):
+        """Read rows with start_date <= Date <= end_date straight from disk.
+
+        For Parquet files the range is pushed down to the reader, so row
+        groups whose Date min/max statistics fall outside it are skipped and
+        only the requested columns are decoded. This is meant for archives
+        too large to hold as a snapshot; returns None if the file is missing.
+        """
+        # Resolved from the published run without loading its snapshots
+        path = self._file_path(key, self._published_run()[1])
+        if self._stat_signature(path) is None:
+            return None
+
+        filters = []
+        if start_date is not None:
+            filters.append(('Date', '>=', start_date))
+        if end_date is not None:
+            filters.append(('Date', '<=', end_date))
+
+        if path.endswith('.parquet'):
+            return self._read_table(key, path, columns=columns, filters=filters or None)
+
+        read_columns = columns if columns is None or 'Date' in columns else list(columns) + ['Date']
+        df = self._read_table(key, path, columns=read_columns)
+        mask = pd.Series(True, index=df.index)
+        for _, op, value in filters:
+            mask &= (df['Date'] >= value) if op == '>=' else (df['Date'] <= value)
+        df = df[mask].reset_index(drop=True)
+        return df if read_columns is columns else df[list(columns)]
+
+    def get_frame(self, key):
+        """Return the cached DataFrame for a data file (shared, do not mutate)"""
+        snap = self.snapshot(key)
+        return snap.frame if snap is not None else None
+
+    def _load_records(self, key, label):
+        try:
+            snap = self.snapshot(key)
+            if snap is None:
+                return None
+            return snap.records()
+        except Exception as e:
+            print(f"Error loading {label}: {e}")
+            return None
         
     def check_data_availability(self):
         """Check which CSV files are available"""
@@ -25,95 +504,36 @@ class DataLoader:
             'cities.csv': 'City coordinates reference'
         }
         
+        # Files of the published run (or data/), CSV or Parquet
+        available = {
+            os.path.basename(Config.DATA_FILES[key]): signature is not None
+            for key, (path, signature) in self.current().files.items()
+        }
         status = {}
         for filename, description in files_to_check.items():
-            file_path = os.path.join(self.data_dir, filename)
-            status[f"{filename} ({description})"] = os.path.exists(file_path)
+            status[f"{filename} ({description})"] = available.get(filename, False)
         
         return status
     
     def load_7day_predictions(self):
         """Load 7-day flood predictions"""
-        try:
-            file_path = os.path.join(self.data_dir, '7day_flood_predictions.csv')
-            if not os.path.exists(file_path):
-                return None
-            
-            df = pd.read_csv(file_path)
-            return df.to_dict('records')
-        except Exception as e:
-            print(f"Error loading 7-day predictions: {e}")
-            return None
+        return self._load_records('7DAY_PREDICTIONS', '7-day predictions')
     
     def load_daily_summary(self):
         """Load daily summary data"""
-        try:
-            file_path = os.path.join(self.data_dir, 'daily_summary.csv')
-            if not os.path.exists(file_path):
-                return None
-            
-            df = pd.read_csv(file_path)
-            # Reset index to get Date as a column if it's in the index
-            if 'Date' not in df.columns and df.index.name == 'Date':
-                df = df.reset_index()
-            return df.to_dict('records')
-        except Exception as e:
-            print(f"Error loading daily summary: {e}")
-            return None
+        return self._load_records('DAILY_SUMMARY', 'daily summary')
     
     def load_city_summary(self):
         """Load city summary data"""
-        try:
-            file_path = os.path.join(self.data_dir, 'city_summary.csv')
-            if not os.path.exists(file_path):
-                return None
-            
-            df = pd.read_csv(file_path)
-            # Reset index to get City as a column if it's in the index
-            if 'City' not in df.columns and df.index.name == 'City':
-                df = df.reset_index()
-            
-            # Handle the Risk_Category column properly
-            if 'Overall_Risk_Category' in df.columns:
-                df['Risk_Category'] = df['Overall_Risk_Category']
-            elif 'Risk_Category' not in df.columns:
-                # Create Risk_Category based on Avg_Flood_Probability if it doesn't exist
-                df['Risk_Category'] = df['Avg_Flood_Probability'].apply(
-                    lambda x: 'Critical' if x >= 0.8 else 
-                             'High' if x >= 0.6 else 
-                             'Medium' if x >= 0.4 else 'Low'
-                )
-            
-            return df.to_dict('records')
-        except Exception as e:
-            print(f"Error loading city summary: {e}")
-            return None
+        return self._load_records('CITY_SUMMARY', 'city summary')
     
     def load_risk_zones(self):
         """Load risk zones data"""
-        try:
-            file_path = os.path.join(self.data_dir, 'risk_zones.csv')
-            if not os.path.exists(file_path):
-                return None
-            
-            df = pd.read_csv(file_path)
-            return df.to_dict('records')
-        except Exception as e:
-            print(f"Error loading risk zones: {e}")
-            return None
+        return self._load_records('RISK_ZONES', 'risk zones')
     
     def load_plotting_data(self):
         """Load final plotting data"""
-        try:
-            file_path = os.path.join(self.data_dir, 'final_plot.csv')
-            if not os.path.exists(file_path):
-                return None
-            
-            df = pd.read_csv(file_path)
-            return df.to_dict('records')
-        except Exception as e:
-            print(f"Error loading plotting data: {e}")
-            return None
+        return self._load_records('FINAL_PLOT', 'plotting data')
     
     def get_city_list(self):
         """Get list of all cities from available data"""
@@ -126,15 +546,9 @@ class DataLoader:
             return sorted(list(cities))
         
         # Fallback to cities.csv
-        try:
-            cities_path = os.path.join(self.data_dir, 'cities.csv')
-            with open(cities_path, 'r', encoding='UTF-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if 'city' in row:
-                        cities.add(row['city'])
-        except FileNotFoundError:
-            pass
+        cities_df = self.get_frame('CITIES')
+        if cities_df is not None and 'city' in cities_df.columns:
+            cities.update(cities_df['city'].dropna())
         
         return sorted(list(cities))
     
@@ -142,111 +556,148 @@ class DataLoader:
         """Get coordinates for a specific city"""
         # Try from cities.csv first
         try:
-            cities_path = os.path.join(self.data_dir, 'cities.csv')
-            with open(cities_path, 'r', encoding='UTF-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('city', '').lower() == city_name.lower():
-                        return float(row['latitude']), float(row['longitude'])
-        except (FileNotFoundError, KeyError, ValueError):
+            cities = self.snapshot('CITIES')
+            if cities is not None:
+                rows = cities.derive(
+                    'index', lambda snap: FrameIndex(snap.frame, city_col='city', date_col=None)
+                ).city_rows(city_name)
+                if len(rows) > 0:
+                    row = cities.frame.iloc[rows[0]]
+                    return float(row['latitude']), float(row['longitude'])
+        except (KeyError, ValueError):
             pass
         
         # Try from 7-day predictions
-        predictions = self.load_7day_predictions()
-        if predictions:
-            for record in predictions:
-                if record['City'].lower() == city_name.lower():
-                    return float(record['Latitude']), float(record['Longitude'])
+        predictions = self.snapshot('7DAY_PREDICTIONS')
+        if predictions is not None:
+            rows = predictions.index().city_rows(city_name)
+            if len(rows) > 0:
+                row = predictions.frame.iloc[rows[0]]
+                return float(row['Latitude']), float(row['Longitude'])
         
         return None, None
     
-    def get_city_forecast(self, city_name):
+    def get_city_catalog(self):
+        """Per-city coordinates and forecast status, built once per data version"""
+        return self.derive('city_catalog', ('7DAY_PREDICTIONS', 'CITIES'), build_city_catalog)
+    
+    def get_city_forecast(self, city_name, as_frame=False):
         """Get 7-day forecast for a specific city"""
-        predictions = self.load_7day_predictions()
-        if not predictions:
+        predictions = self.snapshot('7DAY_PREDICTIONS')
+        if predictions is None:
             return None
         
-        city_forecast = [
-            record for record in predictions 
-            if record['City'].lower() == city_name.lower()
-        ]
+        rows = predictions.index().city_rows(city_name)
         
-        return city_forecast if city_forecast else None
+        return predictions.take(rows, as_frame) if len(rows) > 0 else None
     
-    def get_date_forecast(self, target_date):
+    def get_date_forecast(self, target_date, as_frame=False):
         """Get all city forecasts for a specific date"""
-        predictions = self.load_7day_predictions()
-        if not predictions:
+        predictions = self.snapshot('7DAY_PREDICTIONS')
+        if predictions is None:
             return None
         
-        date_forecast = [
-            record for record in predictions 
-            if record['Date'] == target_date
-        ]
+        rows = predictions.index().date_rows(target_date)
         
-        return date_forecast if date_forecast else None
+        return predictions.take(rows, as_frame) if len(rows) > 0 else None
     
-    def get_high_risk_cities(self, date=None):
+    def get_high_risk_cities(self, date=None, as_frame=False):
         """Get cities with high flood risk (optionally for specific date)"""
-        predictions = self.load_7day_predictions()
-        if not predictions:
-            return []
+        predictions = self.snapshot('7DAY_PREDICTIONS')
+        if predictions is None:
+            return None if as_frame else []
         
-        if date:
-            predictions = [
-                record for record in predictions 
-                if record['Date'] == date
-            ]
-        
-        high_risk_cities = [
-            record for record in predictions 
-            if record['Predicted_Flood_Risk'] == 1
-        ]
-        
-        return high_risk_cities
+        return predictions.take(predictions.index().high_risk_rows_for(date), as_frame)
     
     def get_summary_stats(self):
         """Get overall summary statistics"""
-        predictions = self.load_7day_predictions()
-        if not predictions:
+        predictions = self.snapshot('7DAY_PREDICTIONS')
+        if predictions is None or len(predictions.frame) == 0:
             return None
         
-        df = pd.DataFrame(predictions)
-        
-        total_predictions = len(df)
-        high_risk_predictions = len(df[df['Predicted_Flood_Risk'] == 1])
-        unique_cities = df['City'].nunique()
-        unique_dates = df['Date'].nunique()
-        avg_probability = df['Flood_Probability'].mean()
-        
-        # Risk category distribution if available
-        risk_categories = {}
-        if 'Risk_Category' in df.columns:
-            risk_categories = df['Risk_Category'].value_counts().to_dict()
-        
         return {
-            'total_predictions': total_predictions,
-            'high_risk_predictions': high_risk_predictions,
-            'high_risk_percentage': round((high_risk_predictions / total_predictions) * 100, 1),
-            'unique_cities': unique_cities,
-            'forecast_days': unique_dates,
-            'average_flood_probability': round(avg_probability, 3),
-            'risk_category_distribution': risk_categories,
+            **prediction_aggregates(predictions)['summary'],
             'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
 
-def to_serializable(obj):
-    """Convert numpy/pandas datatypes into native Python types"""
-    if isinstance(obj, (np.integer,)):
-        return int(obj)
-    elif isinstance(obj, (np.floating,)):
-        return float(obj)
-    elif isinstance(obj, (np.bool_,)):
-        return bool(obj)
-    elif isinstance(obj, (np.ndarray, list, tuple)):
-        return [to_serializable(x) for x in obj]
-    elif isinstance(obj, dict):
-        return {k: to_serializable(v) for k, v in obj.items()}
-    elif pd.isna(obj):
-        return None
-    return obj
\ No newline at end of file
+def sort_by_city_date(df):
+    """Copy of df sorted by City then Date, with Date rendered as 'YYYY-MM-DD'.
+
+    Dates are parsed for ordering so mixed formats still sort chronologically.
+    """
+    if len(df) == 0:
+        return df.copy()
+    if 'Date' not in df.columns:
+        return df.sort_values('City', kind='stable').reset_index(drop=True)
+    dates = pd.to_datetime(df['Date'], errors='coerce')
+    df = df.assign(Date=dates).sort_values(['City', 'Date'], kind='stable').reset_index(drop=True)
+    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
+    return df
+
+def build_city_catalog(snapshots):
+    """Build the /api/data/cities listing from the predictions and cities.csv snapshots.
+
+    City names come from the predictions when available, otherwise from
+    cities.csv. Coordinates prefer cities.csv and fall back to the first
+    prediction row for the city.
+    """
+    predictions = snapshots.get('7DAY_PREDICTIONS')
+    cities = snapshots.get('CITIES')
+    pred_df = predictions.frame if predictions is not None else pd.DataFrame(columns=['City'])
+    cities_df = cities.frame if cities is not None else pd.DataFrame(columns=['city'])
+
+    if len(pred_df) > 0:
+        names = pd.Series(sorted(pred_df['City'].unique()), dtype=object)
+    else:
+        names = pd.Series(sorted(cities_df['city'].dropna().unique()), dtype=object)
+    if len(names) == 0:
+        return []
+
+    catalog = pd.DataFrame({'name': names, 'key': names.astype(str).str.lower()})
+
+    # Coordinates from cities.csv (first match per key), then from predictions
+    lat = pd.Series(np.nan, index=catalog.index)
+    lon = pd.Series(np.nan, index=catalog.index)
+    if {'city', 'latitude', 'longitude'} <= set(cities_df.columns):
+        ref = cities_df.assign(key=cities_df['city'].astype(str).str.lower())
+        ref = ref.drop_duplicates('key').set_index('key')
+        lat = catalog['key'].map(ref['latitude'])
+        lon = catalog['key'].map(ref['longitude'])
+
+    if len(pred_df) > 0:
+        grouped = pred_df.groupby(pred_df['City'].astype(str).str.lower(), sort=False)
+        first = grouped[['Latitude', 'Longitude', 'Predicted_Flood_Risk']].first()
+        avg_probability = grouped['Flood_Probability'].mean()
+
+        missing = lat.isna() | lon.isna()
+        lat = lat.where(~missing, catalog['key'].map(first['Latitude']))
+        lon = lon.where(~missing, catalog['key'].map(first['Longitude']))
+        current_risk = catalog['key'].map(first['Predicted_Flood_Risk'])
+        avg_probability = catalog['key'].map(avg_probability).round(3)
+    else:
+        current_risk = pd.Series(np.nan, index=catalog.index)
+        avg_probability = pd.Series(np.nan, index=catalog.index)
+
+    has_coords = (lat.notna() & lon.notna() & (lat != 0) & (lon != 0)).to_numpy()
+    has_forecast = current_risk.notna().to_numpy()
+
+    cities_info = []
+    for i, name in enumerate(catalog['name'].tolist()):
+        city_info = {
+            'name': name,
+            'coordinates': {
+                'lat': float(lat.iat[i]),
+                'lon': float(lon.iat[i])
+            } if has_coords[i] else None
+        }
+        if has_forecast[i]:
+            city_info.update({
+                'current_risk': int(current_risk.iat[i]),
+                'average_probability': float(avg_probability.iat[i]),
+                'forecast_available': True
+            })
+        else:
+            city_info['forecast_available'] = False
+        cities_info.append(city_info)
+
+    return cities_info
@@ -1,391 +1,497 @@
 from flask import Blueprint, jsonify, request, current_app
-from data_loader import to_serializable
+from config import Config
+from http_cache import conditional_get, cached_json_response
+from json_encoding import json_response, group_rows_by_city
+from pagination import PaginationError, SortedView, parse_pagination_args, sorted_view
+from projection import parse_fields_arg
+from columnar import columnar_response, negotiate_format
+from clustering import risk_zone_clusters
+from spatial_index import SpatialQueryError, parse_bbox_arg, parse_nearby_args, spatial_index
 import pandas as pd
 
 data_bp = Blueprint('data', __name__)
 
+# Data types served by /export/<data_type>, mapped to Config.DATA_FILES keys
+EXPORT_DATA_KEYS = {
+    '7day': '7DAY_PREDICTIONS',
+    'daily': 'DAILY_SUMMARY',
+    'cities': 'CITY_SUMMARY',
+    'risk_zones': 'RISK_ZONES',
+    'plotting': 'FINAL_PLOT'
+}
+
 @data_bp.route('/cities', methods=['GET'])
+@conditional_get('7DAY_PREDICTIONS', 'CITIES')
 def get_cities():
     """Get list of all available cities with basic info"""
     try:
         data_loader = current_app.data_loader
-        cities = data_loader.get_city_list()
-        
-        if not cities:
+        cities_info = data_loader.get_city_catalog()
+
+        if not cities_info:
             return jsonify({
                 'error': 'No cities data available'
             }), 404
-        
-        # Get additional info for each city if available
-        cities_info = []
-        for city in cities:
-            lat, lon = data_loader.get_city_coordinates(city)
-            city_forecast = data_loader.get_city_forecast(city)
-            
-            city_info = {
-                'name': city,
-                'coordinates': {
-                    'lat': lat,
-                    'lon': lon
-                } if lat and lon else None
-            }
-            
-            # Add current risk status if forecast available
-            if city_forecast:
-                df = pd.DataFrame(city_forecast)
-                current_risk = df.iloc[0]['Predicted_Flood_Risk'] if len(df) > 0 else 0
-                avg_probability = df['Flood_Probability'].mean()
-                
-                city_info.update({
-                    'current_risk': int(current_risk),
-                    'average_probability': round(avg_probability, 3),
-                    'forecast_available': True
-                })
-            else:
-                city_info['forecast_available'] = False
-            
-            cities_info.append(city_info)
-        
-        return jsonify(to_serializable({
+
+        return json_response({
             'cities': cities_info,
             'count': len(cities_info)
-        }))
-        
+        })
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def build_risk_zones_payload(df, risk_level_filter, alert_level_filter, date_filter, group_by_city,
+                             page_info=None, fields=None, bbox=None):
+    """Shape the /risk-zones response from a City/Date-sorted risk zones frame"""
+    filters_applied = {
+        'risk_level': risk_level_filter,
+        'alert_level': alert_level_filter,
+        'date': date_filter,
+        'bbox': list(bbox) if bbox is not None else None,
+        'group_by_city': group_by_city
+    }
+
+    if len(df) > 0:
+        # Prepare summary
+        risk_level_counts = df['Risk_Level'].value_counts().to_dict() if 'Risk_Level' in df.columns else {}
+        alert_level_counts = df['Alert_Level'].value_counts().to_dict() if 'Alert_Level' in df.columns else {}
+        summary = {
+            'risk_level_distribution': risk_level_counts,
+            'alert_level_distribution': alert_level_counts
+        }
+
+        if group_by_city:
+            # Group into one record per city with a days array
+            grouped_output = group_rows_by_city(df, fields)
+
+            response_payload = {
+                'risk_zones': grouped_output,
+                'grouped': True,
+                'city_count': len(grouped_output),
+                'filters_applied': filters_applied,
+                'summary': summary
+            }
+        else:
+            # Flat list, but sorted and with formatted date
+            response_payload = {
+                'risk_zones': df,
+                'count': len(df),
+                'grouped': False,
+                'filters_applied': filters_applied,
+                'summary': summary
+            }
+    else:
+        response_payload = {
+            'risk_zones': [],
+            'count': 0,
+            'grouped': group_by_city,
+            'filters_applied': filters_applied,
+            'summary': {
+                'risk_level_distribution': {},
+                'alert_level_distribution': {}
+            }
+        }
+
+    if page_info is not None:
+        response_payload['pagination'] = page_info
+
+    return response_payload
+
 @data_bp.route('/risk-zones', methods=['GET'])
+@conditional_get('RISK_ZONES', columnar=True)
 def get_risk_zones():
     """Get risk zones data with alert levels"""
     try:
         data_loader = current_app.data_loader
-        risk_zones = data_loader.load_risk_zones()
-        
-        if risk_zones is None:
-            return jsonify({
-                'error': 'No risk zones data available',
-                'message': 'Please run enhanced_plotting.py to generate risk zones'
-            }), 404
-        
+
         # Optional filters
         risk_level_filter = request.args.get('risk_level')
         alert_level_filter = request.args.get('alert_level')
         date_filter = request.args.get('date')
+        # Optional map viewport, bbox=west,south,east,north
+        bbox = parse_bbox_arg()
         # Group by city by default; clients can opt out with group_by_city=false
         group_by_city = request.args.get('group_by_city', 'true').lower() == 'true'
-        
-        filtered_zones = risk_zones
-        
-        if risk_level_filter:
-            filtered_zones = [
-                zone for zone in filtered_zones 
-                if zone['Risk_Level'].lower() == risk_level_filter.lower()
-            ]
-        
-        if alert_level_filter:
-            filtered_zones = [
-                zone for zone in filtered_zones 
-                if zone['Alert_Level'].lower() == alert_level_filter.lower()
-            ]
-        
-        if date_filter:
-            filtered_zones = [
-                zone for zone in filtered_zones 
-                if zone['Date'] == date_filter
-            ]
-        # Build DataFrame for sorting and potential grouping
-        df = pd.DataFrame(filtered_zones)
-        if len(df) > 0:
-            # Ensure Date is treated as datetime for correct ordering
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-            # Sort by City then Date (if present)
-            sort_cols = ['City'] + (['Date'] if 'Date' in df.columns else [])
-            df = df.sort_values(sort_cols).reset_index(drop=True)
-
-            # Prepare summary
-            risk_level_counts = df['Risk_Level'].value_counts().to_dict() if 'Risk_Level' in df.columns else {}
-            alert_level_counts = df['Alert_Level'].value_counts().to_dict() if 'Alert_Level' in df.columns else {}
-
-            if group_by_city:
-                # Group into one record per city with a days array
-                grouped_output = []
-                for city, g in df.groupby('City', sort=False):
-                    g_out = g.copy()
-                    if 'Date' in g_out.columns:
-                        g_out['Date'] = g_out['Date'].dt.strftime('%Y-%m-%d')
-                    days = g_out.to_dict('records')
-                    # Use first row for coordinates if present
-                    lat = float(g.iloc[0]['Latitude']) if 'Latitude' in g.columns else None
-                    lon = float(g.iloc[0]['Longitude']) if 'Longitude' in g.columns else None
-                    grouped_output.append({
-                        'City': city,
-                        'coordinates': {'lat': lat, 'lon': lon} if lat is not None and lon is not None else None,
-                        'days': days,
-                        'day_count': len(days)
-                    })
-
-                response_payload = {
-                    'risk_zones': grouped_output,
-                    'grouped': True,
-                    'city_count': len(grouped_output),
-                    'filters_applied': {
-                        'risk_level': risk_level_filter,
-                        'alert_level': alert_level_filter,
-                        'date': date_filter,
-                        'group_by_city': group_by_city
-                    },
-                    'summary': {
-                        'risk_level_distribution': risk_level_counts,
-                        'alert_level_distribution': alert_level_counts
-                    }
-                }
-            else:
-                # Flat list, but sorted and with formatted date
-                df_out = df.copy()
-                if 'Date' in df_out.columns:
-                    df_out['Date'] = df_out['Date'].dt.strftime('%Y-%m-%d')
-                flat_sorted = df_out.to_dict('records')
-
-                response_payload = {
-                    'risk_zones': flat_sorted,
-                    'count': len(flat_sorted),
-                    'grouped': False,
-                    'filters_applied': {
-                        'risk_level': risk_level_filter,
-                        'alert_level': alert_level_filter,
-                        'date': date_filter,
-                        'group_by_city': group_by_city
-                    },
-                    'summary': {
-                        'risk_level_distribution': risk_level_counts,
-                        'alert_level_distribution': alert_level_counts
-                    }
-                }
+        # Optional cursor pagination (limit counts cities when grouped, rows otherwise)
+        pagination = parse_pagination_args(group_by_city)
+        # Optional column projection, e.g. fields=City,Date,Flood_Probability
+        fields = parse_fields_arg()
+        # Arrow / MessagePack when the Accept header asks for them
+        columnar_format = negotiate_format()
+        filtered = bool(risk_level_filter or alert_level_filter or date_filter or bbox is not None)
+
+        # The unfiltered document only changes with the data file; serve pre-encoded bytes
+        if not filtered and pagination is None and fields is None and columnar_format is None:
+            response = cached_json_response(
+                f"risk-zones:grouped={group_by_city}", ('RISK_ZONES',),
+                lambda snapshots: build_risk_zones_payload(
+                    sorted_view(snapshots['RISK_ZONES']).frame, None, None, None, group_by_city
+                )
+            )
+            if response is not None:
+                return response
+
+        risk_zones = data_loader.snapshot('RISK_ZONES')
+
+        if risk_zones is None:
+            return jsonify({
+                'error': 'No risk zones data available',
+                'message': 'Please run enhanced_plotting.py to generate risk zones'
+            }), 404
+
+        if filtered:
+            rows = risk_zones.index().select(date=date_filter)
+            if bbox is not None:
+                rows = spatial_index(risk_zones).bbox_rows(bbox, rows)
+            filtered_zones = risk_zones.take(rows, as_frame=True)
+
+            if risk_level_filter:
+                filtered_zones = filtered_zones[
+                    filtered_zones['Risk_Level'].str.lower() == risk_level_filter.lower()
+                ]
+
+            if alert_level_filter:
+                filtered_zones = filtered_zones[
+                    filtered_zones['Alert_Level'].str.lower() == alert_level_filter.lower()
+                ]
+            view = SortedView(filtered_zones)
         else:
-            response_payload = {
-                'risk_zones': [],
-                'count': 0,
-                'grouped': group_by_city,
-                'filters_applied': {
-                    'risk_level': risk_level_filter,
-                    'alert_level': alert_level_filter,
-                    'date': date_filter,
-                    'group_by_city': group_by_city
-                },
-                'summary': {
-                    'risk_level_distribution': {},
-                    'alert_level_distribution': {}
-                }
-            }
+            view = sorted_view(risk_zones)
+
+        df, page_info = view.page(group_by_city, *pagination) if pagination else (view.frame, None)
+
+        if columnar_format is not None:
+            # Columnar formats are always flat; rows stay in City/Date order
+            payload = build_risk_zones_payload(df, risk_level_filter, alert_level_filter, date_filter, False,
+                                               page_info, bbox=bbox)
+            return columnar_response(payload, 'risk_zones', df, columnar_format, fields)
+
+        return json_response(build_risk_zones_payload(
+            df, risk_level_filter, alert_level_filter, date_filter, group_by_city, page_info, fields, bbox
+        ), fields=fields)
 
-        return jsonify(to_serializable(response_payload))
-        
+    except (PaginationError, SpatialQueryError) as e:
+        return jsonify({'error': Config.ERROR_MESSAGES['INVALID_PARAMETERS'], 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def build_plotting_payload(df, city_filter, date_filter, risk_threshold, group_by_city, page_info=None,
+                           fields=None, bbox=None):
+    """Shape the /plotting response from a City/Date-sorted plotting frame"""
+    filters_applied = {
+        'city': city_filter,
+        'date': date_filter,
+        'min_probability': risk_threshold,
+        'bbox': list(bbox) if bbox is not None else None,
+        'group_by_city': group_by_city
+    }
+
+    if len(df) > 0:
+        if group_by_city:
+            grouped_output = group_rows_by_city(df, fields)
+
+            response_payload = {
+                'plotting_data': grouped_output,
+                'grouped': True,
+                'city_count': len(grouped_output),
+                'filters_applied': filters_applied
+            }
+        else:
+            response_payload = {
+                'plotting_data': df,
+                'count': len(df),
+                'grouped': False,
+                'filters_applied': filters_applied
+            }
+    else:
+        response_payload = {
+            'plotting_data': [],
+            'count': 0,
+            'grouped': group_by_city,
+            'filters_applied': filters_applied
+        }
+
+    if page_info is not None:
+        response_payload['pagination'] = page_info
+
+    return response_payload
+
 @data_bp.route('/plotting', methods=['GET'])
+@conditional_get('FINAL_PLOT', columnar=True)
 def get_plotting_data():
     """Get final plotting data for map visualization"""
     try:
         data_loader = current_app.data_loader
-        plotting_data = data_loader.load_plotting_data()
-        
-        if plotting_data is None:
-            return jsonify({
-                'error': 'No plotting data available',
-                'message': 'Please run enhanced_plotting.py to generate plotting data'
-            }), 404
-        
+
         # Optional filters
         city_filter = request.args.get('city')
         date_filter = request.args.get('date')
         risk_threshold = request.args.get('min_probability', type=float)
+        # Optional map viewport, bbox=west,south,east,north
+        bbox = parse_bbox_arg()
         # Group by city by default; clients can opt out with group_by_city=false
         group_by_city = request.args.get('group_by_city', 'true').lower() == 'true'
-        
-        filtered_data = plotting_data
-        
-        if city_filter:
-            filtered_data = [
-                item for item in filtered_data 
-                if item['City'].lower() == city_filter.lower()
-            ]
-        
-        if date_filter:
-            filtered_data = [
-                item for item in filtered_data 
-                if item['Date'] == date_filter
-            ]
-        
-        if risk_threshold is not None:
-            filtered_data = [
-                item for item in filtered_data 
-                if item['Flood_Probability'] >= risk_threshold
-            ]
-        # Build DataFrame for sorting and potential grouping
-        df = pd.DataFrame(filtered_data)
-        if len(df) > 0:
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-            sort_cols = ['City'] + (['Date'] if 'Date' in df.columns else [])
-            df = df.sort_values(sort_cols).reset_index(drop=True)
-
-            if group_by_city:
-                grouped_output = []
-                for city, g in df.groupby('City', sort=False):
-                    g_out = g.copy()
-                    if 'Date' in g_out.columns:
-                        g_out['Date'] = g_out['Date'].dt.strftime('%Y-%m-%d')
-                    days = g_out.to_dict('records')
-                    lat = float(g.iloc[0]['Latitude']) if 'Latitude' in g.columns else None
-                    lon = float(g.iloc[0]['Longitude']) if 'Longitude' in g.columns else None
-                    grouped_output.append({
-                        'City': city,
-                        'coordinates': {'lat': lat, 'lon': lon} if lat is not None and lon is not None else None,
-                        'days': days,
-                        'day_count': len(days)
-                    })
-
-                response_payload = {
-                    'plotting_data': grouped_output,
-                    'grouped': True,
-                    'city_count': len(grouped_output),
-                    'filters_applied': {
-                        'city': city_filter,
-                        'date': date_filter,
-                        'min_probability': risk_threshold,
-                        'group_by_city': group_by_city
-                    }
-                }
-            else:
-                df_out = df.copy()
-                if 'Date' in df_out.columns:
-                    df_out['Date'] = df_out['Date'].dt.strftime('%Y-%m-%d')
-                flat_sorted = df_out.to_dict('records')
-
-                response_payload = {
-                    'plotting_data': flat_sorted,
-                    'count': len(flat_sorted),
-                    'grouped': False,
-                    'filters_applied': {
-                        'city': city_filter,
-                        'date': date_filter,
-                        'min_probability': risk_threshold,
-                        'group_by_city': group_by_city
-                    }
-                }
+        # Optional cursor pagination (limit counts cities when grouped, rows otherwise)
+        pagination = parse_pagination_args(group_by_city)
+        # Optional column projection, e.g. fields=City,Date,Flood_Probability
+        fields = parse_fields_arg()
+        # Arrow / MessagePack when the Accept header asks for them
+        columnar_format = negotiate_format()
+        filtered = bool(city_filter or date_filter or risk_threshold is not None or bbox is not None)
+
+        # The unfiltered document only changes with the data file; serve pre-encoded bytes
+        if not filtered and pagination is None and fields is None and columnar_format is None:
+            response = cached_json_response(
+                f"plotting:grouped={group_by_city}", ('FINAL_PLOT',),
+                lambda snapshots: build_plotting_payload(
+                    sorted_view(snapshots['FINAL_PLOT']).frame, None, None, None, group_by_city
+                )
+            )
+            if response is not None:
+                return response
+
+        plotting_data = data_loader.snapshot('FINAL_PLOT')
+
+        if plotting_data is None:
+            return jsonify({
+                'error': 'No plotting data available',
+                'message': 'Please run enhanced_plotting.py to generate plotting data'
+            }), 404
+
+        if filtered:
+            rows = plotting_data.index().select(city=city_filter, date=date_filter)
+            if bbox is not None:
+                rows = spatial_index(plotting_data).bbox_rows(bbox, rows)
+            filtered_data = plotting_data.take(rows, as_frame=True)
+
+            if risk_threshold is not None:
+                filtered_data = filtered_data[filtered_data['Flood_Probability'] >= risk_threshold]
+            view = SortedView(filtered_data)
         else:
-            response_payload = {
-                'plotting_data': [],
-                'count': 0,
-                'grouped': group_by_city,
-                'filters_applied': {
-                    'city': city_filter,
-                    'date': date_filter,
-                    'min_probability': risk_threshold,
-                    'group_by_city': group_by_city
-                }
-            }
+            view = sorted_view(plotting_data)
 
-        return jsonify(to_serializable(response_payload))
-        
+        df, page_info = view.page(group_by_city, *pagination) if pagination else (view.frame, None)
+
+        if columnar_format is not None:
+            # Columnar formats are always flat; rows stay in City/Date order
+            payload = build_plotting_payload(df, city_filter, date_filter, risk_threshold, False, page_info,
+                                             bbox=bbox)
+            return columnar_response(payload, 'plotting_data', df, columnar_format, fields)
+
+        return json_response(build_plotting_payload(
+            df, city_filter, date_filter, risk_threshold, group_by_city, page_info, fields, bbox
+        ), fields=fields)
+
+    except (PaginationError, SpatialQueryError) as e:
+        return jsonify({'error': Config.ERROR_MESSAGES['INVALID_PARAMETERS'], 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @data_bp.route('/coordinates/<city_name>', methods=['GET'])
+@conditional_get('CITIES', '7DAY_PREDICTIONS')
 def get_city_coordinates(city_name):
     """Get coordinates for a specific city"""
     try:
         data_loader = current_app.data_loader
         lat, lon = data_loader.get_city_coordinates(city_name)
-        
+
         if lat is None or lon is None:
             return jsonify({
                 'error': f'Coordinates not found for {city_name}'
             }), 404
-        
-        return jsonify(to_serializable({
+
+        return json_response({
             'city': city_name,
             'coordinates': {
                 'latitude': lat,
                 'longitude': lon
             }
-        }))
-        
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@data_bp.route('/nearby', methods=['GET'])
+@conditional_get('7DAY_PREDICTIONS')
+def get_nearby_cities():
+    """Get the monitored cities nearest to a point, optionally within a radius.
+
+    Query: lat, lon (required), limit, radius_km. Cities come back nearest
+    first with their great-circle distance in km.
+    """
+    try:
+        lat, lon, limit, radius_km = parse_nearby_args()
+        predictions = current_app.data_loader.snapshot('7DAY_PREDICTIONS')
+
+        if predictions is None:
+            return jsonify({
+                'error': 'No 7-day predictions available',
+                'message': 'Please run enhanced_forecast.py to generate predictions'
+            }), 404
+
+        index = spatial_index(predictions)
+        locations, distances = index.nearest(lat, lon, limit, radius_km)
+
+        return json_response({
+            'point': {'latitude': lat, 'longitude': lon},
+            'radius_km': radius_km,
+            'count': len(locations),
+            'cities': [
+                {
+                    'city': index.cities[location],
+                    'coordinates': {
+                        'latitude': float(index.latitudes[location]),
+                        'longitude': float(index.longitudes[location])
+                    },
+                    'distance_km': round(float(distance), 3)
+                }
+                for location, distance in zip(locations, distances)
+            ]
+        })
+
+    except SpatialQueryError as e:
+        return jsonify({'error': Config.ERROR_MESSAGES['INVALID_PARAMETERS'], 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _risk_zone_cluster_tree(date_filter):
+    """(ClusterTree, None) for the current risk zones and date, or (None, error response)"""
+    risk_zones = current_app.data_loader.snapshot('RISK_ZONES')
+
+    if risk_zones is None:
+        return None, (jsonify({
+            'error': 'No risk zones data available',
+            'message': 'Please run enhanced_plotting.py to generate risk zones'
+        }), 404)
+
+    if date_filter and len(risk_zones.index().date_rows(date_filter)) == 0:
+        return None, (jsonify({'error': f'No risk zones data available for {date_filter}'}), 404)
+
+    return risk_zone_clusters(risk_zones, date_filter), None
+
+@data_bp.route('/clusters', methods=['GET'])
+@conditional_get('RISK_ZONES')
+def get_clusters():
+    """Get risk-zone city clusters for a map zoom level and viewport.
+
+    Query: zoom (required), bbox=west,south,east,north and date (optional;
+    by default clusters summarise the whole week). Clusters carry
+    expansion_zoom and can be opened with /clusters/<id>/children.
+    """
+    try:
+        zoom = request.args.get('zoom', type=int)
+        if zoom is None or zoom < 0:
+            return jsonify({
+                'error': Config.ERROR_MESSAGES['INVALID_PARAMETERS'],
+                'message': 'zoom must be a non-negative integer'
+            }), 400
+        bbox = parse_bbox_arg()
+        date_filter = request.args.get('date')
+
+        tree, error = _risk_zone_cluster_tree(date_filter)
+        if error is not None:
+            return error
+
+        clusters = tree.query(zoom, bbox)
+        return json_response({
+            'zoom': zoom,
+            'filters_applied': {
+                'bbox': list(bbox) if bbox is not None else None,
+                'date': date_filter
+            },
+            'count': len(clusters),
+            'clusters': clusters
+        })
+
+    except SpatialQueryError as e:
+        return jsonify({'error': Config.ERROR_MESSAGES['INVALID_PARAMETERS'], 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@data_bp.route('/clusters/<int:cluster_id>/children', methods=['GET'])
+@conditional_get('RISK_ZONES')
+def get_cluster_children(cluster_id):
+    """Get the clusters and cities a cluster splits into at its expansion zoom"""
+    try:
+        date_filter = request.args.get('date')
+        tree, error = _risk_zone_cluster_tree(date_filter)
+        if error is not None:
+            return error
+
+        children = tree.children(cluster_id)
+        if children is None:
+            return jsonify({'error': f'Cluster {cluster_id} not found'}), 404
+
+        return json_response({
+            'cluster_id': cluster_id,
+            'zoom': tree.formed_at[cluster_id] + 1,
+            'count': len(children),
+            'children': children
+        })
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @data_bp.route('/dates', methods=['GET'])
+@conditional_get('7DAY_PREDICTIONS')
 def get_available_dates():
     """Get list of available forecast dates"""
     try:
         data_loader = current_app.data_loader
-        predictions = data_loader.load_7day_predictions()
-        
-        if predictions is None:
+        df = data_loader.get_frame('7DAY_PREDICTIONS')
+
+        if df is None:
             return jsonify({
                 'error': 'No predictions available'
             }), 404
-        
-        # Get unique dates
-        dates = sorted(list(set([p['Date'] for p in predictions])))
-        
-        # Calculate summary for each date
-        date_summaries = []
-        for date in dates:
-            date_predictions = [p for p in predictions if p['Date'] == date]
-            df = pd.DataFrame(date_predictions)
-            
-            date_summaries.append({
-                'date': date,
-                'total_cities': len(date_predictions),
-                'high_risk_cities': len(df[df['Predicted_Flood_Risk'] == 1]),
-                'average_probability': round(df['Flood_Probability'].mean(), 3)
-            })
-        
-        return jsonify(to_serializable({
+
+        # Summary for each date in one grouped pass
+        per_date = df.groupby('Date').agg(
+            total_cities=('City', 'size'),
+            high_risk_cities=('Predicted_Flood_Risk', lambda x: int((x == 1).sum())),
+            average_probability=('Flood_Probability', 'mean')
+        ).sort_index()
+        per_date['average_probability'] = per_date['average_probability'].round(3)
+        dates = per_date.index.tolist()
+
+        return json_response({
             'available_dates': dates,
-            'date_summaries': date_summaries,
+            'date_summaries': per_date.rename_axis('date').reset_index(),
             'forecast_period': f"{len(dates)} days"
-        }))
-        
+        }, fields=parse_fields_arg())
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @data_bp.route('/export/<data_type>', methods=['GET'])
+@conditional_get('7DAY_PREDICTIONS', 'DAILY_SUMMARY', 'CITY_SUMMARY', 'RISK_ZONES', 'FINAL_PLOT')
 def export_data(data_type):
     """Export specific data type as JSON"""
     try:
         data_loader = current_app.data_loader
-        
-        export_functions = {
-            '7day': data_loader.load_7day_predictions,
-            'daily': data_loader.load_daily_summary,
-            'cities': data_loader.load_city_summary,
-            'risk_zones': data_loader.load_risk_zones,
-            'plotting': data_loader.load_plotting_data
-        }
-        
-        if data_type not in export_functions:
+
+        if data_type not in EXPORT_DATA_KEYS:
             return jsonify({
                 'error': f'Invalid data type: {data_type}',
-                'available_types': list(export_functions.keys())
+                'available_types': list(EXPORT_DATA_KEYS.keys())
             }), 400
-        
-        data = export_functions[data_type]()
-        
+
+        key = EXPORT_DATA_KEYS[data_type]
+        data = data_loader.get_frame(key)
+
         if data is None:
             return jsonify({
                 'error': f'No data available for type: {data_type}'
             }), 404
-        
-        return jsonify(to_serializable({
+
+        # When the exported file was written, so the body is stable for its ETag
+        return json_response({
             'data_type': data_type,
             'data': data,
             'count': len(data),
-            'exported_at': pd.Timestamp.now().isoformat()
-        }))
-        
+            'exported_at': pd.Timestamp.fromtimestamp(data_loader.last_modified([key])).isoformat()
+        }, fields=parse_fields_arg())
+
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
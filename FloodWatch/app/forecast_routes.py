@@ -1,279 +1,328 @@
 from flask import Blueprint, jsonify, request, current_app
-from data_loader import to_serializable
-import pandas as pd
+from config import Config
+from http_cache import conditional_get, cached_json_response
+from json_encoding import json_response, group_rows_by_city
+from pagination import PaginationError, SortedView, parse_pagination_args, sorted_view
+from projection import parse_fields_arg
+from columnar import columnar_response, negotiate_format
+from spatial_index import SpatialQueryError, parse_bbox_arg, spatial_index
+import numpy as np
 
 forecast_bp = Blueprint('forecast', __name__)
 
+def build_7day_payload(df, city_filter, date_filter, group_by_city, page_info=None, fields=None, bbox=None):
+    """Shape the /7day response from a City/Date-sorted predictions frame"""
+    filters_applied = {
+        'city': city_filter,
+        'date': date_filter,
+        'bbox': list(bbox) if bbox is not None else None,
+        'group_by_city': group_by_city
+    }
+
+    if len(df) > 0:
+        if group_by_city:
+            grouped_output = group_rows_by_city(df, fields)
+
+            response_payload = {
+                'predictions': grouped_output,
+                'grouped': True,
+                'city_count': len(grouped_output),
+                'filters_applied': filters_applied
+            }
+        else:
+            response_payload = {
+                'predictions': df,
+                'count': len(df),
+                'grouped': False,
+                'filters_applied': filters_applied
+            }
+    else:
+        response_payload = {
+            'predictions': [],
+            'count': 0,
+            'grouped': group_by_city,
+            'filters_applied': filters_applied
+        }
+
+    if page_info is not None:
+        response_payload['pagination'] = page_info
+
+    return response_payload
+
 @forecast_bp.route('/7day', methods=['GET'])
+@conditional_get('7DAY_PREDICTIONS', columnar=True)
 def get_7day_forecast():
     """Get complete 7-day flood predictions for all cities"""
     try:
         data_loader = current_app.data_loader
-        predictions = data_loader.load_7day_predictions()
-        
+        city_filter = request.args.get('city')
+        date_filter = request.args.get('date')
+        # Group by city by default; clients can opt out with group_by_city=false
+        group_by_city = request.args.get('group_by_city', 'true').lower() == 'true'
+        # Optional map viewport, bbox=west,south,east,north
+        bbox = parse_bbox_arg()
+        # Optional cursor pagination (limit counts cities when grouped, rows otherwise)
+        pagination = parse_pagination_args(group_by_city)
+        # Optional column projection, e.g. fields=City,Date,Flood_Probability
+        fields = parse_fields_arg()
+        # Arrow / MessagePack when the Accept header asks for them
+        columnar_format = negotiate_format()
+
+        # The unfiltered document only changes with the data file; serve pre-encoded bytes
+        if (not city_filter and not date_filter and bbox is None and pagination is None
+                and fields is None and columnar_format is None):
+            response = cached_json_response(
+                f"7day:grouped={group_by_city}", ('7DAY_PREDICTIONS',),
+                lambda snapshots: build_7day_payload(
+                    sorted_view(snapshots['7DAY_PREDICTIONS']).frame, None, None, group_by_city
+                )
+            )
+            if response is not None:
+                return response
+
+        predictions = data_loader.snapshot('7DAY_PREDICTIONS')
+
         if predictions is None:
             return jsonify({
                 'error': 'No 7-day predictions available',
                 'message': 'Please run enhanced_forecast.py to generate predictions'
             }), 404
-        
-        # Optional city filter
-        city_filter = request.args.get('city')
-        if city_filter:
-            predictions = [
-                p for p in predictions 
-                if p['City'].lower() == city_filter.lower()
-            ]
-        
-        # Optional date filter
-        date_filter = request.args.get('date')
-        if date_filter:
-            predictions = [
-                p for p in predictions 
-                if p['Date'] == date_filter
-            ]
-        # Group by city by default; clients can opt out with group_by_city=false
-        group_by_city = request.args.get('group_by_city', 'true').lower() == 'true'
 
-        # Build DataFrame for sorting and potential grouping
-        df = pd.DataFrame(predictions)
-        if len(df) > 0:
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-            sort_cols = ['City'] + (['Date'] if 'Date' in df.columns else [])
-            df = df.sort_values(sort_cols).reset_index(drop=True)
-
-            if group_by_city:
-                grouped_output = []
-                for city, g in df.groupby('City', sort=False):
-                    g_out = g.copy()
-                    if 'Date' in g_out.columns:
-                        g_out['Date'] = g_out['Date'].dt.strftime('%Y-%m-%d')
-                    days = g_out.to_dict('records')
-                    lat = float(g.iloc[0]['Latitude']) if 'Latitude' in g.columns else None
-                    lon = float(g.iloc[0]['Longitude']) if 'Longitude' in g.columns else None
-                    grouped_output.append({
-                        'City': city,
-                        'coordinates': {'lat': lat, 'lon': lon} if lat is not None and lon is not None else None,
-                        'days': days,
-                        'day_count': len(days)
-                    })
-
-                response_payload = {
-                    'predictions': grouped_output,
-                    'grouped': True,
-                    'city_count': len(grouped_output),
-                    'filters_applied': {
-                        'city': city_filter,
-                        'date': date_filter,
-                        'group_by_city': group_by_city
-                    }
-                }
-            else:
-                df_out = df.copy()
-                if 'Date' in df_out.columns:
-                    df_out['Date'] = df_out['Date'].dt.strftime('%Y-%m-%d')
-                flat_sorted = df_out.to_dict('records')
-
-                response_payload = {
-                    'predictions': flat_sorted,
-                    'count': len(flat_sorted),
-                    'grouped': False,
-                    'filters_applied': {
-                        'city': city_filter,
-                        'date': date_filter,
-                        'group_by_city': group_by_city
-                    }
-                }
+        # Optional city, date and bbox filters, resolved through the snapshot indexes
+        if city_filter or date_filter or bbox is not None:
+            rows = predictions.index().select(city=city_filter, date=date_filter)
+            if bbox is not None:
+                rows = spatial_index(predictions).bbox_rows(bbox, rows)
+            view = SortedView(predictions.take(rows, as_frame=True))
         else:
-            response_payload = {
-                'predictions': [],
-                'count': 0,
-                'grouped': group_by_city,
-                'filters_applied': {
-                    'city': city_filter,
-                    'date': date_filter,
-                    'group_by_city': group_by_city
-                }
-            }
+            view = sorted_view(predictions)
+
+        df, page_info = view.page(group_by_city, *pagination) if pagination else (view.frame, None)
+
+        if columnar_format is not None:
+            # Columnar formats are always flat; rows stay in City/Date order
+            payload = build_7day_payload(df, city_filter, date_filter, False, page_info, bbox=bbox)
+            return columnar_response(payload, 'predictions', df, columnar_format, fields)
+
+        return json_response(build_7day_payload(
+            df, city_filter, date_filter, group_by_city, page_info, fields, bbox
+        ), fields=fields)
 
-        return jsonify(to_serializable(response_payload))
-        
+    except (PaginationError, SpatialQueryError) as e:
+        return jsonify({'error': Config.ERROR_MESSAGES['INVALID_PARAMETERS'], 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def segment_summaries(df, bounds):
+    """Risk/probability reductions for consecutive row segments of df in one pass.
+
+    bounds are the segment start offsets followed by len(df); every segment
+    must be non-empty. Returns arrays with one entry per segment.
+    """
+    starts = np.asarray(bounds[:-1])
+    lengths = np.diff(bounds)
+    high_risk = df['Predicted_Flood_Risk'].to_numpy() == 1
+    probabilities = df['Flood_Probability'].to_numpy()
+    return {
+        'rows': lengths,
+        'high_risk': np.add.reduceat(high_risk.astype(np.int64), starts),
+        'mean_probability': np.add.reduceat(probabilities, starts) / lengths,
+        'max_probability': np.maximum.reduceat(probabilities, starts),
+        'first_probability': probabilities[starts],
+        'last_probability': probabilities[np.asarray(bounds[1:]) - 1]
+    }
+
+def build_city_forecast_payload(city_name, df, summaries=None, i=0):
+    """Shape the /city/<city_name> response (summaries: segment_summaries row i)"""
+    if summaries is None:
+        summaries = segment_summaries(df, [0, len(df)])
+    return {
+        'city': city_name,
+        'forecast_period': '7 days',
+        'daily_forecasts': df,
+        'summary': {
+            'high_risk_days': int(summaries['high_risk'][i]),
+            'total_days': int(summaries['rows'][i]),
+            'average_probability': round(float(summaries['mean_probability'][i]), 3),
+            'peak_probability': round(float(summaries['max_probability'][i]), 3),
+            'risk_trend': (
+                'increasing' if summaries['last_probability'][i] > summaries['first_probability'][i]
+                else 'decreasing'
+            )
+        }
+    }
+
+def build_date_forecast_payload(target_date, df, summaries=None, i=0):
+    """Shape the /date/<target_date> response (summaries: segment_summaries row i)"""
+    if summaries is None:
+        summaries = segment_summaries(df, [0, len(df)])
+    total_cities = int(summaries['rows'][i])
+    high_risk_cities = int(summaries['high_risk'][i])
+    return {
+        'date': target_date,
+        'city_forecasts': df,
+        'summary': {
+            'total_cities': total_cities,
+            'high_risk_cities': high_risk_cities,
+            'high_risk_percentage': round((high_risk_cities / total_cities) * 100, 1),
+            'average_probability': round(float(summaries['mean_probability'][i]), 3)
+        }
+    }
+
 @forecast_bp.route('/city/<city_name>', methods=['GET'])
+@conditional_get('7DAY_PREDICTIONS')
 def get_city_forecast(city_name):
     """Get 7-day forecast for a specific city"""
     try:
         data_loader = current_app.data_loader
-        city_forecast = data_loader.get_city_forecast(city_name)
-        
-        if city_forecast is None:
+        df = data_loader.get_city_forecast(city_name, as_frame=True)
+
+        if df is None:
             return jsonify({
                 'error': f'No forecast data available for {city_name}'
             }), 404
-        
-        # Calculate city-specific summary
-        df = pd.DataFrame(city_forecast)
-        high_risk_days = len(df[df['Predicted_Flood_Risk'] == 1])
-        avg_probability = df['Flood_Probability'].mean()
-        max_probability = df['Flood_Probability'].max()
-        
-        return jsonify(to_serializable({
-            'city': city_name,
-            'forecast_period': '7 days',
-            'daily_forecasts': city_forecast,
-            'summary': {
-                'high_risk_days': high_risk_days,
-                'total_days': len(city_forecast),
-                'average_probability': round(avg_probability, 3),
-                'peak_probability': round(max_probability, 3),
-                'risk_trend': 'increasing' if city_forecast[-1]['Flood_Probability'] > city_forecast[0]['Flood_Probability'] else 'decreasing'
-            }
-        }))
-        
+
+        return json_response(build_city_forecast_payload(city_name, df), fields=parse_fields_arg())
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @forecast_bp.route('/date/<target_date>', methods=['GET'])
+@conditional_get('7DAY_PREDICTIONS')
 def get_date_forecast(target_date):
     """Get all city forecasts for a specific date"""
     try:
         data_loader = current_app.data_loader
-        date_forecast = data_loader.get_date_forecast(target_date)
-        
-        if date_forecast is None:
+        df = data_loader.get_date_forecast(target_date, as_frame=True)
+
+        if df is None:
             return jsonify({
                 'error': f'No forecast data available for {target_date}'
             }), 404
-        
-        # Calculate date-specific summary
-        df = pd.DataFrame(date_forecast)
-        high_risk_cities = len(df[df['Predicted_Flood_Risk'] == 1])
-        avg_probability = df['Flood_Probability'].mean()
-        
-        return jsonify(to_serializable({
-            'date': target_date,
-            'city_forecasts': date_forecast,
-            'summary': {
-                'total_cities': len(date_forecast),
-                'high_risk_cities': high_risk_cities,
-                'high_risk_percentage': round((high_risk_cities / len(date_forecast)) * 100, 1),
-                'average_probability': round(avg_probability, 3)
-            }
-        }))
-        
+
+        return json_response(build_date_forecast_payload(target_date, df), fields=parse_fields_arg())
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def build_daily_summary_payload(daily_summary):
+    """Shape the /daily-summary response"""
+    return {
+        'daily_summary': daily_summary,
+        'period': f"{len(daily_summary)} days",
+        'description': 'Day-wise flood risk statistics across all monitored cities'
+    }
+
+def build_city_summary_payload(city_summary):
+    """Shape the /city-summary response, highest average risk first"""
+    # Sort by risk level
+    if 'Avg_Flood_Probability' in city_summary.columns:
+        sorted_summary = city_summary.sort_values(
+            'Avg_Flood_Probability', ascending=False, kind='stable'
+        )
+    else:
+        sorted_summary = city_summary
+
+    return {
+        'city_summary': sorted_summary,
+        'cities_count': len(city_summary),
+        'description': 'City-wise risk analysis over 7-day forecast period'
+    }
+
 @forecast_bp.route('/daily-summary', methods=['GET'])
+@conditional_get('DAILY_SUMMARY')
 def get_daily_summary():
     """Get daily summary statistics across all cities"""
     try:
-        data_loader = current_app.data_loader
-        daily_summary = data_loader.load_daily_summary()
-        
-        if daily_summary is None:
+        response = cached_json_response(
+            'daily-summary', ('DAILY_SUMMARY',),
+            lambda snapshots: build_daily_summary_payload(snapshots['DAILY_SUMMARY'].frame),
+            fields=parse_fields_arg()
+        )
+        if response is None:
             return jsonify({
                 'error': 'No daily summary available',
                 'message': 'Please run enhanced_plotting.py to generate summaries'
             }), 404
-        
-        return jsonify(to_serializable({
-            'daily_summary': daily_summary,
-            'period': f"{len(daily_summary)} days",
-            'description': 'Day-wise flood risk statistics across all monitored cities'
-        }))
-        
+
+        return response
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @forecast_bp.route('/city-summary', methods=['GET'])
+@conditional_get('CITY_SUMMARY')
 def get_city_summary():
     """Get city-wise summary statistics across the 7-day period"""
     try:
-        data_loader = current_app.data_loader
-        city_summary = data_loader.load_city_summary()
-        
-        if city_summary is None:
+        response = cached_json_response(
+            'city-summary', ('CITY_SUMMARY',),
+            lambda snapshots: build_city_summary_payload(snapshots['CITY_SUMMARY'].frame),
+            fields=parse_fields_arg()
+        )
+        if response is None:
             return jsonify({
                 'error': 'No city summary available',
                 'message': 'Please run enhanced_plotting.py to generate summaries'
             }), 404
-        
-        # Sort by risk level
-        sorted_summary = sorted(
-            city_summary, 
-            key=lambda x: x.get('Avg_Flood_Probability', 0), 
-            reverse=True
-        )
-        
-        return jsonify(to_serializable({
-            'city_summary': sorted_summary,
-            'cities_count': len(city_summary),
-            'description': 'City-wise risk analysis over 7-day forecast period'
-        }))
-        
+
+        return response
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @forecast_bp.route('/high-risk', methods=['GET'])
+@conditional_get('7DAY_PREDICTIONS')
 def get_high_risk_forecast():
     """Get only high-risk flood predictions"""
     try:
         data_loader = current_app.data_loader
-        
+
         # Optional date filter
         date_filter = request.args.get('date')
-        
-        if date_filter:
-            high_risk_cities = data_loader.get_high_risk_cities(date_filter)
-        else:
-            high_risk_cities = data_loader.get_high_risk_cities()
-        
-        if not high_risk_cities:
+
+        df = data_loader.get_high_risk_cities(date_filter, as_frame=True)
+
+        if df is None or len(df) == 0:
             return jsonify({
                 'message': 'No high-risk cities found',
                 'high_risk_predictions': [],
                 'count': 0
             })
-        
+
         # Calculate summary
-        df = pd.DataFrame(high_risk_cities)
         avg_probability = df['Flood_Probability'].mean()
         max_precipitation = df['Weather_Precip'].max()
         max_reservoir_fill = df['Max_Reservoir_Fill'].max()
-        
-        return jsonify(to_serializable({
-            'high_risk_predictions': high_risk_cities,
-            'count': len(high_risk_cities),
+
+        return json_response({
+            'high_risk_predictions': df,
+            'count': len(df),
             'date_filter': date_filter,
             'summary': {
                 'average_probability': round(avg_probability, 3),
                 'max_precipitation': round(max_precipitation, 1),
                 'max_reservoir_fill': round(max_reservoir_fill, 1),
-                'unique_cities': df['City'].nunique() if len(df) > 0 else 0
+                'unique_cities': df['City'].nunique()
             }
-        }))
-        
+        }, fields=parse_fields_arg())
+
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @forecast_bp.route('/trends', methods=['GET'])
+@conditional_get('7DAY_PREDICTIONS')
 def get_forecast_trends():
     """Get forecast trends analysis"""
     try:
         data_loader = current_app.data_loader
-        predictions = data_loader.load_7day_predictions()
-        
-        if predictions is None:
+        df = data_loader.get_frame('7DAY_PREDICTIONS')
+
+        if df is None:
             return jsonify({
                 'error': 'No predictions available for trend analysis'
             }), 404
-        
-        df = pd.DataFrame(predictions)
-        
+
         # Daily trends
         daily_trends = df.groupby('Date').agg({
             'Predicted_Flood_Risk': 'sum',
@@ -281,19 +330,19 @@ def get_forecast_trends():
             'Weather_Precip': 'mean',
             'Max_Reservoir_Fill': 'mean'
         }).round(3)
-        
+
         # City trends (cities with most risk days)
         city_trends = df.groupby('City').agg({
             'Predicted_Flood_Risk': 'sum',
             'Flood_Probability': 'mean'
         }).sort_values('Flood_Probability', ascending=False).head(10)
-        
+
         # Risk distribution
         risk_distribution = df['Flood_Probability'].describe()
-        
-        return jsonify(to_serializable({
-            'daily_trends': daily_trends.reset_index().to_dict('records'),
-            'top_risk_cities': city_trends.reset_index().to_dict('records'),
+
+        return json_response({
+            'daily_trends': daily_trends.reset_index(),
+            'top_risk_cities': city_trends.reset_index(),
             'risk_distribution': {
                 'count': int(risk_distribution['count']),
                 'mean': round(risk_distribution['mean'], 3),
@@ -304,7 +353,7 @@ def get_forecast_trends():
             },
             'forecast_period': f"{df['Date'].nunique()} days",
             'cities_monitored': df['City'].nunique()
-        }))
-        
+        }, fields=parse_fields_arg())
+
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,116 @@
+import hashlib
+import time
+from functools import wraps
+
+from flask import current_app, request
+
+from columnar import FORMAT_ETAG_SUFFIXES, negotiate_format
+from compression import EncodedDocument, negotiate_encoding
+from config import Config
+from json_encoding import encode_json
+
+
+def compute_etag(data_version, extra=''):
+    """Strong ETag for a request path + query string against a data version"""
+    args = '&'.join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    raw = f"{request.path}?{args}#{data_version}#{extra}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def cache_max_age(last_modified):
+    """Seconds until the next expected forecast run after last_modified"""
+    if last_modified is None:
+        return 0
+    next_run = last_modified + Config.FORECAST_RUN_INTERVAL.total_seconds()
+    return max(0, int(next_run - time.time()))
+
+
+def representation_etag(etag, mimetype):
+    """ETag for the format of a response (JSON keeps the plain tag)"""
+    suffix = FORMAT_ETAG_SUFFIXES.get(mimetype)
+    return f"{etag}-{suffix}" if suffix else etag
+
+
+def negotiated_etag(etag, columnar=False):
+    """ETag of the representation this request would be served.
+
+    Columnar formats add a suffix (see representation_etag) and
+    compression.compress_response adds one for the negotiated encoding.
+    """
+    if columnar:
+        etag = representation_etag(etag, negotiate_format())
+    encoding = negotiate_encoding()
+    return f"{etag}-{encoding}" if encoding else etag
+
+
+def conditional_get(*data_keys, columnar=False):
+    """Decorate a GET view with ETag / If-None-Match handling.
+
+    The ETag is derived from the request path, query parameters and the
+    version of data_keys in the SnapshotSet pinned on flask.g for this
+    request: the run published in data/CURRENT plus the file signatures
+    recorded when that set was loaded. A matching If-None-Match is
+    answered with 304 from that in-memory set, without touching the files
+    or running the view.
+    Only the tag of the format and encoding negotiated for this request
+    matches; columnar=True marks views that also serve Arrow/MessagePack.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            data_loader = current_app.data_loader
+            etag = compute_etag(data_loader.data_version(data_keys))
+            cache_control = f"public, max-age={cache_max_age(data_loader.last_modified(data_keys))}"
+
+            negotiated = negotiated_etag(etag, columnar)
+            if negotiated in request.if_none_match:
+                response = current_app.response_class(status=304)
+                etag = negotiated
+                # Same Vary as the 200 (compress_response does not see a 304)
+                if columnar:
+                    response.vary.add('Accept')
+                response.vary.add('Accept-Encoding')
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                etag = representation_etag(etag, response.mimetype)
+
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
+
+
+def cached_json_response(name, data_keys, build_payload, fields=None):
+    """Serve a document rendered to JSON bytes once per version of data_keys.
+
+    build_payload receives the snapshots for data_keys and returns the
+    response payload. Returns None when any of the data files is missing.
+    A column projection (fields) is rendered per request and not cached.
+    Cached documents also keep their gzip/brotli encodings, so a negotiated
+    compressed response costs no compression work after the first request.
+    """
+    def render(snapshots):
+        if any(snap is None for snap in snapshots.values()):
+            return None
+        return EncodedDocument(encode_json(build_payload(snapshots), fields))
+
+    data_loader = current_app.data_loader
+    if fields is not None:
+        document = render({key: data_loader.snapshot(key) for key in data_keys})
+    else:
+        document = data_loader.derive(f"json:{name}", data_keys, render)
+    if document is None:
+        return None
+
+    if fields is not None:
+        # Compressed on the fly by compression.compress_response
+        return current_app.response_class(document.body, mimetype='application/json')
+
+    body, encoding = document.variant(negotiate_encoding())
+    response = current_app.response_class(body, mimetype='application/json')
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,177 @@
+import json
+import math
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+from flask import current_app
+
+from projection import project_columns
+
+# Encode with the same float precision as Python's repr where pandas allows
+DOUBLE_PRECISION = 15
+
+
+class RawJSON:
+    """Already-encoded JSON fragment, written verbatim by encode_json"""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+
+def format_datetimes(df):
+    """Render datetime columns as 'YYYY-MM-DD' (or ISO when a time is present)"""
+    datetime_cols = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col])]
+    if not datetime_cols:
+        return df
+    df = df.copy()
+    for col in datetime_cols:
+        values = df[col]
+        has_time = (values.dropna() != values.dropna().dt.normalize()).any()
+        df[col] = values.dt.strftime('%Y-%m-%dT%H:%M:%S' if has_time else '%Y-%m-%d')
+    return df
+
+
+def frame_to_json(df):
+    """Serialize a DataFrame to a JSON array of row objects.
+
+    Encoding runs column-wise inside pandas: numpy dtypes map to JSON
+    numbers/booleans and NaN/NaT become null without per-value Python calls.
+    """
+    if len(df.columns) == 0:
+        return b'[' + b','.join([b'{}'] * len(df)) + b']'
+    return format_datetimes(df).to_json(
+        orient='records', double_precision=DOUBLE_PRECISION, force_ascii=False
+    ).encode('utf-8')
+
+
+def frame_rows_json(df):
+    """Serialize a DataFrame to one JSON object (bytes) per row"""
+    if len(df) == 0:
+        return []
+    if len(df.columns) == 0:
+        return [b'{}'] * len(df)
+    lines = format_datetimes(df).to_json(
+        orient='records', lines=True, double_precision=DOUBLE_PRECISION, force_ascii=False
+    ).encode('utf-8')
+    # Newlines inside string values are escaped, so each line is exactly one row
+    return lines.rstrip(b'\n').split(b'\n')
+
+
+def _encode_scalar(obj):
+    if obj is None:
+        return b'null'
+    if isinstance(obj, (bool, np.bool_)):
+        return b'true' if obj else b'false'
+    if isinstance(obj, (int, np.integer)):
+        return str(int(obj)).encode('ascii')
+    if isinstance(obj, (float, np.floating)):
+        value = float(obj)
+        return b'null' if math.isnan(value) or math.isinf(value) else repr(value).encode('ascii')
+    if isinstance(obj, pd.Timestamp):
+        return b'null' if pd.isna(obj) else json.dumps(obj.isoformat()).encode('utf-8')
+    if isinstance(obj, (datetime, date)):
+        return json.dumps(obj.isoformat()).encode('utf-8')
+    if obj is pd.NaT or (not isinstance(obj, str) and pd.isna(obj)):
+        return b'null'
+    return json.dumps(obj if isinstance(obj, str) else str(obj), ensure_ascii=False).encode('utf-8')
+
+
+def _encode_key(key):
+    """Object keys must be strings; multi-level (tuple) keys are joined with '|'"""
+    if isinstance(key, str):
+        return key
+    if isinstance(key, tuple):
+        return '|'.join(_encode_key(part) for part in key)
+    if isinstance(key, (pd.Timestamp, datetime, date)):
+        return key.isoformat()
+    if isinstance(key, (bool, np.bool_)):
+        return 'true' if key else 'false'
+    if isinstance(key, (int, np.integer)):
+        return str(int(key))
+    if isinstance(key, (float, np.floating)):
+        return repr(float(key))
+    return 'null' if key is None else str(key)
+
+
+def _encode(obj, out, fields):
+    if isinstance(obj, RawJSON):
+        out.append(obj.data)
+    elif isinstance(obj, pd.DataFrame):
+        out.append(frame_to_json(project_columns(obj, fields)))
+    elif isinstance(obj, pd.Series):
+        out.append(obj.to_json(orient='values', double_precision=DOUBLE_PRECISION).encode('utf-8'))
+    elif isinstance(obj, dict):
+        out.append(b'{')
+        first = True
+        for key, value in obj.items():
+            if not first:
+                out.append(b',')
+            first = False
+            out.append(json.dumps(_encode_key(key), ensure_ascii=False).encode('utf-8'))
+            out.append(b':')
+            _encode(value, out, fields)
+        out.append(b'}')
+    elif isinstance(obj, (list, tuple, np.ndarray)):
+        out.append(b'[')
+        for i, value in enumerate(obj):
+            if i:
+                out.append(b',')
+            _encode(value, out, fields)
+        out.append(b']')
+    else:
+        out.append(_encode_scalar(obj))
+
+
+def encode_json(payload, fields=None):
+    """Encode a response payload to JSON bytes.
+
+    DataFrames anywhere in the payload are serialized column-wise with
+    frame_to_json; the surrounding dicts/lists (small envelopes) are walked
+    in Python. numpy scalars are handled and NaN becomes null. When fields
+    is given, each DataFrame is cut down to those columns before encoding.
+    """
+    out = []
+    _encode(payload, out, fields)
+    return b''.join(out)
+
+
+def json_response(payload, status=200, fields=None):
+    """Flask response with the payload encoded by encode_json"""
+    return current_app.response_class(
+        encode_json(payload, fields), status=status, mimetype='application/json'
+    )
+
+
+def group_rows_by_city(df, fields=None):
+    """One entry per city (in frame order) with its rows as a pre-encoded 'days' array.
+
+    The frame is encoded once; rows are then sliced per city, so cost does
+    not grow with a per-city serialization call. fields limits the columns
+    encoded into 'days'; City and coordinates are always taken from df.
+    """
+    if len(df) == 0:
+        return []
+    rows = frame_rows_json(project_columns(df, fields))
+    cities = df['City'].to_numpy()
+    # Start of each run of equal city names (frame is sorted by City)
+    starts = np.flatnonzero(np.r_[True, cities[1:] != cities[:-1]])
+    stops = np.r_[starts[1:], len(df)]
+
+    lats = df['Latitude'].to_numpy() if 'Latitude' in df.columns else None
+    lons = df['Longitude'].to_numpy() if 'Longitude' in df.columns else None
+
+    grouped_output = []
+    for start, stop in zip(starts.tolist(), stops.tolist()):
+        # Use first row for coordinates if present
+        lat = float(lats[start]) if lats is not None else None
+        lon = float(lons[start]) if lons is not None else None
+        grouped_output.append({
+            'City': cities[start],
+            'coordinates': {'lat': lat, 'lon': lon} if lat is not None and lon is not None else None,
+            'days': RawJSON(b'[' + b','.join(rows[start:stop]) + b']'),
+            'day_count': stop - start
+        })
+    return grouped_output
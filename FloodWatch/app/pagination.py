@@ -0,0 +1,135 @@
+import base64
+import binascii
+import json
+
+import numpy as np
+from flask import request
+
+from config import Config
+from data_loader import sort_by_city_date
+
+# Separates City and Date in a row key; sorts below any printable character so
+# 'City<SEP>Date' strings order exactly like (City, Date) tuples
+KEY_SEPARATOR = '\x1f'
+# Rows with no parseable date sort last within their city
+MISSING_DATE = '\uffff'
+
+
+class PaginationError(ValueError):
+    """Raised for an invalid limit or cursor"""
+
+
+def encode_cursor(mode, key, seen=1):
+    raw = json.dumps({'m': mode, 'k': key, 'n': seen}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, mode):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        key, seen = data['k'], int(data.get('n', 1))
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise PaginationError('Malformed cursor')
+    if data.get('m') != mode or not isinstance(key, str) or seen < 0:
+        raise PaginationError('Cursor does not match this request (check group_by_city)')
+    return key, seen
+
+
+def parse_pagination_args(group_by_city):
+    """Read limit/cursor from the query string.
+
+    Returns None when neither is given (the full document is served), else
+    (limit, after) where after is the decoded cursor or None for page one.
+    limit counts cities when grouping by city and rows otherwise.
+    """
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    if limit is None and cursor is None:
+        return None
+
+    if limit is None:
+        limit = Config.DEFAULT_PAGINATION_SIZE
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise PaginationError('limit must be an integer')
+        if limit < 1:
+            raise PaginationError('limit must be at least 1')
+    limit = min(limit, Config.MAX_RECORDS_PER_REQUEST)
+
+    after = decode_cursor(cursor, 'city' if group_by_city else 'row') if cursor else None
+    return limit, after
+
+
+class SortedView:
+    """Frame presorted by City/Date with keys for O(log n + page) keyset paging"""
+
+    def __init__(self, frame, presorted=False):
+        self.frame = frame if presorted else sort_by_city_date(frame)
+
+        if len(self.frame) == 0:
+            self.row_keys = np.array([], dtype=object)
+            self.city_starts = np.array([], dtype=int)
+            self.cities = np.array([], dtype=object)
+            return
+
+        cities = self.frame['City'].astype(str)
+
+        if 'Date' in self.frame.columns:
+            dates = self.frame['Date'].fillna(MISSING_DATE).astype(str)
+            self.row_keys = (cities + KEY_SEPARATOR + dates).to_numpy(dtype=object)
+        else:
+            self.row_keys = cities.to_numpy(dtype=object)
+
+        city_values = cities.to_numpy(dtype=object)
+        self.city_starts = np.flatnonzero(np.r_[True, city_values[1:] != city_values[:-1]])
+        self.cities = city_values[self.city_starts]
+
+    def _page_info(self, limit, next_cursor):
+        return {
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+
+    def row_page(self, limit, after=None):
+        """Up to limit rows following the cursor position"""
+        start = 0
+        if after is not None:
+            key, seen = after
+            start = int(np.searchsorted(self.row_keys, key, side='left')) + seen
+        stop = min(start + limit, len(self.frame))
+        page = self.frame.iloc[start:stop]
+
+        next_cursor = None
+        if stop < len(self.frame) and stop > start:
+            last_key = self.row_keys[stop - 1]
+            first_of_key = int(np.searchsorted(self.row_keys, last_key, side='left'))
+            next_cursor = encode_cursor('row', last_key, stop - first_of_key)
+        return page, self._page_info(limit, next_cursor)
+
+    def city_page(self, limit, after=None):
+        """All rows of up to limit cities following the cursor city"""
+        first = 0
+        if after is not None:
+            first = int(np.searchsorted(self.cities, after[0], side='right'))
+        last = min(first + limit, len(self.cities))
+        if first >= last:
+            return self.frame.iloc[0:0], self._page_info(limit, None)
+
+        start = self.city_starts[first]
+        stop = self.city_starts[last] if last < len(self.cities) else len(self.frame)
+        next_cursor = encode_cursor('city', self.cities[last - 1]) if last < len(self.cities) else None
+        return self.frame.iloc[start:stop], self._page_info(limit, next_cursor)
+
+    def page(self, group_by_city, limit, after=None):
+        if group_by_city:
+            return self.city_page(limit, after)
+        return self.row_page(limit, after)
+
+
+def sorted_view(snapshot):
+    """The snapshot's rows presorted by City/Date, built once per data version"""
+    return snapshot.derive('sorted_view', lambda snap: SortedView(snap.frame))
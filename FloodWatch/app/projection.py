@@ -0,0 +1,69 @@
+from flask import g, has_request_context, jsonify, request
+
+from config import Config
+
+# Shorthand field names accepted by ?fields= that expand to several columns
+FIELD_ALIASES = {
+    'coordinates': ('Latitude', 'Longitude')
+}
+
+
+def parse_fields_arg():
+    """Read the comma-separated ?fields= column list.
+
+    Returns None when the parameter is absent or empty (all columns are
+    served), else a frozenset of requested column names with aliases expanded.
+    """
+    return parse_fields(request.args.get('fields'))
+
+
+def parse_fields(raw):
+    """Column names from a comma-separated string or a list, as parse_fields_arg()"""
+    if not raw:
+        return None
+    names = raw.split(',') if isinstance(raw, str) else raw
+
+    fields = set()
+    for name in names:
+        name = str(name).strip()
+        if name:
+            fields.update(FIELD_ALIASES.get(name.lower(), (name,)))
+    return frozenset(fields) or None
+
+
+def project_columns(df, fields):
+    """Keep only the requested columns of df, in frame order.
+
+    Names missing from df are skipped so one fields list can be applied to
+    every table in a response; the columns kept are recorded for the
+    request, and reject_unknown_fields answers 400 for names that matched
+    no table at all. Only the kept columns are copied.
+    """
+    if fields is None:
+        return df
+    columns = [col for col in df.columns if col in fields]
+    if has_request_context():
+        g.projected_fields = fields
+        g.projected_columns = g.get('projected_columns', frozenset()).union(columns)
+    return df[columns]
+
+
+def reject_unknown_fields(response):
+    """after_request hook: 400 when a requested field is a column of no table in the response"""
+    fields = g.get('projected_fields')
+    if fields is None or response.status_code != 200:
+        return response
+    unknown = fields - g.projected_columns
+    if not unknown:
+        return response
+    response = jsonify({
+        'error': Config.ERROR_MESSAGES['INVALID_PARAMETERS'],
+        'message': f"Unknown fields: {', '.join(sorted(unknown))}"
+    })
+    response.status_code = 400
+    return response
+
+
+def init_projection(app):
+    """Reject ?fields= names that match no column of the response"""
+    app.after_request(reject_unknown_fields)
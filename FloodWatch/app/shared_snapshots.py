@@ -0,0 +1,88 @@
+import fcntl
+import glob
+import hashlib
+import os
+import tempfile
+
+try:
+    import pyarrow as pa
+except ImportError:  # without pyarrow each process keeps its own parsed copy
+    pa = None
+
+SHARED_SNAPSHOTS_AVAILABLE = pa is not None
+
+
+def default_snapshot_dir(data_dir):
+    """Per-data-directory folder on a RAM-backed filesystem when available"""
+    root = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    tag = hashlib.sha1(os.path.abspath(data_dir).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(root, f"floodwatch-{tag}")
+
+
+class SharedSnapshotStore:
+    """Parsed data files published once as Arrow IPC files and memory-mapped by every worker.
+
+    Each parsed frame is written to <key>-<mtime>-<size>.arrow, named after
+    the (mtime_ns, size) signature of the source file, which serves as the
+    version. The first process to need a version parses the source under an
+    exclusive file lock; every other process (gunicorn worker) maps the
+    published file read-only, so no worker parses the CSV again.
+
+    Only numeric columns stay zero-copy in the shared page cache. Text
+    columns (City, Date, categories, explanations) are converted to Python
+    objects in every process, and DataSnapshot.records() builds its list of
+    dicts per process too, so the saving is bounded by the numeric share of
+    the data.
+
+    The directory is not removed on shutdown: the next start reuses the
+    files whose source version has not changed, and _publish() unlinks older
+    versions. Delete it by hand (or point FLOODWATCH_SNAPSHOT_DIR elsewhere)
+    to discard them.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key, signature):
+        mtime_ns, size = signature
+        return os.path.join(self.directory, f"{key}-{mtime_ns:x}-{size:x}.arrow")
+
+    def load(self, key, signature, parse):
+        """DataFrame for this version of key, publishing parse() if nobody has yet"""
+        path = self._path(key, signature)
+        if not os.path.exists(path):
+            with open(os.path.join(self.directory, f"{key}.lock"), 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    # Another worker may have published while we waited
+                    if not os.path.exists(path):
+                        self._publish(key, path, parse())
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+        return self._attach(path)
+
+    def _publish(self, key, path, frame):
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+        # Older versions are unlinked; processes that still map them keep
+        # their pages until they move on to the new version
+        for old_path in glob.glob(os.path.join(self.directory, f"{key}-*.arrow")):
+            if old_path != path:
+                try:
+                    os.remove(old_path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _attach(path):
+        source = pa.memory_map(path, 'r')
+        table = pa.ipc.open_file(source).read_all()
+        # split_blocks keeps each numeric column as its own zero-copy block;
+        # text columns become per-process Python objects
+        return table.to_pandas(split_blocks=True)
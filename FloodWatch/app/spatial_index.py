@@ -0,0 +1,202 @@
+"""
+Spatial index over the monitored locations of a snapshot.
+
+Each distinct (Latitude, Longitude) pair in a frame is one location. The
+locations are placed on the unit sphere and kept in a KD-tree, so nearest-N
+and within-radius lookups cost O(log n) per result instead of a distance
+computation per row, and a bounding box is answered as the smallest cap
+around it followed by an exact lat/lon test on the few candidates. Rows of
+each location are contiguous ranges of a location-sorted permutation (as
+FrameIndex does for cities), so a set of locations turns into row positions
+without scanning the frame.
+"""
+import numpy as np
+import pandas as pd
+from flask import request
+from scipy.spatial import cKDTree
+
+from config import Config
+
+# Mean Earth radius (IUGG), used to convert between km and chord length
+EARTH_RADIUS_KM = 6371.0088
+
+
+class SpatialQueryError(ValueError):
+    """Raised for an invalid bbox, point or radius"""
+
+
+def to_unit_vectors(lat, lon):
+    """Cartesian (x, y, z) on the unit sphere for degree lat/lon arrays"""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_for_km(km):
+    """Straight-line distance between unit vectors that are km apart on the surface"""
+    return 2.0 * np.sin(np.minimum(np.asarray(km, dtype=float) / EARTH_RADIUS_KM, np.pi) / 2.0)
+
+
+def km_for_chord(chord):
+    """Great-circle distance in km for a unit-sphere chord length"""
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.asarray(chord, dtype=float) / 2.0, 0.0, 1.0))
+
+
+def parse_bbox_arg():
+    """Read ?bbox=west,south,east,north (degrees, GeoJSON order).
+
+    Returns None when the parameter is absent, else a (west, south, east,
+    north) tuple. west > east describes a box crossing the antimeridian.
+    """
+    raw = request.args.get('bbox')
+    if raw is None:
+        return None
+    try:
+        west, south, east, north = (float(part) for part in raw.split(','))
+    except ValueError:
+        raise SpatialQueryError('bbox must be four numbers: west,south,east,north')
+    if not all(np.isfinite((west, south, east, north))):
+        raise SpatialQueryError('bbox must be four numbers: west,south,east,north')
+    if not (-90 <= south <= north <= 90):
+        raise SpatialQueryError('bbox latitudes must satisfy -90 <= south <= north <= 90')
+    if not (-180 <= west <= 180 and -180 <= east <= 180):
+        raise SpatialQueryError('bbox longitudes must be within [-180, 180]')
+    return west, south, east, north
+
+
+def parse_nearby_args():
+    """Read lat, lon, limit and radius_km for a nearest-locations query.
+
+    limit defaults to DEFAULT_NEARBY_LIMIT, or to every location within
+    radius_km when a radius is given, and is capped at MAX_RECORDS_PER_REQUEST.
+    """
+    values = {}
+    for name in ('lat', 'lon', 'limit', 'radius_km'):
+        raw = request.args.get(name)
+        if raw is None:
+            values[name] = None
+            continue
+        try:
+            values[name] = int(raw) if name == 'limit' else float(raw)
+        except ValueError:
+            raise SpatialQueryError(f"{name} must be {'an integer' if name == 'limit' else 'a number'}")
+
+    lat, lon, limit, radius_km = values['lat'], values['lon'], values['limit'], values['radius_km']
+    if lat is None or lon is None:
+        raise SpatialQueryError('lat and lon are required')
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise SpatialQueryError('lat must be within [-90, 90] and lon within [-180, 180]')
+    if radius_km is not None and not (radius_km >= 0 and np.isfinite(radius_km)):
+        raise SpatialQueryError('radius_km must be a non-negative number')
+    if limit is None:
+        limit = Config.MAX_RECORDS_PER_REQUEST if radius_km is not None else Config.DEFAULT_NEARBY_LIMIT
+    elif limit < 1:
+        raise SpatialQueryError('limit must be at least 1')
+    return lat, lon, min(limit, Config.MAX_RECORDS_PER_REQUEST), radius_km
+
+
+class SpatialIndex:
+    """KD-tree over the distinct locations of a frame.
+
+    Rows with missing coordinates, or 0 for either one (the placeholder the
+    city catalog also treats as missing), are not indexed. Each location
+    carries the city name of its first row.
+    """
+
+    def __init__(self, frame, city_col='City', lat_col='Latitude', lon_col='Longitude'):
+        self.size = len(frame)
+
+        if lat_col in frame.columns and lon_col in frame.columns:
+            lat = pd.to_numeric(frame[lat_col], errors='coerce').to_numpy(dtype=float)
+            lon = pd.to_numeric(frame[lon_col], errors='coerce').to_numpy(dtype=float)
+            indexed = np.flatnonzero(np.isfinite(lat) & np.isfinite(lon) & (lat != 0) & (lon != 0))
+        else:
+            lat = lon = np.empty(0)
+            indexed = np.empty(0, dtype=np.int64)
+
+        points, location_of_row = np.unique(
+            np.column_stack((lat[indexed], lon[indexed])), axis=0, return_inverse=True
+        )
+        location_of_row = location_of_row.reshape(-1)
+        # Location id of every row, -1 where the row is not indexed
+        self.row_locations = np.full(self.size, -1, dtype=np.int64)
+        self.row_locations[indexed] = location_of_row
+        self.order = indexed[np.argsort(location_of_row, kind='stable')]
+        self.counts = np.bincount(location_of_row, minlength=len(points))
+        self.starts = np.cumsum(self.counts) - self.counts
+
+        self.latitudes = points[:, 0]
+        self.longitudes = points[:, 1]
+        first_rows = self.order[self.starts]
+        if city_col in frame.columns:
+            self.cities = frame[city_col].to_numpy()[first_rows]
+        else:
+            self.cities = np.full(len(points), None, dtype=object)
+        self.tree = cKDTree(to_unit_vectors(self.latitudes, self.longitudes)) if len(points) else None
+
+    def __len__(self):
+        return len(self.latitudes)
+
+    def rows_for(self, locations):
+        """Row positions (ascending) of the given location ids"""
+        locations = np.asarray(locations, dtype=np.int64)
+        counts = self.counts[locations]
+        if counts.sum() == 0:
+            return self.order[:0]
+        # Expand each location's [start, start + count) range without a Python loop
+        offsets = np.repeat(self.starts[locations] - np.cumsum(counts) + counts, counts)
+        return np.sort(self.order[offsets + np.arange(counts.sum())])
+
+    def in_bbox(self, bbox):
+        """Location ids (ascending) inside a (west, south, east, north) box, edges included"""
+        west, south, east, north = bbox
+        if self.tree is None:
+            return np.empty(0, dtype=np.int64)
+
+        # Longitudinal width measured eastwards, so boxes may cross the antimeridian
+        width = (east - west) % 360 or (360.0 if east != west else 0.0)
+        center = to_unit_vectors([(south + north) / 2], [west + width / 2])[0]
+        if width > 180:
+            radius = 2.0
+        else:
+            # Distance from the centre grows towards the corners, so they bound the box
+            corners = to_unit_vectors([south, south, north, north], [west, east, west, east])
+            radius = np.sqrt(((corners - center) ** 2).sum(axis=1)).max() * (1 + 1e-9) + 1e-12
+
+        candidates = np.asarray(self.tree.query_ball_point(center, radius), dtype=np.int64)
+        lat = self.latitudes[candidates]
+        lon_offset = (self.longitudes[candidates] - west) % 360
+        inside = (lat >= south) & (lat <= north) & (lon_offset <= width)
+        return np.sort(candidates[inside])
+
+    def bbox_rows(self, bbox, rows=None):
+        """Row positions (ascending) inside a box, optionally intersected with rows"""
+        bbox_rows = self.rows_for(self.in_bbox(bbox))
+        if rows is None:
+            return bbox_rows
+        return np.intersect1d(rows, bbox_rows, assume_unique=True)
+
+    def nearest(self, lat, lon, limit, radius_km=None):
+        """Up to limit (location ids, km distances) closest to a point, nearest first.
+
+        radius_km, when given, drops locations farther than that.
+        """
+        if self.tree is None or limit < 1:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        bound = np.inf if radius_km is None else chord_for_km(radius_km) * (1 + 1e-9)
+        point = to_unit_vectors([lat], [lon])[0]
+        chords, locations = self.tree.query(point, k=min(limit, len(self)), distance_upper_bound=bound)
+        chords, locations = np.atleast_1d(chords), np.atleast_1d(locations)
+        found = locations < len(self)
+        distances = km_for_chord(chords[found])
+        locations = locations[found]
+        if radius_km is not None:
+            keep = distances <= radius_km
+            locations, distances = locations[keep], distances[keep]
+        return locations, distances
+
+
+def spatial_index(snapshot):
+    """SpatialIndex of a snapshot's rows, built once per snapshot"""
+    return snapshot.derive('spatial', lambda snap: SpatialIndex(snap.frame))
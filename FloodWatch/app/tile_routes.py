@@ -0,0 +1,48 @@
+from flask import Blueprint, jsonify, request, current_app
+from config import Config
+from compression import negotiate_encoding
+from http_cache import conditional_get
+from vector_tiles import MVT_MIMETYPE, risk_zone_tiles
+
+tiles_bp = Blueprint('tiles', __name__)
+
+
+@tiles_bp.route('/<int:z>/<int:x>/<int:y>', methods=['GET'])
+@tiles_bp.route('/<int:z>/<int:x>/<int:y>.mvt', methods=['GET'])
+@conditional_get('RISK_ZONES')
+def get_risk_zone_tile(z, x, y):
+    """Get one XYZ tile of risk-zone points as a Mapbox Vector Tile.
+
+    The 'risk_zones' layer has one point per location, or per group of
+    nearby locations at low zooms, with city, count, max_probability,
+    mean_probability, alert_level and risk_level. Optional date= limits it
+    to one forecast day; by default each point summarises the whole week.
+    """
+    try:
+        if z > Config.TILE_MAX_ZOOM or x >= (1 << z) or y >= (1 << z):
+            return jsonify({
+                'error': Config.ERROR_MESSAGES['INVALID_PARAMETERS'],
+                'message': f'Tile coordinates must satisfy z <= {Config.TILE_MAX_ZOOM} and x, y < 2^z'
+            }), 400
+
+        risk_zones = current_app.data_loader.snapshot('RISK_ZONES')
+
+        if risk_zones is None:
+            return jsonify({
+                'error': 'No risk zones data available',
+                'message': 'Please run enhanced_plotting.py to generate risk zones'
+            }), 404
+
+        date_filter = request.args.get('date')
+        if date_filter and len(risk_zones.index().date_rows(date_filter)) == 0:
+            return jsonify({'error': f'No risk zones data available for {date_filter}'}), 404
+
+        document = risk_zone_tiles(risk_zones, date_filter).tile(z, x, y)
+        body, encoding = document.variant(negotiate_encoding())
+        response = current_app.response_class(body, mimetype=MVT_MIMETYPE)
+        if encoding is not None:
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
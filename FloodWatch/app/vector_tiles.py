@@ -0,0 +1,265 @@
+"""
+Mapbox Vector Tiles (MVT 2.1) of risk-zone points.
+
+A tile set covers one risk-zones snapshot, either for every forecast date
+or for one date. Rows are first reduced to one summary per location
+(through the snapshot's SpatialIndex). At each zoom the locations are then
+thinned on a screen-space grid of Config.TILE_CLUSTER_PX pixels: locations
+sharing a cell become one point feature placed at the cell's riskiest
+location, carrying the location count, the max/mean flood probability and
+the worst alert and risk level. The per-zoom point sets are computed once,
+and encoded tiles (with their compressed variants) are kept in an LRU, so
+panning and zooming is served from precomputed bytes for as long as the
+snapshot is current.
+
+The protobuf encoding is written out by hand; point tiles only need a
+small subset of the format.
+"""
+import struct
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from compression import EncodedDocument
+from config import Config
+from spatial_index import spatial_index
+
+MVT_MIMETYPE = 'application/vnd.mapbox-vector-tile'
+LAYER_NAME = 'risk_zones'
+
+# Severity order, least to most severe
+ALERT_LEVELS = ('GREEN', 'YELLOW', 'ORANGE', 'RED')
+RISK_LEVELS = ('Low', 'Medium', 'High', 'Critical')
+
+# Web Mercator stops short of the poles
+MAX_MERCATOR_LATITUDE = 85.0511287798
+
+_EMPTY_TILE = EncodedDocument(b'')
+
+
+def _varint(value):
+    out = bytearray()
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _zigzag(value):
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _key(number, wire_type):
+    return _varint((number << 3) | wire_type)
+
+
+def _length_delimited(number, payload):
+    return _key(number, 2) + _varint(len(payload)) + payload
+
+
+def _packed(number, values):
+    return _length_delimited(number, b''.join(_varint(value) for value in values))
+
+
+def _encode_value(value):
+    """Layer Value message for a str, bool, int or float"""
+    if isinstance(value, str):
+        return _length_delimited(1, value.encode('utf-8'))
+    if isinstance(value, (bool, np.bool_)):
+        return _key(7, 0) + _varint(int(value))
+    if isinstance(value, (int, np.integer)):
+        value = int(value)
+        return _key(5, 0) + _varint(value) if value >= 0 else _key(6, 0) + _varint(_zigzag(value))
+    # float_value (32-bit) is plenty for probabilities and halves the bytes of a double
+    return _key(2, 5) + struct.pack('<f', float(value))
+
+
+def encode_point_layer(name, points, extent):
+    """Encode one MVT layer of point features.
+
+    points is an iterable of (x, y, properties) with x/y in tile coordinates
+    (0..extent, points in the buffer fall outside). Properties that are None
+    or NaN are left out of the feature.
+    """
+    keys, values = {}, {}
+    features = []
+    for x, y, properties in points:
+        tags = []
+        for key, value in properties.items():
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                continue
+            key_index = keys.setdefault(key, len(keys))
+            value_index = values.setdefault((type(value).__name__, value), len(values))
+            tags.extend((key_index, value_index))
+        geometry = (9, _zigzag(x), _zigzag(y))  # MoveTo, count 1
+        features.append(_length_delimited(2, _packed(2, tags) + _key(3, 0) + _varint(1) + _packed(4, geometry)))
+
+    return b''.join([
+        _key(15, 0) + _varint(2),
+        _length_delimited(1, name.encode('utf-8')),
+        *features,
+        *(_length_delimited(3, key.encode('utf-8')) for key in keys),
+        *(_length_delimited(4, _encode_value(value)) for _, value in values),
+        _key(5, 0) + _varint(extent)
+    ])
+
+
+def mercator(lat, lon):
+    """Normalised Web Mercator (x, y) in [0, 1], y growing southwards"""
+    lat = np.clip(np.asarray(lat, dtype=float), -MAX_MERCATOR_LATITUDE, MAX_MERCATOR_LATITUDE)
+    x = (np.asarray(lon, dtype=float) + 180.0) / 360.0
+    y = 0.5 - np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) / (2 * np.pi)
+    return x, y
+
+
+def _ranks(series, levels):
+    """Severity rank of each value (position in levels), -1 when unknown"""
+    return series.map({level: rank for rank, level in enumerate(levels)}).fillna(-1).to_numpy(dtype=np.int64)
+
+
+def location_summaries(snapshot, date=None):
+    """Per-location summary of a risk-zones snapshot, over every date or one date.
+
+    Returns a dict of arrays aligned on the locations that have rows:
+    location (SpatialIndex id), city, latitude, longitude, days,
+    probability_sum / probability_count (NaN-skipping), max_probability,
+    alert_rank / risk_rank (worst day, -1 when unknown) and red_days /
+    orange_days.
+    """
+    frame = snapshot.frame
+    spatial = spatial_index(snapshot)
+    rows = snapshot.index().date_rows(date) if date else np.arange(len(frame))
+    rows = rows[spatial.row_locations[rows] >= 0]
+    locations, inverse = np.unique(spatial.row_locations[rows], return_inverse=True)
+    n = len(locations)
+
+    if 'Flood_Probability' in frame.columns:
+        probability = frame['Flood_Probability'].to_numpy(dtype=float)[rows]
+    else:
+        probability = np.full(len(rows), np.nan)
+    valid = ~np.isnan(probability)
+    max_probability = np.full(n, np.nan)
+    np.fmax.at(max_probability, inverse, probability)
+
+    alert = _ranks(frame['Alert_Level'], ALERT_LEVELS)[rows] if 'Alert_Level' in frame.columns \
+        else np.full(len(rows), -1)
+    risk = _ranks(frame['Risk_Level'], RISK_LEVELS)[rows] if 'Risk_Level' in frame.columns \
+        else np.full(len(rows), -1)
+    alert_rank = np.full(n, -1, dtype=np.int64)
+    risk_rank = np.full(n, -1, dtype=np.int64)
+    np.maximum.at(alert_rank, inverse, alert)
+    np.maximum.at(risk_rank, inverse, risk)
+
+    return {
+        'location': locations,
+        'city': spatial.cities[locations],
+        'latitude': spatial.latitudes[locations],
+        'longitude': spatial.longitudes[locations],
+        'days': np.bincount(inverse, minlength=n),
+        'probability_sum': np.bincount(inverse, weights=np.where(valid, probability, 0.0), minlength=n),
+        'probability_count': np.bincount(inverse, weights=valid, minlength=n),
+        'max_probability': max_probability,
+        'alert_rank': alert_rank,
+        'risk_rank': risk_rank,
+        'red_days': np.bincount(inverse, weights=alert == ALERT_LEVELS.index('RED'), minlength=n).astype(np.int64),
+        'orange_days': np.bincount(inverse, weights=alert == ALERT_LEVELS.index('ORANGE'), minlength=n).astype(np.int64)
+    }
+
+
+class TileSet:
+    """Risk-zone vector tiles of one snapshot (all dates or a single date)"""
+
+    def __init__(self, snapshot, date=None):
+        self.summaries = location_summaries(snapshot, date)
+        self.x, self.y = mercator(self.summaries['latitude'], self.summaries['longitude'])
+        self._levels = {}
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def level(self, zoom):
+        """Thinned point features for a zoom, built once"""
+        level = self._levels.get(zoom)
+        if level is None:
+            level = self._build_level(zoom)
+            self._levels[zoom] = level
+        return level
+
+    def _build_level(self, zoom):
+        s = self.summaries
+        cells_per_axis = (1 << zoom) * (256 // Config.TILE_CLUSTER_PX)
+        cell_x = np.minimum((self.x * cells_per_axis).astype(np.int64), cells_per_axis - 1)
+        cell_y = np.minimum((self.y * cells_per_axis).astype(np.int64), cells_per_axis - 1)
+        cells, inverse = np.unique(cell_x * cells_per_axis + cell_y, return_inverse=True)
+        n = len(cells)
+
+        # Representative of each cell: its riskiest location (first by max probability)
+        ranked = np.lexsort((-np.nan_to_num(s['max_probability'], nan=-1.0), inverse))
+        representative = ranked[np.searchsorted(inverse[ranked], np.arange(n))]
+
+        counts = np.bincount(inverse, weights=s['probability_count'], minlength=n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_probability = np.bincount(inverse, weights=s['probability_sum'], minlength=n) / counts
+        alert_rank = np.full(n, -1, dtype=np.int64)
+        risk_rank = np.full(n, -1, dtype=np.int64)
+        np.maximum.at(alert_rank, inverse, s['alert_rank'])
+        np.maximum.at(risk_rank, inverse, s['risk_rank'])
+
+        # Draw order: riskiest points last so they render on top
+        order = np.argsort(np.nan_to_num(s['max_probability'][representative], nan=-1.0), kind='stable')
+        return {
+            'x': self.x[representative][order],
+            'y': self.y[representative][order],
+            'city': s['city'][representative][order],
+            'count': np.bincount(inverse, minlength=n)[order],
+            'max_probability': s['max_probability'][representative][order],
+            'mean_probability': mean_probability[order],
+            'alert_rank': alert_rank[order],
+            'risk_rank': risk_rank[order]
+        }
+
+    def _render(self, zoom, x, y):
+        level = self.level(zoom)
+        extent = Config.TILE_EXTENT
+        scale = 1 << zoom
+        tile_x = (level['x'] * scale - x) * extent
+        tile_y = (level['y'] * scale - y) * extent
+        buffer = Config.TILE_BUFFER
+        inside = np.flatnonzero((tile_x >= -buffer) & (tile_x <= extent + buffer) &
+                                (tile_y >= -buffer) & (tile_y <= extent + buffer))
+        if len(inside) == 0:
+            return _EMPTY_TILE
+
+        points = []
+        for i in inside:
+            points.append((int(round(tile_x[i])), int(round(tile_y[i])), {
+                'city': None if level['city'][i] is None else str(level['city'][i]),
+                'count': int(level['count'][i]),
+                'max_probability': round(float(level['max_probability'][i]), 3),
+                'mean_probability': round(float(level['mean_probability'][i]), 3),
+                'alert_level': ALERT_LEVELS[level['alert_rank'][i]] if level['alert_rank'][i] >= 0 else None,
+                'risk_level': RISK_LEVELS[level['risk_rank'][i]] if level['risk_rank'][i] >= 0 else None
+            }))
+        return EncodedDocument(_length_delimited(3, encode_point_layer(LAYER_NAME, points, extent)))
+
+    def tile(self, zoom, x, y):
+        """Encoded tile (an EncodedDocument) for XYZ tile coordinates"""
+        key = (zoom, x, y)
+        with self._lock:
+            document = self._tiles.get(key)
+            if document is not None:
+                self._tiles.move_to_end(key)
+                return document
+
+        document = self._render(zoom, x, y)
+        with self._lock:
+            self._tiles[key] = document
+            while len(self._tiles) > Config.TILE_CACHE_SIZE:
+                self._tiles.popitem(last=False)
+        return document
+
+
+def risk_zone_tiles(snapshot, date=None):
+    """TileSet of a risk-zones snapshot for a date (or all dates), built once per snapshot"""
+    return snapshot.derive(f"tiles:{date or ''}", lambda snap: TileSet(snap, date))
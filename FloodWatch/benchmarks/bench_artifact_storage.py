@@ -0,0 +1,107 @@
+"""
+Benchmark: CSV versus Parquet for an archive of daily forecast runs.
+
+Builds an archive of N daily runs of 7day_flood_predictions (each run is the
+current file shifted by one day), writes it with training/artifact_store.py,
+and measures in a fresh process each:
+  - full load (DataLoader._read_table)
+  - one-week date range (DataLoader.load_date_range, row groups pruned)
+reporting wall time and peak RSS.
+
+Requires pyarrow. Run from the FloodWatch directory:
+    python benchmarks/bench_artifact_storage.py [runs ...]
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'app'))
+sys.path.insert(0, os.path.join(project_root, 'training'))
+
+from artifact_store import parquet_path, pq, write_artifact
+from data_loader import DataLoader
+
+# Runs in the archive (one per day)
+DEFAULT_RUNS = (30, 365, 1095)
+
+
+def build_archive(runs, csv_path):
+    base = pd.read_csv(os.path.join(project_root, 'data', '7day_flood_predictions.csv'))
+    base_dates = pd.to_datetime(base['Date'])
+    frames = []
+    for run in range(runs):
+        frames.append(base.assign(Date=(base_dates + pd.Timedelta(days=run)).dt.strftime('%Y-%m-%d')))
+    archive = pd.concat(frames, ignore_index=True)
+    write_artifact(archive, csv_path, export_csv=True)
+    return len(archive)
+
+
+def child(mode, path, start_date, end_date):
+    """Run one measurement and print 'seconds peak_kb rows'"""
+    start = time.perf_counter()
+    if mode == 'full':
+        df = DataLoader._read_table('7DAY_PREDICTIONS', path)
+    else:
+        loader = DataLoader(os.path.join(os.path.dirname(os.path.dirname(path)), 'app'))
+        loader._file_path = lambda key, run_dir=None: path
+        df = loader.load_date_range('7DAY_PREDICTIONS', start_date, end_date)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{elapsed} {peak_kb} {len(df)}")
+
+
+def measure(mode, path, start_date='', end_date=''):
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', mode, path, start_date, end_date],
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[0]), int(output[1]) / 1024, int(output[2])
+
+
+def main(runs_list):
+    if pq is None:
+        sys.exit("pyarrow is required for this benchmark")
+
+    # Baseline RSS of a process that has only imported pandas/pyarrow
+    baseline_rss = measure('range', os.devnull, '0000-00-00', '0000-00-00')[1]
+
+    print(f"{'runs':>6} {'rows':>9} {'format':<8} {'MB':>7} {'full s':>8} {'full RSS':>9} "
+          f"{'week s':>8} {'week RSS':>9} {'week rows':>10}")
+    print('-' * 84)
+    for runs in runs_list:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_dir = os.path.join(tmp, 'data')
+            os.makedirs(data_dir)
+            csv_path = os.path.join(data_dir, '7day_flood_predictions.csv')
+            rows = build_archive(runs, csv_path)
+
+            # A week in the middle of the archive
+            first = pd.Timestamp('2025-08-20') + pd.Timedelta(days=runs // 2)
+            start_date = first.strftime('%Y-%m-%d')
+            end_date = (first + pd.Timedelta(days=6)).strftime('%Y-%m-%d')
+
+            for fmt, path in (('csv', csv_path), ('parquet', parquet_path(csv_path))):
+                full_time, full_rss, _ = measure('full', path)
+                week_time, week_rss, week_rows = measure('range', path, start_date, end_date)
+                print(f"{runs:>6} {rows:>9} {fmt:<8} {os.path.getsize(path) / 2**20:>7.1f} "
+                      f"{full_time:>8.3f} {full_rss - baseline_rss:>7.0f}MB "
+                      f"{week_time:>8.3f} {week_rss - baseline_rss:>7.0f}MB {week_rows:>10}")
+    print(f"\nRSS is peak resident memory above a {baseline_rss:.0f} MB baseline process")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        mode, path, start_date, end_date = sys.argv[2:6]
+        if path == os.devnull:
+            print(f"0 {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss} 0")
+        else:
+            child(mode, path, start_date or None, end_date or None)
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or DEFAULT_RUNS)
@@ -0,0 +1,52 @@
+"""
+Benchmark: one POST /api/batch versus one request per city and date.
+
+Loads a dashboard page's worth of data (every city's forecast plus every
+forecast date) through the Flask test client, first as individual
+/api/forecast/city/<city> and /api/forecast/date/<date> requests, then as
+a single batch, and checks that both return the same payloads.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_batch.py
+"""
+import os
+import sys
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from app import create_app
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    client = create_app().test_client()
+    predictions = client.get('/api/forecast/7day?group_by_city=false&fields=City,Date').get_json()['predictions']
+    cities = sorted({row['City'] for row in predictions})
+    dates = sorted({row['Date'] for row in predictions})
+    urls = [f"/api/forecast/city/{city}" for city in cities] + [f"/api/forecast/date/{date}" for date in dates]
+    queries = ([{'type': 'city_forecast', 'city': city} for city in cities] +
+               [{'type': 'date_forecast', 'date': date} for date in dates])
+
+    single_time, singles = best_of(lambda: [client.get(url).get_json() for url in urls])
+    batch_time, batch = best_of(lambda: client.post('/api/batch', json={'queries': queries}).get_json())
+
+    assert [result['data'] for result in batch['results']] == singles, "batch payloads differ"
+    print(f"{len(cities)} cities + {len(dates)} dates")
+    print(f"individual: {len(urls):>3} requests  {single_time * 1000:8.1f} ms")
+    print(f"batch:      {1:>3} request   {batch_time * 1000:8.1f} ms  ({single_time / batch_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: /api/analysis/city-comparison metrics, per-city scans versus one
+grouped aggregation over the normalized-city index.
+
+Replicates the 7-day predictions to many more cities, then compares the
+previous implementation (a full-frame str.lower() scan per requested city)
+with analysis_aggregates.compare_city_metrics for growing request sizes,
+checking that both give the same metrics.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_city_comparison.py [city_copies]
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from analysis_aggregates import compare_city_metrics
+from data_loader import DataSnapshot
+
+REQUEST_SIZES = (10, 100, 500)
+
+
+def scan_per_city(df, cities):
+    """The previous implementation: one full scan per requested city"""
+    results = []
+    for city in cities:
+        city_data = df[df['City'].str.lower() == city.lower()]
+        if len(city_data) == 0:
+            results.append(None)
+            continue
+        results.append((
+            int(city_data['Predicted_Flood_Risk'].sum()), len(city_data),
+            round(city_data['Flood_Probability'].mean(), 3), round(city_data['Flood_Probability'].max(), 3)
+        ))
+    return results
+
+
+def grouped(snapshot, cities):
+    metrics = compare_city_metrics(snapshot, cities)
+    results = []
+    for code in metrics['codes']:
+        i = metrics['rows'].get(code)
+        if i is None:
+            results.append(None)
+            continue
+        results.append((
+            int(metrics['high_risk_days'][i]), int(metrics['total_forecast_days'][i]),
+            round(metrics['average_probability'][i], 3), round(metrics['peak_probability'][i], 3)
+        ))
+    return results
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(copies):
+    base = pd.read_csv(os.path.join(project_root, 'data', '7day_flood_predictions.csv'))
+    df = pd.concat([base.assign(City=base['City'] + f"_{i}") for i in range(copies)], ignore_index=True)
+    snapshot = DataSnapshot('7DAY_PREDICTIONS', None, (0, 0), df)
+    snapshot.index()
+    names = sorted(df['City'].unique())
+    print(f"{len(df)} rows, {len(names)} cities\n")
+    print(f"{'cities':>7} {'per-city scan ms':>17} {'grouped ms':>11} {'speedup':>8}")
+    print('-' * 46)
+    for size in REQUEST_SIZES:
+        cities = [random.choice(names).upper() for _ in range(size - 1)] + ['Nowhere']
+        scan_time, expected = best_of(lambda: scan_per_city(df, cities))
+        grouped_time, result = best_of(lambda: grouped(snapshot, cities))
+        assert all(a == b or (a and b and np.allclose(a, b)) for a, b in zip(expected, result)), "metrics differ"
+        print(f"{size:>7} {scan_time * 1000:>17.1f} {grouped_time * 1000:>11.2f} {scan_time / grouped_time:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
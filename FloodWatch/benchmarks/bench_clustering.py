@@ -0,0 +1,85 @@
+"""
+Benchmark: server-side clusters versus every city marker at state-wide zoom.
+
+Replicates the risk zones to growing numbers of locations scattered over
+Maharashtra and reports, for the state viewport at zoom 6 and a district
+viewport at zoom 9:
+  - markers: the bbox-filtered, city-grouped /risk-zones JSON (gzip)
+  - clusters: the /data/clusters response (gzip) and its element count
+plus the one-off ClusterTree build time per snapshot/date and the query
+time. Checks that every level accounts for all locations and alerts.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_clustering.py [city_copies ...]
+"""
+import gzip
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from clustering import ClusterTree
+from data_loader import DataSnapshot, sort_by_city_date
+from data_routes import build_risk_zones_payload
+from json_encoding import encode_json
+from spatial_index import spatial_index
+
+DEFAULT_COPIES = (1, 10, 100, 1000)
+VIEWPORTS = (('state', 6, (72.5, 15.5, 81.0, 22.2)), ('district', 9, (73.5, 18.2, 74.4, 18.9)))
+
+
+def replicate(base, copies, rng):
+    if copies == 1:
+        return base
+    cities = base['City'].unique()
+    frames = []
+    for i in range(copies):
+        shift = {city: rng.uniform(-1.5, 1.5, 2) for city in cities}
+        frames.append(base.assign(
+            City=base['City'] + f"_{i}",
+            Latitude=base['Latitude'] + base['City'].map(lambda city: shift[city][0]),
+            Longitude=base['Longitude'] + base['City'].map(lambda city: shift[city][1])
+        ))
+    return pd.concat(frames, ignore_index=True)
+
+
+def main(copy_counts):
+    rng = np.random.default_rng(5)
+    base = pd.read_csv(os.path.join(project_root, 'data', 'risk_zones.csv'))
+    print(f"{'locations':>9} {'build ms':>9} {'view':<9} {'markers kB':>10} "
+          f"{'clusters':>8} {'clusters kB':>11} {'query ms':>9}")
+    print('-' * 72)
+    for copies in copy_counts:
+        df = replicate(base, copies, rng)
+        snapshot = DataSnapshot('RISK_ZONES', None, (0, 0), df)
+        start = time.perf_counter()
+        tree = ClusterTree(snapshot)
+        build = time.perf_counter() - start
+
+        alerts = int(df['Alert_Level'].isin(['RED', 'ORANGE']).sum())
+        for zoom in range(tree.min_zoom, tree.max_zoom + 2):
+            elements = tree.query(zoom)
+            assert sum(e['city_count'] for e in elements) == df['City'].nunique(), "cities lost"
+            assert sum(e['red_alerts'] + e['orange_alerts'] for e in elements) == alerts, "alerts lost"
+
+        for name, zoom, bbox in VIEWPORTS:
+            rows = spatial_index(snapshot).bbox_rows(bbox)
+            frame = sort_by_city_date(snapshot.take(rows, as_frame=True))
+            markers = len(gzip.compress(encode_json(build_risk_zones_payload(frame, None, None, None, True)), 6))
+
+            start = time.perf_counter()
+            clusters = tree.query(zoom, bbox)
+            query = time.perf_counter() - start
+            clustered = len(gzip.compress(encode_json({'clusters': clusters}), 6))
+            print(f"{df['City'].nunique():>9} {build * 1000:>9.0f} {name:<9} {markers / 1024:>10.1f} "
+                  f"{len(clusters):>8} {clustered / 1024:>11.1f} {query * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COPIES)
@@ -0,0 +1,135 @@
+"""
+Benchmark + round-trip check: JSON versus Arrow IPC stream and MessagePack
+for the flat 7-day, risk-zones and plotting tables.
+
+The round trip runs through the Flask endpoints: for each endpoint the Arrow
+and MessagePack responses are decoded and compared with the JSON response
+for the same query. The benchmark then measures encode time, decode time and
+size (raw and gzip) at 1x, 20x and 200x the current number of cities.
+
+Requires pyarrow and msgpack. Run from the FloodWatch directory:
+    python benchmarks/bench_columnar.py
+"""
+import gzip
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from app import create_app
+from columnar import (
+    ARROW_STREAM_MIMETYPE, MSGPACK_MIMETYPE, ARROW_METADATA_KEY,
+    frame_to_arrow, frame_to_msgpack, msgpack, pa
+)
+from data_loader import sort_by_city_date
+from json_encoding import encode_json
+
+ENDPOINTS = [
+    ('/api/forecast/7day?group_by_city=false', 'predictions'),
+    ('/api/data/risk-zones?group_by_city=false', 'risk_zones'),
+    ('/api/data/plotting?group_by_city=false&min_probability=0.1', 'plotting_data'),
+    ('/api/data/plotting?group_by_city=false&limit=20&fields=City,Date,Flood_Probability', 'plotting_data'),
+]
+
+DATASETS = {
+    '7day': '7day_flood_predictions.csv',
+    'risk_zones': 'risk_zones.csv',
+    'plotting': 'final_plot.csv',
+}
+
+
+def scale_frame(df, copies):
+    """Replicate the frame as if there were `copies` times as many cities"""
+    if copies == 1:
+        return df
+    return pd.concat(
+        [df.assign(City=df['City'] + f"_{i}") for i in range(copies)],
+        ignore_index=True
+    )
+
+
+def decode_arrow(body):
+    table = pa.ipc.open_stream(body).read_all()
+    # Repeated strings arrive dictionary-encoded (categoricals in pandas)
+    frame = table.to_pandas()
+    for col in frame.columns:
+        if isinstance(frame[col].dtype, pd.CategoricalDtype):
+            frame[col] = frame[col].astype(object)
+    return frame, json.loads(table.schema.metadata[ARROW_METADATA_KEY])
+
+
+def decode_msgpack(body, table_key):
+    document = msgpack.unpackb(body)
+    table = document.pop(table_key)
+    return pd.DataFrame(table['data'], columns=table['columns']), document
+
+
+def check_round_trip():
+    client = create_app().test_client()
+    for url, table_key in ENDPOINTS:
+        reference = client.get(url).get_json()
+        expected = pd.DataFrame(reference.pop(table_key))
+
+        arrow_frame, arrow_envelope = decode_arrow(
+            client.get(url, headers={'Accept': ARROW_STREAM_MIMETYPE}).get_data()
+        )
+        msgpack_frame, msgpack_envelope = decode_msgpack(
+            client.get(url, headers={'Accept': MSGPACK_MIMETYPE}).get_data(), table_key
+        )
+
+        for name, frame, envelope in (('arrow', arrow_frame, arrow_envelope),
+                                      ('msgpack', msgpack_frame, msgpack_envelope)):
+            pd.testing.assert_frame_equal(frame, expected, check_dtype=False)
+            assert envelope == reference, f"{name} envelope differs for {url}"
+        print(f"round trip ok: {url} ({len(expected)} rows)")
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def benchmark():
+    data_dir = os.path.join(project_root, 'data')
+    print(f"\n{'table':<11} {'rows':>7} {'format':<8} {'KB':>8} {'gzip KB':>8} {'encode ms':>10} {'decode ms':>10}")
+    print('-' * 68)
+    for name, file_name in DATASETS.items():
+        base_df = pd.read_csv(os.path.join(data_dir, file_name))
+        for copies in (1, 20, 200):
+            df = sort_by_city_date(scale_frame(base_df, copies))
+            envelope = {'count': len(df), 'grouped': False}
+            encoders = {
+                'json': (lambda: encode_json({**envelope, 'data': df}), json.loads),
+                'arrow': (lambda: frame_to_arrow(df, envelope), decode_arrow),
+                'msgpack': (lambda: frame_to_msgpack(df, envelope, 'data'),
+                            lambda body: decode_msgpack(body, 'data')),
+            }
+            for fmt, (encode, decode) in encoders.items():
+                encode_time, body = best_of(encode)
+                decode_time, _ = best_of(lambda: decode(body))
+                print(f"{name:<11} {len(df):>7} {fmt:<8} {len(body) / 1024:>8.0f} "
+                      f"{len(gzip.compress(body, 6)) / 1024:>8.0f} "
+                      f"{encode_time * 1000:>10.1f} {decode_time * 1000:>10.1f}")
+            print()
+
+
+def main():
+    if pa is None or msgpack is None:
+        sys.exit("pyarrow and msgpack are required for this benchmark")
+    check_round_trip()
+    benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: response bytes and server CPU per request for identity, gzip and
+(when the brotli package is installed) brotli encodings.
+
+Cached full-dataset documents are compressed once per data version, so their
+first ("cold") request pays the static-level compression and later ("warm")
+requests only pick the stored variant. Filtered requests are compressed on
+the fly at the dynamic levels every time.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_compression.py
+"""
+import gzip
+import os
+import sys
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from app import create_app
+from compression import SUPPORTED_ENCODINGS, brotli
+
+ENDPOINTS = [
+    ('cached', '/api/forecast/7day'),
+    ('cached', '/api/data/risk-zones?group_by_city=false'),
+    ('cached', '/api/data/plotting'),
+    ('dynamic', '/api/forecast/7day?date=2025-08-21'),
+    ('dynamic', '/api/data/plotting?min_probability=0'),
+    ('dynamic', '/api/data/export/7day'),
+]
+
+REQUESTS = 50
+
+
+def decode(body, encoding):
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'br':
+        return brotli.decompress(body)
+    return body
+
+
+def cpu_per_request(client, url, headers, count):
+    start = time.process_time()
+    for _ in range(count):
+        client.get(url, headers=headers)
+    return (time.process_time() - start) / count
+
+
+def main():
+    encodings = ('identity',) + SUPPORTED_ENCODINGS
+    if brotli is None:
+        print("brotli not installed; measuring identity and gzip only\n")
+
+    print(f"{'kind':<8} {'endpoint':<42} {'encoding':<9} {'KB':>8} {'ratio':>6} {'cold ms':>8} {'warm ms':>8}")
+    print('-' * 95)
+    for kind, url in ENDPOINTS:
+        identity_size = None
+        for encoding in encodings:
+            # Fresh app, warmed with an uncompressed request, so the first
+            # compressed request shows only the one-off compression cost
+            client = create_app().test_client()
+            headers = {'Accept-Encoding': encoding}
+            client.get(url)
+
+            start = time.process_time()
+            response = client.get(url, headers=headers)
+            cold = time.process_time() - start
+            warm = cpu_per_request(client, url, headers, REQUESTS)
+
+            sent = response.headers.get('Content-Encoding')
+            body = response.get_data()
+            plain = decode(body, sent)
+            if identity_size is None:
+                identity_size = len(plain)
+            # Every encoding must carry the same document
+            assert len(plain) == identity_size, url
+
+            print(f"{kind:<8} {url:<42} {sent or 'identity':<9} {len(body) / 1024:>8.1f} "
+                  f"{identity_size / len(body):>5.1f}x {cold * 1000:>8.2f} {warm * 1000:>8.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: model inference of a 7-day forecast run, one predict and one
+predict_proba call per city-day (the previous make_daily_flood_predictions)
+versus make_flood_predictions_for_cities (one predict_proba call for every
+city-day).
+
+Uses model.pickle with synthetic weather and the real reservoir forecasts,
+for 56, 1k and 10k locations. The per-day path is timed on the first
+SAMPLE_CITIES cities and scaled to the full count (running it in full takes
+minutes at 10k); on those cities both paths must give identical records.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_forecast_inference.py [locations ...]
+"""
+import contextlib
+import io
+import os
+import pickle
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'training'))
+
+from enhanced_forecast import (FEATURE_COLUMNS, describe_daily_prediction, forecast_all_reservoir_levels,
+                               make_flood_predictions_for_cities, reservoir_forecast_records)
+
+DEFAULT_LOCATIONS = (56, 1000, 10000)
+SAMPLE_CITIES = 56
+
+
+def synthetic_forecasts(n, rng, reservoir):
+    dates = pd.date_range('2025-07-01', periods=7).strftime('%Y-%m-%d')
+    forecasts = []
+    for i in range(n):
+        precip = rng.gamma(0.6, 25, 7)
+        weather = [{'date': dates[day], 'weather': [
+            rng.uniform(22, 32), rng.uniform(28, 38), rng.uniform(5, 40), rng.uniform(10, 100),
+            precip[day], rng.uniform(40, 98), 1 if precip[day] > 0 else 0
+        ]} for day in range(7)]
+        forecasts.append((weather, reservoir[i % len(reservoir)]))
+    return forecasts
+
+
+def per_day_predictions(city_forecasts, model):
+    """The previous path: a one-row DataFrame, predict and predict_proba for every city-day"""
+    results = []
+    for weather, reservoir in city_forecasts:
+        days = []
+        for day in range(7):
+            features = weather[day]['weather'] + [reservoir[day][field] for field in
+                                                  ('avg_fill', 'max_fill', 'risk_score', 'above_danger')]
+            X_infer = pd.DataFrame([features], columns=list(getattr(model, 'feature_names_in_', FEATURE_COLUMNS)))
+            prediction = model.predict(X_infer)[0]
+            flood_probability = model.predict_proba(X_infer)[0][1]
+            days.append(describe_daily_prediction(day, weather[day]['date'], features, prediction, flood_probability))
+        results.append(days)
+    return results
+
+
+def main(location_counts):
+    warnings.simplefilter('ignore')
+    model = pickle.load(open(os.path.join(project_root, 'model.pickle'), 'rb'))
+    with contextlib.redirect_stdout(io.StringIO()):
+        city_index, forecasts = forecast_all_reservoir_levels(
+            os.path.join(project_root, 'data', 'aggregated_reservoir_data.csv'))
+    reservoir = [reservoir_forecast_records(forecasts[row]) for row in city_index.values()]
+    rng = np.random.default_rng(11)
+
+    print(f"{type(model).__name__}, {getattr(model, 'n_estimators', '?')} trees\n")
+    print(f"{'locations':>9} {'city-days':>9} {'per-day s':>10} {'batched s':>10} {'speedup':>8}")
+    print('-' * 51)
+    for n in location_counts:
+        city_forecasts = synthetic_forecasts(n, rng, reservoir)
+        sample = city_forecasts[:SAMPLE_CITIES]
+
+        start = time.perf_counter()
+        expected = per_day_predictions(sample, model)
+        per_day = (time.perf_counter() - start) * n / len(sample)
+
+        start = time.perf_counter()
+        results = make_flood_predictions_for_cities(city_forecasts, model)
+        batched = time.perf_counter() - start
+
+        assert results[:len(sample)] == expected, "batched predictions differ"
+        estimate = '~' if n > len(sample) else ' '
+        print(f"{n:>9} {n * 7:>9} {estimate}{per_day:>9.1f} {batched:>10.2f} {per_day / batched:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_LOCATIONS)
@@ -0,0 +1,110 @@
+"""
+Benchmark: legacy to_dict('records') + to_serializable + json.dumps versus the
+column-wise json_encoding.encode_json, on the 7-day and risk-zones payloads.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_json_encoding.py
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from data_loader import sort_by_city_date
+from json_encoding import encode_json, group_rows_by_city
+
+
+def scale_frame(df, copies):
+    """Replicate the frame as if there were `copies` times as many cities"""
+    if copies == 1:
+        return df
+    return pd.concat(
+        [df.assign(City=df['City'] + f"_{i}") for i in range(copies)],
+        ignore_index=True
+    )
+
+
+def to_serializable(obj):
+    """The former data_loader helper: convert numpy/pandas datatypes into native Python types"""
+    if isinstance(obj, (np.integer,)):
+        return int(obj)
+    elif isinstance(obj, (np.floating,)):
+        return float(obj)
+    elif isinstance(obj, (np.bool_,)):
+        return bool(obj)
+    elif isinstance(obj, (np.ndarray, list, tuple)):
+        return [to_serializable(x) for x in obj]
+    elif isinstance(obj, dict):
+        return {k: to_serializable(v) for k, v in obj.items()}
+    elif pd.isna(obj):
+        return None
+    return obj
+
+
+def legacy_encode(df, group_by_city):
+    """The pre-encoder path: per-city to_dict('records') then a recursive walk"""
+    df = sort_by_city_date(df)
+    if group_by_city:
+        payload = []
+        for city, g in df.groupby('City', sort=False):
+            payload.append({
+                'City': city,
+                'coordinates': {'lat': float(g.iloc[0]['Latitude']), 'lon': float(g.iloc[0]['Longitude'])},
+                'days': g.to_dict('records'),
+                'day_count': len(g)
+            })
+    else:
+        payload = df.to_dict('records')
+    return json.dumps(to_serializable({'data': payload}), separators=(',', ':')).encode('utf-8')
+
+
+def new_encode(df, group_by_city):
+    df = sort_by_city_date(df)
+    payload = group_rows_by_city(df) if group_by_city else df
+    return encode_json({'data': payload})
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    data_dir = os.path.join(project_root, 'data')
+    datasets = {
+        '7day': pd.read_csv(os.path.join(data_dir, '7day_flood_predictions.csv')),
+        'risk_zones': pd.read_csv(os.path.join(data_dir, 'risk_zones.csv')),
+    }
+
+    print(f"{'payload':<12} {'cities':>7} {'mode':<8} {'rows':>8} {'legacy ms':>10} {'new ms':>8} {'speedup':>8} {'KB':>8}")
+    print('-' * 78)
+    for name, base_df in datasets.items():
+        for copies in (1, 20, 200):
+            df = scale_frame(base_df, copies)
+            cities = df['City'].nunique()
+            for group_by_city in (False, True):
+                legacy_time, legacy_bytes = best_of(lambda: legacy_encode(df, group_by_city))
+                new_time, new_bytes = best_of(lambda: new_encode(df, group_by_city))
+
+                # Both encoders must describe the same rows
+                assert len(json.loads(legacy_bytes)['data']) == len(json.loads(new_bytes)['data'])
+
+                mode = 'grouped' if group_by_city else 'flat'
+                print(f"{name:<12} {cities:>7} {mode:<8} {len(df):>8} {legacy_time * 1000:>10.1f} "
+                      f"{new_time * 1000:>8.1f} {legacy_time / new_time:>7.1f}x {len(new_bytes) / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: 7-day reservoir forecasts for every city, one city at a time
+(re-reading aggregated_reservoir_data.csv per city, the previous
+implementation) versus forecast_all_reservoir_levels (one read, grouped
+numpy over all cities).
+
+Replicates the reservoir history to more cities under new names, checks
+both paths give the same forecasts and reports the time for all cities.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_reservoir_forecast.py [city_copies ...]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'training'))
+
+from enhanced_forecast import RESERVOIR_FIELDS, forecast_all_reservoir_levels, seasonal_adjustment
+
+DEFAULT_COPIES = (1, 2, 4)
+
+
+def per_city_forecast(city, path, days=7):
+    """The previous forecast_reservoir_levels: read, parse and filter the history for one city"""
+    reservoir_df = pd.read_csv(path)
+    reservoir_df['Date'] = pd.to_datetime(reservoir_df['Date'])
+    city_data = reservoir_df[reservoir_df['City'] == city].sort_values('Date')
+    if len(city_data) < 14:
+        if city_data.empty:
+            return np.zeros((days, 4))
+        last = city_data.iloc[-1]
+        return np.array([[last['Avg_Reservoir_Fill'], last['Max_Reservoir_Fill'],
+                          last['Reservoir_Risk_Score'], last['Reservoirs_Above_Danger']]] * days)
+    fill_levels = city_data['Avg_Reservoir_Fill'].values[-30:]
+    recent_trend = np.mean(fill_levels[-7:]) - np.mean(fill_levels[-14:-7])
+    seasonal = seasonal_adjustment(datetime.now().month)
+    rows = []
+    for day in range(days):
+        level = max(0, min(100, fill_levels[-1] + recent_trend * (day + 1) + seasonal * (day + 1) * 0.1))
+        risk = sum(level > t for t in (55, 65, 75, 85, 95))
+        rows.append([level, min(100, level + 5), risk, 1 if level > 80 else 0])
+    return np.array(rows)
+
+
+def main(copy_counts):
+    base = pd.read_csv(os.path.join(project_root, 'data', 'aggregated_reservoir_data.csv'))
+    print(f"{'cities':>7} {'rows':>8} {'per-city s':>11} {'all-city s':>11} {'speedup':>8}")
+    print('-' * 49)
+    with tempfile.TemporaryDirectory() as tmp:
+        for copies in copy_counts:
+            df = pd.concat([base.assign(City=base['City'] + ('' if i == 0 else f"_{i}")) for i in range(copies)],
+                           ignore_index=True)
+            path = os.path.join(tmp, f"aggregated_reservoir_data_{copies}.csv")
+            df.to_csv(path, index=False)
+            cities = df['City'].unique()
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                expected = {city: per_city_forecast(city, path) for city in cities}
+                per_city = time.perf_counter() - start
+
+                start = time.perf_counter()
+                city_index, forecasts = forecast_all_reservoir_levels(path)
+                all_city = time.perf_counter() - start
+
+            assert forecasts.shape == (len(cities), 7, len(RESERVOIR_FIELDS))
+            for city in cities:
+                assert np.allclose(forecasts[city_index[city]], expected[city]), city
+            print(f"{len(cities):>7} {len(df):>8} {per_city:>11.2f} {all_city:>11.3f} {per_city / all_city:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COPIES)
@@ -0,0 +1,199 @@
+"""
+Load benchmark: synchronous (threaded WSGI) versus async (ASGI) serving.
+
+Starts each server in its own process on the same data snapshot:
+  - sync:  werkzeug's threaded server, as app.run() uses (one thread per connection)
+  - async: asgi.py under uvicorn
+and drives it with N concurrent keep-alive clients polling a dashboard mix
+of endpoints, optionally alongside S slow clients that send half a request
+and then stall (as clients on a bad mobile connection do). Reports
+throughput, latency percentiles, errors, and the server's thread count and
+RSS while under load.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_serving_modes.py [seconds] [concurrency ...]
+"""
+import asyncio
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+app_dir = os.path.join(project_root, 'app')
+
+DEFAULT_CONCURRENCY = (50, 500, 2000)
+SLOW_CLIENTS = 500
+
+_predictions = pd.read_csv(os.path.join(project_root, 'data', '7day_flood_predictions.csv'),
+                           usecols=['City', 'Date'])
+CITIES = sorted(_predictions['City'].unique())
+DATES = sorted(_predictions['Date'].unique())
+
+
+def dashboard_path():
+    """One request of a dashboard poll"""
+    roll = random.random()
+    if roll < 0.5:
+        return f"/api/forecast/city/{random.choice(CITIES)}"
+    if roll < 0.7:
+        return '/api/forecast/daily-summary'
+    if roll < 0.85:
+        return '/api/analysis/overview'
+    return f"/api/forecast/7day?date={random.choice(DATES)}"
+
+
+def serve(mode, port):
+    """Child process: run one server mode on port"""
+    sys.path.insert(0, app_dir)
+    os.chdir(app_dir)
+    if mode == 'sync':
+        from werkzeug.serving import make_server
+        from app import create_app
+        flask_app = create_app()
+        flask_app.data_loader.current()
+        make_server('127.0.0.1', port, flask_app, threaded=True).serve_forever()
+    else:
+        os.environ['PORT'] = str(port)
+        os.environ['HOST'] = '127.0.0.1'
+        sys.argv = ['asgi.py']
+        import runpy
+        runpy.run_path(os.path.join(app_dir, 'asgi.py'), run_name='__main__')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def process_stats(pid):
+    fields = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            fields[name] = value.strip()
+    return int(fields['Threads']), int(fields['VmRSS'].split()[0]) / 1024
+
+
+async def client(port, deadline, latencies, errors):
+    """One keep-alive connection issuing requests back to back until deadline"""
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            start = time.perf_counter()
+            writer.write(f"GET {dashboard_path()} HTTP/1.1\r\nHost: localhost\r\n"
+                         f"Accept-Encoding: gzip\r\n\r\n".encode())
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), 30)
+            length = 0
+            for line in head.split(b'\r\n'):
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':', 1)[1])
+            await asyncio.wait_for(reader.readexactly(length), 30)
+            status = int(head.split(b' ', 2)[1])
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+            if b'connection: close' in head.lower():
+                writer.close()
+                writer = None
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def slow_client(port, stop):
+    """Sends half a request and stalls until stop is set"""
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b"GET /api/forecast/daily-summary HTTP/1.1\r\nHost: localhost\r\n")
+        await stop.wait()
+        writer.close()
+    except OSError:
+        pass
+
+
+async def run_load(port, server_pid, seconds, concurrency, slow):
+    stop = asyncio.Event()
+    stalled = [asyncio.create_task(slow_client(port, stop)) for _ in range(slow)]
+    await asyncio.sleep(0.5 if slow else 0)
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    tasks = [asyncio.create_task(client(port, deadline, latencies, errors)) for _ in range(concurrency)]
+    await asyncio.sleep(seconds / 2)
+    threads, rss = process_stats(server_pid)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await asyncio.gather(*stalled)
+
+    latencies.sort()
+
+    def percentile(q):
+        return latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000 if latencies else float('nan')
+
+    return len(latencies) / elapsed, percentile(0.5), percentile(0.99), len(errors), threads, rss
+
+
+def main(seconds, concurrency_levels):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    print(f"{seconds}s per run; slow-client runs add {SLOW_CLIENTS} stalled connections\n")
+    print(f"{'mode':<6} {'clients':>7} {'slow':>5} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>9} "
+          f"{'errors':>7} {'threads':>8} {'RSS MB':>7}")
+    print('-' * 74)
+    for mode in ('sync', 'async'):
+        port = free_port()
+        server = subprocess.Popen([sys.executable, __file__, '--serve', mode, str(port)],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_port(port)
+            for concurrency in concurrency_levels:
+                for slow in (0, SLOW_CLIENTS):
+                    rate, p50, p99, errors, threads, rss = asyncio.run(
+                        run_load(port, server.pid, seconds, concurrency, slow)
+                    )
+                    print(f"{mode:<6} {concurrency:>7} {slow:>5} {rate:>8.0f} {p50:>8.1f} {p99:>9.1f} "
+                          f"{errors:>7} {threads:>8} {rss:>7.0f}")
+        finally:
+            server.terminate()
+            server.wait()
+        print()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        resource.setrlimit(resource.RLIMIT_NOFILE, (resource.getrlimit(resource.RLIMIT_NOFILE)[1],) * 2)
+        serve(sys.argv[2], int(sys.argv[3]))
+    else:
+        args = [int(arg) for arg in sys.argv[1:]]
+        main(args[0] if args else 10, args[1:] or DEFAULT_CONCURRENCY)
@@ -0,0 +1,110 @@
+"""
+Benchmark: memory of N worker processes with and without shared snapshots.
+
+Creates a data directory with the current outputs replicated to many more
+cities, then starts N processes that each build a DataLoader and load every
+snapshot, as gunicorn workers would. Reports per-worker private memory and
+the total proportional set size (PSS) across workers, read from
+/proc/<pid>/smaps_rollup (Linux only).
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_shared_snapshots.py [workers] [city_copies]
+"""
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from config import Config
+
+SNAPSHOT_KEYS = ('7DAY_PREDICTIONS', 'RISK_ZONES', 'FINAL_PLOT', 'DAILY_SUMMARY', 'CITY_SUMMARY')
+
+
+def make_data_dir(root, copies):
+    """<root>/app and <root>/data with every city-level file replicated copies times"""
+    os.makedirs(os.path.join(root, 'app'))
+    data_dir = os.path.join(root, 'data')
+    os.makedirs(data_dir)
+    for key in SNAPSHOT_KEYS + ('CITIES',):
+        name = os.path.basename(Config.DATA_FILES[key])
+        df = pd.read_csv(os.path.join(project_root, 'data', name))
+        city_col = 'City' if 'City' in df.columns else ('city' if 'city' in df.columns else None)
+        if city_col is not None:
+            df = pd.concat([df.assign(**{city_col: df[city_col] + f"_{i}"}) for i in range(copies)],
+                           ignore_index=True)
+        df.to_csv(os.path.join(data_dir, name), index=False)
+    return os.path.join(root, 'app')
+
+
+def memory_kb(pid):
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1])
+    return fields
+
+
+def worker(base_dir, shared, ready, done):
+    Config.SHARED_SNAPSHOTS = shared
+    from data_loader import DataLoader
+    loader = DataLoader(base_dir)
+    for key in SNAPSHOT_KEYS:
+        loader.snapshot(key)
+    ready.put(os.getpid())
+    done.wait()
+
+
+def run(base_dir, workers, shared):
+    ready = multiprocessing.Queue()
+    done = multiprocessing.Event()
+    start = time.perf_counter()
+    procs = [multiprocessing.Process(target=worker, args=(base_dir, shared, ready, done))
+             for _ in range(workers)]
+    for proc in procs:
+        proc.start()
+    pids = [ready.get() for _ in procs]
+    elapsed = time.perf_counter() - start
+
+    stats = [memory_kb(pid) for pid in pids]
+    done.set()
+    for proc in procs:
+        proc.join()
+
+    private = sum(s.get('Private_Clean', 0) + s.get('Private_Dirty', 0) for s in stats) / len(stats) / 1024
+    pss = sum(s.get('Pss', 0) for s in stats) / 1024
+    return elapsed, private, pss
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    copies = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    root = tempfile.mkdtemp(prefix='floodwatch-bench-')
+    snapshot_dir = tempfile.mkdtemp(prefix='floodwatch-shm-', dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+    Config.SHARED_SNAPSHOT_DIR = snapshot_dir
+    try:
+        base_dir = make_data_dir(root, copies)
+        print(f"{workers} workers, {copies}x cities\n")
+        print(f"{'mode':<16} {'startup s':>10} {'private MB/worker':>18} {'total PSS MB':>13}")
+        print('-' * 60)
+        for label, shared in (('per-process', False), ('shared (cold)', True), ('shared (warm)', True)):
+            elapsed, private, pss = run(base_dir, workers, shared)
+            print(f"{label:<16} {elapsed:>10.2f} {private:>18.1f} {pss:>13.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    multiprocessing.set_start_method('fork')
+    main()
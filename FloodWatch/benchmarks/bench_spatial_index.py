@@ -0,0 +1,97 @@
+"""
+Benchmark: viewport (bbox) and nearest-city lookups, full scans versus the
+snapshot's spatial index.
+
+Replicates the 7-day predictions to thousands of monitored locations by
+scattering copies of each city over Maharashtra, then compares
+  - bbox: a lat/lon mask over every row vs SpatialIndex.bbox_rows
+  - nearest 10: a haversine distance per row vs SpatialIndex.nearest
+checking that both give the same answer. Index build time (once per
+snapshot) is reported separately.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_spatial_index.py [city_copies ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from spatial_index import EARTH_RADIUS_KM, SpatialIndex
+
+DEFAULT_COPIES = (10, 100, 1000)
+# Viewport of a zoomed-in map around Pune
+BBOX = (73.5, 18.2, 74.2, 18.8)
+POINT = (18.52, 73.86)
+
+
+def replicate(base, copies, rng):
+    frames = []
+    for i in range(copies):
+        cities = base['City'].unique()
+        lat_shift = dict(zip(cities, rng.uniform(-2, 2, len(cities))))
+        lon_shift = dict(zip(cities, rng.uniform(-2, 2, len(cities))))
+        frames.append(base.assign(
+            City=base['City'] + f"_{i}",
+            Latitude=base['Latitude'] + base['City'].map(lat_shift),
+            Longitude=base['Longitude'] + base['City'].map(lon_shift)
+        ))
+    return pd.concat(frames, ignore_index=True)
+
+
+def scan_bbox(df):
+    west, south, east, north = BBOX
+    lat, lon = df['Latitude'].to_numpy(), df['Longitude'].to_numpy()
+    return np.flatnonzero((lat >= south) & (lat <= north) & (lon >= west) & (lon <= east))
+
+
+def scan_nearest(df, limit=10):
+    lat1, lon1 = np.radians(POINT)
+    lat2, lon2 = np.radians(df['Latitude'].to_numpy()), np.radians(df['Longitude'].to_numpy())
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    distances = pd.Series(2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a)))
+    # One entry per city, as the index keeps one point per location
+    nearest = distances.groupby(df['City'].to_numpy()).min().nsmallest(limit)
+    return list(nearest.index), nearest.to_numpy()
+
+
+def best_of(fn, repeat=5):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main(copy_counts):
+    rng = np.random.default_rng(7)
+    base = pd.read_csv(os.path.join(project_root, 'data', '7day_flood_predictions.csv'))
+    print(f"{'locations':>9} {'rows':>8} {'build ms':>9} {'bbox scan':>10} {'bbox idx':>9} "
+          f"{'near scan':>10} {'near idx':>9}")
+    print('-' * 70)
+    for copies in copy_counts:
+        df = replicate(base, copies, rng)
+        build_time, index = best_of(lambda: SpatialIndex(df), repeat=1)
+
+        scan_time, expected = best_of(lambda: scan_bbox(df))
+        index_time, rows = best_of(lambda: index.bbox_rows(BBOX))
+        assert np.array_equal(expected, rows), "bbox rows differ"
+
+        near_scan_time, (names, distances) = best_of(lambda: scan_nearest(df))
+        near_index_time, (locations, km) = best_of(lambda: index.nearest(*POINT, 10))
+        assert list(index.cities[locations]) == names and np.allclose(km, distances), "nearest differs"
+
+        print(f"{len(index):>9} {len(df):>8} {build_time * 1000:>9.1f} {scan_time * 1000:>10.2f} "
+              f"{index_time * 1000:>9.2f} {near_scan_time * 1000:>10.2f} {near_index_time * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COPIES)
@@ -0,0 +1,98 @@
+"""
+Benchmark: bytes and latency of a map viewport as /api/data/risk-zones JSON
+versus /api/tiles vector tiles.
+
+Replicates the risk zones to thousands of locations scattered over
+Maharashtra, then for a state-wide, a district and a city viewport reports
+  - JSON: the bbox-filtered, city-grouped /risk-zones document (gzip)
+  - MVT:  every tile covering the viewport at a typical zoom for that view
+          (gzip), with first-render (cold) and cached (warm) time
+Mobile field teams load the viewport on every pan, so bytes matter most.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_vector_tiles.py [city_copies]
+"""
+import gzip
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from data_loader import DataSnapshot, sort_by_city_date
+from data_routes import build_risk_zones_payload
+from json_encoding import encode_json
+from spatial_index import spatial_index
+from vector_tiles import TileSet
+
+# (name, zoom, bbox west/south/east/north)
+VIEWPORTS = (
+    ('state', 6, (72.5, 15.5, 81.0, 22.2)),
+    ('district', 9, (73.5, 18.2, 74.4, 18.9)),
+    ('city', 12, (73.75, 18.45, 73.95, 18.6)),
+)
+
+
+def replicate(base, copies, rng):
+    cities = base['City'].unique()
+    frames = []
+    for i in range(copies):
+        shift = {city: rng.uniform(-1.5, 1.5, 2) for city in cities}
+        frames.append(base.assign(
+            City=base['City'] + f"_{i}",
+            Latitude=base['Latitude'] + base['City'].map(lambda city: shift[city][0]),
+            Longitude=base['Longitude'] + base['City'].map(lambda city: shift[city][1])
+        ))
+    return pd.concat(frames, ignore_index=True)
+
+
+def tiles_for(zoom, bbox):
+    west, south, east, north = bbox
+    n = 1 << zoom
+
+    def tile(lat, lon):
+        y = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n
+        return int((lon + 180) / 360 * n), int(y)
+
+    (x0, y0), (x1, y1) = tile(north, west), tile(south, east)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def main(copies):
+    rng = np.random.default_rng(3)
+    base = pd.read_csv(os.path.join(project_root, 'data', 'risk_zones.csv'))
+    df = replicate(base, copies, rng)
+    snapshot = DataSnapshot('RISK_ZONES', None, (0, 0), df)
+    print(f"{df['City'].nunique()} locations, {len(df)} rows\n")
+    print(f"{'view':<9} {'JSON kB gz':>10} {'tiles':>6} {'MVT kB gz':>10} {'cold ms':>8} {'warm ms':>8}")
+    print('-' * 56)
+
+    for name, zoom, bbox in VIEWPORTS:
+        rows = spatial_index(snapshot).bbox_rows(bbox)
+        frame = sort_by_city_date(snapshot.take(rows, as_frame=True))
+        payload = build_risk_zones_payload(frame, None, None, None, True, bbox=bbox)
+        json_bytes = len(gzip.compress(encode_json(payload), 6))
+
+        tile_set = TileSet(snapshot)
+        coords = tiles_for(zoom, bbox)
+        start = time.perf_counter()
+        bodies = [tile_set.tile(zoom, x, y).body for x, y in coords]
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        for x, y in coords:
+            tile_set.tile(zoom, x, y)
+        warm = time.perf_counter() - start
+        mvt_bytes = sum(len(gzip.compress(body, 6)) for body in bodies if body)
+
+        print(f"{name:<9} {json_bytes / 1024:>10.1f} {len(coords):>6} {mvt_bytes / 1024:>10.1f} "
+              f"{cold * 1000:>8.1f} {warm * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
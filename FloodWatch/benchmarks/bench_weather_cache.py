@@ -0,0 +1,128 @@
+"""
+Benchmark: the on-disk weather cache across re-runs and processes.
+
+Uses the Open-Meteo stub of bench_weather_fetch.py (without failing cities)
+and a temporary cache file, and reports wall time, HTTP requests and cache
+hits for
+  - cold:      first forecast fetch of N cities (everything downloaded)
+  - re-run:    the same fetch again in a new client (within the forecast TTL)
+  - processes: P processes fetching the same cities at once from the warm
+               cache, plus P more writing their own cities concurrently
+  - archive:   the scraper's archive samples, fetched twice
+Then shrinks the size bound to check LRU eviction keeps the cache under it.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_weather_cache.py [cities] [processes]
+"""
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'training'))
+sys.path.insert(0, script_dir)
+
+import bench_weather_fetch
+
+CACHE_DIR = tempfile.mkdtemp(prefix='floodwatch-weather-cache-')
+os.environ['FLOODWATCH_WEATHER_CACHE'] = os.path.join(CACHE_DIR, 'weather.sqlite3')
+
+
+def make_cities(n, seed):
+    rng = random.Random(seed)
+    return {f"City_{seed}_{i}": {'lat': rng.uniform(15.6, 22.0), 'lon': rng.uniform(72.6, 80.9)} for i in range(n)}
+
+
+def fetch(cities):
+    """(forecasts, cache hits, cache misses) for a fresh client sharing the cache file"""
+    from enhanced_forecast import fetch_daily_weather_forecasts
+    from weather_cache import WeatherCache
+    from weather_client import WeatherClient
+
+    cache = WeatherCache(os.environ['FLOODWATCH_WEATHER_CACHE'])
+    client = WeatherClient(rate_limit_calls=0, cache=cache)
+    forecasts = fetch_daily_weather_forecasts(cities, client)
+    client.close()
+    cache.close()
+    return forecasts, cache.hits, cache.misses
+
+
+def worker(args):
+    import builtins
+    builtins.print = lambda *a, **k: None
+    n, seed = args
+    forecasts, hits, misses = fetch(make_cities(n, seed))
+    return sum(1 for f in forecasts.values() if f), hits, misses
+
+
+def timed(label, run, server):
+    served = bench_weather_fetch.StubHandler.requests_served
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    requests_made = bench_weather_fetch.StubHandler.requests_served - served
+    return label, elapsed, requests_made, result
+
+
+def main(n_cities, n_processes):
+    bench_weather_fetch.FAIL_RATE = 0.0
+    server = bench_weather_fetch.start_stub()
+    base = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ['OPEN_METEO_FORECAST_URL'] = base + '/forecast'
+    os.environ['OPEN_METEO_ARCHIVE_URL'] = base + '/archive'
+
+    import builtins
+    quiet_print = builtins.print
+    builtins.print = lambda *args, **kwargs: None
+    rows = []
+    try:
+        cities = make_cities(n_cities, 0)
+        for label in ('cold', 're-run'):
+            label, elapsed, made, (forecasts, hits, misses) = timed(label, lambda: fetch(cities), server)
+            assert all(forecasts.values()), "missing forecasts"
+            rows.append((label, elapsed, made, hits, misses))
+
+        # Forked workers share the stub's request counter only through the server process
+        jobs = [(n_cities, 0)] * n_processes + [(n_cities // n_processes or 1, seed) for seed in range(1, n_processes + 1)]
+        with multiprocessing.get_context('fork').Pool(len(jobs)) as pool:
+            label, elapsed, made, results = timed('processes', lambda: pool.map(worker, jobs), server)
+        assert all(ok == n for (ok, _, _), (n, _) in zip(results, jobs)), "missing forecasts"
+        rows.append((label, elapsed, made, sum(r[1] for r in results), sum(r[2] for r in results)))
+
+        from enhanced_scraper import get_weather_data_many
+        from weather_client import default_client
+        rng = random.Random(7)
+        samples = [(rng.randint(1, 28), rng.randint(1, 12), rng.randint(2019, 2024), 15,
+                    c['lat'], c['lon'], city) for city, c in cities.items()]
+        cache = default_client().cache
+        for label in ('archive', 'archive 2'):
+            hits, misses = cache.hits, cache.misses
+            label, elapsed, made, weather = timed(label, lambda: get_weather_data_many(samples), server)
+            assert all(sum(w) for w in weather), "missing archive weather"
+            rows.append((label, elapsed, made, cache.hits - hits, cache.misses - misses))
+
+        stats = cache.stats()
+        cache.max_bytes = stats['bytes'] // 2
+        cache.put_many([('evict-check', {}, None)])
+        after = cache.stats()
+    finally:
+        builtins.print = quiet_print
+
+    print(f"{n_cities} cities, {n_processes}+{n_processes} processes, cache at {CACHE_DIR}\n")
+    print(f"{'run':<10} {'wall s':>7} {'requests':>9} {'hits':>6} {'misses':>7}")
+    print('-' * 43)
+    for label, elapsed, made, hits, misses in rows:
+        print(f"{label:<10} {elapsed:>7.2f} {made:>9} {hits:>6} {misses:>7}")
+    print(f"\neviction: {stats['entries']} entries / {stats['bytes'] / 1024:.0f} kB -> "
+          f"{after['entries']} entries / {after['bytes'] / 1024:.0f} kB (bound {cache.max_bytes / 1024:.0f} kB)")
+    assert after['bytes'] <= cache.max_bytes
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 4)
@@ -0,0 +1,160 @@
+"""
+Benchmark: weather fetch stage of enhanced_forecast.py, one city at a time
+versus the concurrent pooled WeatherClient, with and without multi-location
+batching, against a local Open-Meteo stub.
+
+The stub answers /v1/forecast with a 7-day daily payload per location after
+a per-city latency (20-80 ms, with 1% of cities taking 2 s; a multi-location
+request takes its slowest city plus 1 ms per location) and fails a share
+of cities (1% by default) with HTTP 500, failing any batch that contains
+them. Every mode
+fetches the same N cities:
+  - sequential: a fresh requests.get per city (the previous implementation)
+  - concurrent: one request per city on the thread pool / keep-alive session
+  - batched: fetch_daily_weather_forecasts (multi-location requests, failed
+    batches retried per city)
+and the report compares wall time and HTTP requests. Each mode gets its own
+client with the rate limiter off (the stub has no quota; Open-Meteo counts
+a multi-location request as one call per location, so batching saves round
+trips, not quota). Failed cities must come back empty without holding up
+the rest.
+
+Run from the FloodWatch directory:
+    python benchmarks/bench_weather_fetch.py [cities] [failing fraction]
+"""
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(script_dir)
+sys.path.insert(0, os.path.join(project_root, 'training'))
+
+SLOW_LATENCY = 2.0
+FAIL_RATE = 0.01
+PER_LOCATION_LATENCY = 0.001
+
+
+def city_profile(lat, lon):
+    """(latency seconds, fails) for a city, fixed by its coordinates"""
+    rng = random.Random(f"{lat:.4f},{lon:.4f}")
+    roll = rng.random()
+    return (SLOW_LATENCY if roll < 0.01 else rng.uniform(0.02, 0.08)), 0.01 <= roll < 0.01 + FAIL_RATE
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    requests_served = 0
+
+    def do_GET(self):
+        StubHandler.requests_served += 1
+        query = parse_qs(urlparse(self.path).query)
+        lats = [float(v) for v in query['latitude'][0].split(',')]
+        lons = [float(v) for v in query['longitude'][0].split(',')]
+        profiles = [city_profile(lat, lon) for lat, lon in zip(lats, lons)]
+        time.sleep(max(latency for latency, _ in profiles) + PER_LOCATION_LATENCY * (len(lats) - 1))
+        if any(fails for _, fails in profiles):
+            body, status = b'{"error": true}', 500
+        else:
+            days = [(date.today() + timedelta(days=i)).isoformat() for i in range(7)]
+            variables = query['daily'][0].split(',')
+            results = [{'latitude': lat, 'longitude': lon,
+                        'daily': {'time': days, **{name: [1.0] * 7 for name in variables}}}
+                       for lat, lon in zip(lats, lons)]
+            body = json.dumps(results[0] if len(results) == 1 else results).encode()
+            status = 200
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub():
+    ThreadingHTTPServer.request_queue_size = 1024
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(n_cities):
+    server = start_stub()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v1/forecast"
+    os.environ['OPEN_METEO_FORECAST_URL'] = url
+
+    import builtins
+    from enhanced_forecast import fetch_daily_weather_forecasts, forecast_params, parse_daily_weather_forecasts
+    from weather_client import MAX_BATCH_LOCATIONS, WeatherClient
+
+    rng = random.Random(1)
+    cities = {f"City_{i}": {'lat': rng.uniform(15.6, 22.0), 'lon': rng.uniform(72.6, 80.9)} for i in range(n_cities)}
+    profiles = [city_profile(c['lat'], c['lon']) for c in cities.values()]
+    latencies = [latency for latency, _ in profiles]
+    failing = sum(fails for _, fails in profiles)
+    print(f"{n_cities} cities: stub latency sum {sum(latencies):.1f} s, max {max(latencies):.2f} s, "
+          f"{failing} failing cities\n")
+
+    quiet_print = builtins.print
+    builtins.print = lambda *args, **kwargs: None
+    try:
+        start = time.perf_counter()
+        sequential = {}
+        for city, coords in cities.items():
+            try:
+                response = requests.get(url, params=forecast_params(coords['lat'], coords['lon']), timeout=10)
+                sequential[city] = parse_daily_weather_forecasts(response.json() if response.ok else None)
+            except requests.exceptions.RequestException:
+                sequential[city] = []
+        sequential_time = time.perf_counter() - start
+
+        client = WeatherClient(rate_limit_calls=0, cache=False)
+        served = StubHandler.requests_served
+        start = time.perf_counter()
+        responses = client.fetch_many({
+            city: (url, forecast_params(coords['lat'], coords['lon'])) for city, coords in cities.items()
+        })
+        concurrent = {city: parse_daily_weather_forecasts(data) for city, data in responses.items()}
+        concurrent_time = time.perf_counter() - start
+        concurrent_calls = StubHandler.requests_served - served
+        client.close()
+
+        client = WeatherClient(rate_limit_calls=0, cache=False)
+        served = StubHandler.requests_served
+        start = time.perf_counter()
+        batched = fetch_daily_weather_forecasts(cities, client)
+        batched_time = time.perf_counter() - start
+        batched_calls = StubHandler.requests_served - served
+        client.close()
+    finally:
+        builtins.print = quiet_print
+
+    assert concurrent == sequential, "forecasts differ"
+    assert batched == sequential, "batched forecasts differ"
+    assert sum(1 for forecasts in batched.values() if not forecasts) == failing
+    print(f"{'mode':<11} {'wall s':>7} {'requests':>9} {'empty':>6}")
+    print('-' * 36)
+    print(f"{'sequential':<11} {sequential_time:>7.2f} {n_cities:>9} {failing:>6}")
+    print(f"{'concurrent':<11} {concurrent_time:>7.2f} {concurrent_calls:>9} {failing:>6}  "
+          f"({sequential_time / concurrent_time:.0f}x, {client.max_concurrency} in flight)")
+    print(f"{'batched':<11} {batched_time:>7.2f} {batched_calls:>9} {failing:>6}  "
+          f"({sequential_time / batched_time:.0f}x, up to {MAX_BATCH_LOCATIONS} locations per request)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        FAIL_RATE = float(sys.argv[2])
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
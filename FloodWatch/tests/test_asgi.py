@@ -0,0 +1,88 @@
+"""
+The ASGI app (asgi.py) against the plain Flask app under werkzeug's test
+client: the same status, body and headers for requests as uvicorn hands
+them over (percent-decoded path, HEAD, request bodies split across several
+http.request messages).
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from app import create_app
+from asgi import AsyncFloodWatchApp
+
+BATCH_BODY = json.dumps({'queries': [{'type': 'city_forecast', 'city': 'Pune'},
+                                     {'type': 'daily_summary'}]}).encode()
+
+
+@pytest.fixture(scope='module')
+def flask_app():
+    return create_app()
+
+
+@pytest.fixture(scope='module')
+def asgi_app(flask_app):
+    app = AsyncFloodWatchApp(flask_app, max_threads=2)
+    yield app
+    app.executor.shutdown()
+
+
+def call_asgi(app, method, path, raw_path=None, body_chunks=(b'',), headers=()):
+    """(status, headers, body) of one request, body sent as one message per chunk"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path,
+        'raw_path': (raw_path or path).encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+        'client': ('127.0.0.1', 50000), 'server': ('127.0.0.1', 5000)
+    }
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(body_chunks) - 1}
+                for i, chunk in enumerate(body_chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start, body = sent
+    return start['status'], {k.decode(): v.decode() for k, v in start['headers']}, body['body']
+
+
+def test_percent_encoded_path(flask_app, asgi_app):
+    expected = flask_app.test_client().get('/api/forecast/city/%50une')
+    assert expected.status_code == 200
+    # uvicorn passes the decoded path, keeping the raw one in raw_path
+    status, _, body = call_asgi(asgi_app, 'GET', '/api/forecast/city/Pune', raw_path='/api/forecast/city/%50une')
+    assert status == 200
+    assert json.loads(body) == expected.get_json()
+
+
+def test_head(flask_app, asgi_app):
+    expected = flask_app.test_client().head('/api/forecast/daily-summary')
+    status, headers, _ = call_asgi(asgi_app, 'HEAD', '/api/forecast/daily-summary')
+    assert status == expected.status_code == 200
+    assert headers['content-type'] == expected.headers['Content-Type']
+    assert headers['etag'] == expected.headers['ETag']
+
+
+def test_body_in_several_messages(flask_app, asgi_app):
+    expected = flask_app.test_client().post('/api/batch', data=BATCH_BODY, content_type='application/json')
+    assert expected.status_code == 200
+    # A chunked upload arrives as several http.request messages
+    chunks = [BATCH_BODY[i:i + 16] for i in range(0, len(BATCH_BODY), 16)]
+    status, _, body = call_asgi(asgi_app, 'POST', '/api/batch', body_chunks=chunks,
+                                headers=[('Content-Type', 'application/json')])
+    assert status == 200
+    assert json.loads(body) == expected.get_json()
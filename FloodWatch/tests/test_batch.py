@@ -0,0 +1,101 @@
+"""
+POST /api/batch (batch_routes.py): every sub-query result matches the
+single endpoint it stands for, results keep request order and ids, and
+malformed bodies (including a non-string "fields") are answered 400.
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from app import create_app
+from config import Config
+
+# (sub-query, matching single endpoint)
+QUERIES = [
+    ({'type': 'city_forecast', 'city': 'Pune'}, '/api/forecast/city/Pune'),
+    ({'type': 'city_forecast', 'city': 'Baramati'}, '/api/forecast/city/Baramati'),
+    ({'type': 'date_forecast', 'date': '2025-08-21'}, '/api/forecast/date/2025-08-21'),
+    ({'type': 'coordinates', 'city': 'Pune'}, '/api/data/coordinates/Pune'),
+    ({'type': 'daily_summary'}, '/api/forecast/daily-summary'),
+    ({'type': 'city_summary'}, '/api/forecast/city-summary'),
+    ({'type': 'city_forecast', 'city': 'Nowhere'}, '/api/forecast/city/Nowhere'),
+    ({'type': 'date_forecast', 'date': '1999-01-01'}, '/api/forecast/date/1999-01-01'),
+]
+
+
+@pytest.fixture(scope='module')
+def app():
+    return create_app()
+
+
+@pytest.fixture(scope='module')
+def client(app):
+    return app.test_client()
+
+
+def post(client, body):
+    return client.post('/api/batch', data=json.dumps(body), content_type='application/json')
+
+
+def test_results_match_single_endpoints(client):
+    body = {'queries': [dict(query, id=i) for i, (query, _) in enumerate(QUERIES)]}
+    response = post(client, body)
+    assert response.status_code == 200
+    payload = response.get_json()
+    assert payload['count'] == len(QUERIES)
+
+    for i, ((query, url), result) in enumerate(zip(QUERIES, payload['results'])):
+        single = client.get(url)
+        assert result['type'] == query['type']
+        assert result['id'] == i
+        assert result['status'] == single.status_code, url
+        if single.status_code == 200:
+            assert result['data'] == single.get_json(), url
+        else:
+            assert 'error' in result
+
+
+def test_summary_matches_data_loader(app, client):
+    result = post(client, {'queries': [{'type': 'summary'}]}).get_json()['results'][0]
+    with app.test_request_context():
+        expected = json.loads(json.dumps(app.data_loader.get_summary_stats()))
+    assert result['data'] == expected
+
+
+@pytest.mark.parametrize('fields', ['Date,Flood_Probability', ['Date', 'Flood_Probability']])
+def test_fields_match_projected_endpoint(client, fields):
+    result = post(client, {'queries': [QUERIES[0][0]], 'fields': fields}).get_json()['results'][0]
+    assert result['data'] == client.get('/api/forecast/city/Pune?fields=Date,Flood_Probability').get_json()
+
+
+@pytest.mark.parametrize('body', [
+    None,
+    [],
+    {'queries': 'Pune'},
+    {'queries': []},
+    {'queries': [{'type': 'weather'}]},
+    {'queries': [{'type': 'city_forecast'}]},
+    {'queries': [{'type': 'date_forecast', 'date': 20250821}]},
+    {'queries': [{'type': 'summary'}], 'fields': 5},
+    {'queries': [{'type': 'summary'}], 'fields': {'City': True}},
+    {'queries': [{'type': 'summary'}], 'fields': ['City', 5]},
+])
+def test_invalid_body_is_400(client, body):
+    response = post(client, body)
+    assert response.status_code == 400
+    payload = response.get_json()
+    assert payload['error'] == 'Invalid request parameters provided.'
+    assert payload['message']
+
+
+def test_too_many_queries_is_400(client):
+    body = {'queries': [{'type': 'summary'}] * (Config.MAX_BATCH_QUERIES + 1)}
+    assert post(client, body).status_code == 400
@@ -0,0 +1,121 @@
+"""
+Risk-zone point clusters (clustering.py): every zoom level accounts for
+every location once, opening clusters through /clusters/<id>/children
+down to their expansion zooms reaches each city exactly once with the
+parent's aggregates split over its children, bbox queries match a brute
+force filter, and invalid requests are answered 400/404.
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from app import create_app
+from config import Config
+
+
+@pytest.fixture(scope='module')
+def client():
+    return create_app().test_client()
+
+
+@pytest.fixture(scope='module')
+def risk_zones(client):
+    return pd.DataFrame(client.get('/api/data/risk-zones?group_by_city=false').get_json()['risk_zones'])
+
+
+def clusters(client, query):
+    response = client.get(f"/api/data/clusters?{query}")
+    assert response.status_code == 200
+    return response.get_json()['clusters']
+
+
+def children(client, cluster_id, query=''):
+    response = client.get(f"/api/data/clusters/{cluster_id}/children{query}")
+    assert response.status_code == 200
+    return response.get_json()
+
+
+@pytest.mark.parametrize('zoom', range(Config.CLUSTER_MIN_ZOOM, Config.CLUSTER_MAX_ZOOM + 3))
+def test_every_zoom_covers_every_location(client, risk_zones, zoom):
+    elements = clusters(client, f"zoom={zoom}")
+    locations = risk_zones[['Latitude', 'Longitude']].drop_duplicates()
+    assert sum(e['city_count'] for e in elements) == len(locations)
+    assert sum(e['red_alerts'] for e in elements) == (risk_zones['Alert_Level'] == 'RED').sum()
+    assert sum(e['orange_alerts'] for e in elements) == (risk_zones['Alert_Level'] == 'ORANGE').sum()
+    assert len({e['id'] for e in elements}) == len(elements)
+
+
+def open_all(client, element, date_query, zoom, cities):
+    """Open a cluster recursively, checking each split against its parent"""
+    if not element['cluster']:
+        cities.append(element['city'])
+        return
+    assert element['expansion_zoom'] > zoom
+    opened = children(client, element['id'], date_query)
+    assert opened['zoom'] == element['expansion_zoom']
+    parts = opened['children']
+    assert len(parts) >= 2
+    assert sum(p['city_count'] for p in parts) == element['city_count']
+    assert sum(p['red_alerts'] for p in parts) == element['red_alerts']
+    assert max(p['max_probability'] for p in parts) == element['max_probability']
+    # The children are exactly what the map shows at the expansion zoom
+    at_zoom = {e['id'] for e in clusters(client, f"zoom={opened['zoom']}{date_query.replace('?', '&')}")}
+    assert {p['id'] for p in parts} <= at_zoom
+    for part in parts:
+        open_all(client, part, date_query, opened['zoom'], cities)
+
+
+@pytest.mark.parametrize('date', [None, '2025-08-21'])
+def test_expanding_reaches_every_city_once(client, risk_zones, date):
+    date_query = f"?date={date}" if date else ''
+    rows = risk_zones if date is None else risk_zones[risk_zones['Date'] == date]
+    cities = []
+    for element in clusters(client, f"zoom=0{date_query.replace('?', '&')}"):
+        open_all(client, element, date_query, 0, cities)
+    assert sorted(cities) == sorted(rows['City'].unique())
+
+
+def test_leaf_aggregates_match_rows(client, risk_zones):
+    leaves = {e['city']: e for e in clusters(client, f"zoom={Config.CLUSTER_MAX_ZOOM + 1}")}
+    pune = risk_zones[risk_zones['City'] == 'Pune']
+    leaf = leaves['Pune']
+    assert leaf['city_count'] == 1
+    assert leaf['max_probability'] == round(pune['Flood_Probability'].max(), 3)
+    assert leaf['mean_probability'] == round(pune['Flood_Probability'].mean(), 3)
+    assert leaf['latitude'] == pytest.approx(pune['Latitude'].iloc[0], abs=1e-5)
+    assert leaf['longitude'] == pytest.approx(pune['Longitude'].iloc[0], abs=1e-5)
+
+
+@pytest.mark.parametrize('zoom', [4, 8, 12])
+@pytest.mark.parametrize('bbox', [(73.0, 17.5, 75.0, 19.5), (72.0, 15.0, 81.0, 23.0), (0.0, 0.0, 1.0, 1.0)])
+def test_bbox_matches_brute_force(client, zoom, bbox):
+    west, south, east, north = bbox
+    expected = [e for e in clusters(client, f"zoom={zoom}")
+                if west <= e['longitude'] <= east and south <= e['latitude'] <= north]
+    found = clusters(client, f"zoom={zoom}&bbox={','.join(map(str, bbox))}")
+    assert sorted(e['id'] for e in found) == sorted(e['id'] for e in expected)
+
+
+@pytest.mark.parametrize('url,status', [
+    ('/api/data/clusters', 400),
+    ('/api/data/clusters?zoom=-1', 400),
+    ('/api/data/clusters?zoom=abc', 400),
+    ('/api/data/clusters?zoom=3&bbox=1,2,3', 400),
+    ('/api/data/clusters?zoom=3&date=1999-01-01', 404),
+    ('/api/data/clusters/999999/children', 404),
+])
+def test_invalid_requests(client, url, status):
+    assert client.get(url).status_code == status
+
+
+def test_leaf_has_no_children(client):
+    leaf = clusters(client, f"zoom={Config.CLUSTER_MAX_ZOOM + 1}")[0]
+    assert client.get(f"/api/data/clusters/{leaf['id']}/children").status_code == 404
@@ -0,0 +1,99 @@
+"""
+Round trip of the Arrow IPC and MessagePack responses against the JSON
+response for the same query: columns, dtypes and the envelope (the Arrow
+schema metadata under b'floodwatch', the surrounding map for MessagePack).
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+msgpack = pytest.importorskip('msgpack')
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from app import create_app
+from columnar import ARROW_METADATA_KEY, ARROW_STREAM_MIMETYPE, MSGPACK_MIMETYPE
+
+ENDPOINTS = [
+    ('/api/forecast/7day?group_by_city=false', 'predictions'),
+    ('/api/forecast/7day?group_by_city=false&city=Pune', 'predictions'),
+    ('/api/data/risk-zones?group_by_city=false', 'risk_zones'),
+    ('/api/data/plotting?group_by_city=false&min_probability=0.1', 'plotting_data'),
+    ('/api/data/plotting?group_by_city=false&limit=20&fields=City,Date,Flood_Probability', 'plotting_data'),
+]
+
+
+@pytest.fixture(scope='module')
+def client():
+    return create_app().test_client()
+
+
+def json_reference(client, url, table_key):
+    response = client.get(url)
+    assert response.status_code == 200
+    payload = response.get_json()
+    return pd.DataFrame(payload.pop(table_key)), payload
+
+
+def value_kind(dtype):
+    """'i' (integer), 'f' (float), 'b' (bool) or 'O' (text) for a column dtype"""
+    if isinstance(dtype, pd.CategoricalDtype):
+        dtype = dtype.categories.dtype
+    kind = getattr(dtype, 'kind', 'O')
+    return kind if kind in 'ifb' else 'O'
+
+
+def assert_matches_json(frame, expected):
+    assert list(frame.columns) == list(expected.columns)
+    assert len(frame) == len(expected)
+    for col in expected.columns:
+        assert value_kind(frame[col].dtype) == value_kind(expected[col].dtype), col
+    plain = frame.apply(lambda col: col.astype(object) if value_kind(col.dtype) == 'O' else col)
+    pd.testing.assert_frame_equal(plain.astype(object), expected.astype(object), check_dtype=False)
+
+
+@pytest.mark.parametrize('url,table_key', ENDPOINTS)
+def test_arrow_round_trip(client, url, table_key):
+    expected, envelope = json_reference(client, url, table_key)
+    response = client.get(url, headers={'Accept': ARROW_STREAM_MIMETYPE})
+    assert response.status_code == 200
+    assert response.mimetype == ARROW_STREAM_MIMETYPE
+
+    table = pa.ipc.open_stream(response.get_data()).read_all()
+    assert json.loads(table.schema.metadata[ARROW_METADATA_KEY]) == envelope
+    assert_matches_json(table.to_pandas(), expected)
+
+
+@pytest.mark.parametrize('url,table_key', ENDPOINTS)
+def test_msgpack_round_trip(client, url, table_key):
+    expected, envelope = json_reference(client, url, table_key)
+    response = client.get(url, headers={'Accept': MSGPACK_MIMETYPE})
+    assert response.status_code == 200
+    assert response.mimetype == MSGPACK_MIMETYPE
+
+    document = msgpack.unpackb(response.get_data())
+    table = document.pop(table_key)
+    assert document == envelope
+    assert table['columns'] == list(expected.columns)
+    assert_matches_json(pd.DataFrame(table['data'], columns=table['columns']), expected)
+
+
+def test_legacy_msgpack_mimetype(client):
+    url = ENDPOINTS[0][0]
+    response = client.get(url, headers={'Accept': 'application/x-msgpack'})
+    assert response.mimetype == MSGPACK_MIMETYPE
+
+
+def test_json_still_default(client):
+    url = ENDPOINTS[0][0]
+    response = client.get(url, headers={'Accept': '*/*'})
+    assert response.mimetype == 'application/json'
+    assert 'Accept' in response.headers['Vary']
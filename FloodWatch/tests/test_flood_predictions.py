@@ -0,0 +1,169 @@
+"""
+Batched flood predictions (make_flood_predictions_for_cities) against the
+per-city, per-day predict_proba loop they replaced: models with and without
+feature names, a model without predict_proba, cities with missing days,
+and the single-city make_daily_flood_predictions wrapper.
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import LinearSVC
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'training'))
+
+from enhanced_forecast import (
+    FEATURE_COLUMNS, categorize_flood_risk, make_daily_flood_predictions, make_flood_predictions_for_cities
+)
+
+
+def loop_predictions(daily_weather_forecasts, daily_reservoir_forecasts, model):
+    """The per-day loop of make_daily_flood_predictions before batching"""
+    daily_predictions = []
+    for day in range(7):
+        try:
+            weather_features = daily_weather_forecasts[day]['weather']
+            reservoir_features = [
+                daily_reservoir_forecasts[day]['avg_fill'],
+                daily_reservoir_forecasts[day]['max_fill'],
+                daily_reservoir_forecasts[day]['risk_score'],
+                daily_reservoir_forecasts[day]['above_danger']
+            ]
+            combined_features = weather_features + reservoir_features
+            expected_cols = list(model.feature_names_in_) if hasattr(model, 'feature_names_in_') else FEATURE_COLUMNS
+            X_infer = pd.DataFrame([combined_features], columns=expected_cols)
+            prediction = model.predict(X_infer)[0]
+            try:
+                flood_probability = model.predict_proba(X_infer)[0][1]
+            except Exception:
+                flood_probability = 0.8 if prediction == 1 else 0.2
+
+            risk_category = categorize_flood_risk(
+                flood_probability, weather_features[4], daily_reservoir_forecasts[day]['risk_score']
+            )
+            if flood_probability > 0.7 or flood_probability < 0.3:
+                confidence = "High"
+            else:
+                confidence = "Medium" if day <= 3 else "Low"
+            reason = []
+            if weather_features[4] > 80:
+                reason.append(f"Heavy rainfall {weather_features[4]:.1f}mm")
+            elif weather_features[4] > 40:
+                reason.append(f"Moderate rainfall {weather_features[4]:.1f}mm")
+            if reservoir_features[1] > 90:
+                reason.append(f"Reservoir critical {reservoir_features[1]:.1f}%")
+            elif reservoir_features[1] > 75:
+                reason.append(f"Reservoir high {reservoir_features[1]:.1f}%")
+            if not reason:
+                reason = ["Normal conditions"]
+
+            daily_predictions.append({
+                'date': daily_weather_forecasts[day]['date'],
+                'flood_prediction': int(prediction),
+                'flood_probability': float(flood_probability),
+                'risk_category': risk_category,
+                'confidence': confidence,
+                'weather_precip': weather_features[4],
+                'max_reservoir_fill': reservoir_features[1],
+                'explanation': "; ".join(reason)
+            })
+        except Exception:
+            daily_predictions.append({
+                'date': f"Day_{day+1}", 'flood_prediction': 0, 'flood_probability': 0.0, 'risk_category': 'Low',
+                'confidence': 'Low', 'weather_precip': 0, 'max_reservoir_fill': 0, 'explanation': ""
+            })
+    return daily_predictions
+
+
+def training_frame(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        'temp_avg': rng.uniform(18, 35, n), 'temp_max': rng.uniform(22, 42, n),
+        'wind_speed': rng.uniform(0, 40, n), 'cloud_cover': rng.uniform(0, 100, n),
+        'precipitation': rng.gamma(1.0, 30.0, n), 'humidity': rng.uniform(30, 100, n),
+        'precip_cover': rng.uniform(0, 100, n), 'avg_reservoir_fill': rng.uniform(10, 100, n),
+        'max_reservoir_fill': rng.uniform(20, 110, n), 'reservoir_risk_score': rng.integers(0, 6, n),
+        'reservoirs_above_danger': rng.integers(0, 4, n),
+    })[FEATURE_COLUMNS]
+    flood = (frame['precipitation'] / 60 + frame['max_reservoir_fill'] / 100 + rng.normal(0, 0.4, n)) > 1.6
+    return frame, flood.astype(int)
+
+
+def city_forecasts(n_cities=25, seed=1):
+    rng = np.random.default_rng(seed)
+    forecasts = []
+    for c in range(n_cities):
+        weather = [{
+            'date': f"2025-08-{21 + day}",
+            'weather': [float(v) for v in (rng.uniform(18, 35), rng.uniform(22, 42), rng.uniform(0, 40),
+                                           rng.uniform(0, 100), rng.gamma(1.0, 40.0), rng.uniform(30, 100),
+                                           rng.uniform(0, 100))],
+        } for day in range(7)]
+        reservoir = [{
+            'day': day + 1, 'avg_fill': float(rng.uniform(10, 100)), 'max_fill': float(rng.uniform(20, 110)),
+            'risk_score': int(rng.integers(0, 6)), 'above_danger': int(rng.integers(0, 4)),
+        } for day in range(7)]
+        forecasts.append((weather, reservoir))
+    # Short weather and reservoir forecasts lose only the missing days
+    forecasts[3] = (forecasts[3][0][:4], forecasts[3][1])
+    forecasts[7] = (forecasts[7][0], forecasts[7][1][:2])
+    return forecasts
+
+
+def fitted_models():
+    frame, flood = training_frame()
+    return {
+        'named': LogisticRegression(max_iter=2000).fit(frame, flood),
+        'unnamed': RandomForestClassifier(n_estimators=20, random_state=0).fit(frame.to_numpy(), flood),
+        'no_predict_proba': LinearSVC().fit(frame, flood),
+    }
+
+
+MODELS = fitted_models()
+
+
+def assert_same_predictions(batched, looped):
+    assert len(batched) == len(looped)
+    for new, old in zip(batched, looped):
+        assert new['flood_probability'] == pytest.approx(old['flood_probability'], abs=1e-12)
+        assert {k: v for k, v in new.items() if k != 'flood_probability'} == \
+            {k: v for k, v in old.items() if k != 'flood_probability'}
+
+
+@pytest.mark.filterwarnings('ignore:X has feature names')
+@pytest.mark.parametrize('name', MODELS)
+def test_batch_matches_per_city_loop(name):
+    model = MODELS[name]
+    forecasts = city_forecasts()
+    batched = make_flood_predictions_for_cities(forecasts, model)
+    assert len(batched) == len(forecasts)
+    for (weather, reservoir), predictions in zip(forecasts, batched):
+        assert_same_predictions(predictions, loop_predictions(weather, reservoir, model))
+
+
+def test_missing_days_fall_back_per_day():
+    batched = make_flood_predictions_for_cities(city_forecasts(), MODELS['named'])
+    assert [p['date'] for p in batched[3][4:]] == ['Day_5', 'Day_6', 'Day_7']
+    assert [p['date'] for p in batched[7][2:]] == [f"Day_{day}" for day in range(3, 8)]
+    assert batched[3][3]['date'] == '2025-08-24'
+
+
+def test_single_city_wrapper():
+    weather, reservoir = city_forecasts()[0]
+    model = MODELS['named']
+    assert_same_predictions(make_daily_flood_predictions(weather, reservoir, model),
+                            loop_predictions(weather, reservoir, model))
+
+
+def test_no_city_forecasts():
+    assert make_flood_predictions_for_cities([], MODELS['named']) == []
+    failed = make_flood_predictions_for_cities([([], [])], MODELS['named'])
+    assert [p['date'] for p in failed[0]] == [f"Day_{day}" for day in range(1, 8)]
@@ -0,0 +1,88 @@
+"""
+ETag / If-None-Match handling (http_cache.py) across response formats and
+encodings: every representation has its own tag, a matching If-None-Match
+is answered 304 with the headers of the 200, and a tag of another
+representation never is.
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import itertools
+import os
+import sys
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from app import create_app
+from columnar import ARROW_STREAM_MIMETYPE, MSGPACK_MIMETYPE, msgpack, pa
+
+COLUMNAR_URL = '/api/forecast/7day?group_by_city=false'
+JSON_ONLY_URL = '/api/forecast/daily-summary'
+
+VARIANTS = [{}, {'Accept-Encoding': 'gzip'}]
+if pa is not None:
+    VARIANTS += [{'Accept': ARROW_STREAM_MIMETYPE}, {'Accept': ARROW_STREAM_MIMETYPE, 'Accept-Encoding': 'gzip'}]
+if msgpack is not None:
+    VARIANTS += [{'Accept': MSGPACK_MIMETYPE}]
+
+
+@pytest.fixture(scope='module')
+def client():
+    return create_app().test_client()
+
+
+def vary(response):
+    return {value.strip() for value in response.headers.get('Vary', '').split(',') if value.strip()}
+
+
+@pytest.mark.parametrize('url', [COLUMNAR_URL, JSON_ONLY_URL])
+@pytest.mark.parametrize('headers', VARIANTS, ids=lambda h: '+'.join(h.values()) or 'identity')
+def test_matching_tag_is_304_with_same_headers(client, url, headers):
+    first = client.get(url, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    second = client.get(url, headers={**headers, 'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.get_data() == b''
+    assert second.headers['ETag'] == etag
+    assert vary(second) == vary(first)
+    assert second.headers['Cache-Control'] == first.headers['Cache-Control']
+
+
+def test_vary_lists_negotiated_headers(client):
+    assert vary(client.get(COLUMNAR_URL)) == {'Accept', 'Accept-Encoding'}
+    assert vary(client.get(JSON_ONLY_URL)) == {'Accept-Encoding'}
+
+
+def test_each_representation_has_its_own_tag(client):
+    tags = [client.get(COLUMNAR_URL, headers=headers).headers['ETag'] for headers in VARIANTS]
+    assert len(set(tags)) == len(tags)
+
+
+@pytest.mark.parametrize('served,offered', list(itertools.permutations(range(len(VARIANTS)), 2)))
+def test_tag_of_other_representation_is_200(client, served, offered):
+    other_tag = client.get(COLUMNAR_URL, headers=VARIANTS[offered]).headers['ETag']
+    response = client.get(COLUMNAR_URL, headers={**VARIANTS[served], 'If-None-Match': other_tag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != other_tag
+
+
+def test_tag_among_several_is_304(client):
+    etag = client.get(COLUMNAR_URL).headers['ETag']
+    response = client.get(COLUMNAR_URL, headers={'If-None-Match': f'"stale", {etag}, "other"'})
+    assert response.status_code == 304
+
+
+def test_tag_depends_on_query(client):
+    assert (client.get(COLUMNAR_URL).headers['ETag']
+            != client.get(COLUMNAR_URL + '&city=Pune').headers['ETag'])
+
+
+def test_errors_carry_no_tag(client):
+    response = client.get('/api/forecast/city/Nowhere')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
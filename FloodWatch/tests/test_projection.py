@@ -0,0 +1,93 @@
+"""
+fields= column projection (projection.py): projected responses keep only
+the requested columns with the same values as the full response, aliases
+expand, one list may span several tables, and names that match no column
+of the response are answered 400.
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from app import create_app
+from projection import parse_fields, project_columns
+
+
+@pytest.fixture(scope='module')
+def client():
+    return create_app().test_client()
+
+
+@pytest.mark.parametrize('url,table_key', [
+    ('/api/forecast/7day?group_by_city=false', 'predictions'),
+    ('/api/data/risk-zones?group_by_city=false', 'risk_zones'),
+    ('/api/data/plotting?group_by_city=false', 'plotting_data'),
+])
+def test_projection_matches_full_response(client, url, table_key):
+    full = client.get(url).get_json()[table_key]
+    response = client.get(f"{url}&fields=Flood_Probability,City,Date")
+    assert response.status_code == 200
+    projected = response.get_json()[table_key]
+    # Columns stay in frame order, whatever the order requested
+    order = [col for col in full[0] if col in ('City', 'Date', 'Flood_Probability')]
+    assert [list(row) for row in projected] == [order] * len(full)
+    assert projected == [{col: row[col] for col in order} for row in full]
+
+
+def test_alias_expands(client):
+    rows = client.get('/api/forecast/7day?group_by_city=false&fields=City,coordinates').get_json()['predictions']
+    assert set(rows[0]) == {'City', 'Latitude', 'Longitude'}
+
+
+def test_grouped_days_are_projected(client):
+    groups = client.get('/api/forecast/7day?fields=Date,Flood_Probability').get_json()['predictions']
+    assert all(set(day) == {'Date', 'Flood_Probability'} for group in groups for day in group['days'])
+
+
+def test_fields_spanning_tables(client):
+    # city_forecast rows have Flood_Probability, the daily summary has Total_Cities
+    body = {'queries': [{'type': 'city_forecast', 'city': 'Pune'}, {'type': 'daily_summary'}],
+            'fields': ['City', 'Flood_Probability', 'Total_Cities']}
+    assert client.post('/api/batch', json=body).status_code == 200
+
+
+@pytest.mark.parametrize('url', [
+    '/api/forecast/7day?group_by_city=false&fields=City,Bogus',
+    '/api/forecast/7day?fields=Nope',
+    '/api/forecast/city/Pune?fields=Date,Flood_Probabilty',
+    '/api/data/risk-zones?group_by_city=false&fields=City,Unknown_Column',
+])
+def test_unknown_field_is_400(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    payload = response.get_json()
+    assert payload['error'] == 'Invalid request parameters provided.'
+    assert payload['message'].startswith('Unknown fields: ')
+    assert 'ETag' not in response.headers
+
+
+def test_unknown_field_is_400_for_arrow(client):
+    pytest.importorskip('pyarrow')
+    response = client.get('/api/forecast/7day?group_by_city=false&fields=City,Bogus',
+                          headers={'Accept': 'application/vnd.apache.arrow.stream'})
+    assert response.status_code == 400
+
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields(' , ') is None
+    assert parse_fields('City, Date ,coordinates') == {'City', 'Date', 'Latitude', 'Longitude'}
+    assert parse_fields(['City', 'Date']) == {'City', 'Date'}
+
+
+def test_project_columns_outside_a_request():
+    df = pd.DataFrame({'City': ['Pune'], 'Date': ['2025-08-21'], 'Extra': [1]})
+    assert list(project_columns(df, frozenset({'Date', 'City', 'Missing'})).columns) == ['City', 'Date']
+    assert project_columns(df, None) is df
@@ -0,0 +1,105 @@
+"""
+The vectorized reservoir forecast (forecast_all_reservoir_levels) against
+the per-city scalar loop it replaced: risk scores at the threshold
+boundaries and for NaN, whole forecasts from a history file, and the
+precomputed per-city overrides with and without a history file.
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'training'))
+
+from enhanced_forecast import (
+    forecast_all_reservoir_levels, forecast_reservoir_levels, reservoir_risk_scores, seasonal_adjustment
+)
+
+
+def scalar_risk_score(predicted_level):
+    """The if/elif chain of the per-city loop"""
+    risk_score = 0
+    if predicted_level > 95: risk_score = 5
+    elif predicted_level > 85: risk_score = 4
+    elif predicted_level > 75: risk_score = 3
+    elif predicted_level > 65: risk_score = 2
+    elif predicted_level > 55: risk_score = 1
+    return risk_score
+
+
+def scalar_forecast(city_data, days=7):
+    """The per-city trend forecast, for one city's rows sorted by date"""
+    if len(city_data) < 14:
+        last_row = city_data.iloc[-1]
+        return [[last_row['Avg_Reservoir_Fill'], last_row['Max_Reservoir_Fill'],
+                 last_row['Reservoir_Risk_Score'], last_row['Reservoirs_Above_Danger']]] * days
+    fill_levels = city_data['Avg_Reservoir_Fill'].values[-30:]
+    recent_trend = np.mean(fill_levels[-7:]) - np.mean(fill_levels[-14:-7])
+    adjustment = seasonal_adjustment(datetime.now().month)
+    rows = []
+    for day in range(days):
+        predicted_level = fill_levels[-1] + recent_trend * (day + 1) + adjustment * (day + 1) * 0.1
+        predicted_level = max(0, min(100, predicted_level))
+        rows.append([predicted_level, min(100, predicted_level + 5),
+                     scalar_risk_score(predicted_level), 1 if predicted_level > 80 else 0])
+    return rows
+
+
+def history_frame():
+    rng = np.random.default_rng(3)
+    dates = pd.date_range('2025-06-01', periods=40)
+    frames = []
+    # Rising, falling and flat cities, one pinned to the 55/65/75/85/95 boundaries, one with short history
+    for city, start, slope, n in [('Rising', 60, 1.5, 40), ('Falling', 90, -2.0, 30), ('Flat', 75, 0.0, 20),
+                                  ('Short', 50, 1.0, 5)]:
+        fill = np.clip(start + slope * np.arange(n) + rng.normal(0, 0.5, n), 0, 100)
+        frames.append(pd.DataFrame({'City': city, 'Date': dates[:n], 'Avg_Reservoir_Fill': fill}))
+    boundaries = np.array([55, 65, 75, 85, 95] * 3, dtype=float)
+    frames.append(pd.DataFrame({'City': 'Boundary', 'Date': dates[:15], 'Avg_Reservoir_Fill': boundaries}))
+    df = pd.concat(frames, ignore_index=True)
+    df['Max_Reservoir_Fill'] = np.minimum(100, df['Avg_Reservoir_Fill'] + 5)
+    df['Reservoir_Risk_Score'] = [scalar_risk_score(level) for level in df['Avg_Reservoir_Fill']]
+    df['Reservoirs_Above_Danger'] = (df['Avg_Reservoir_Fill'] > 80).astype(int)
+    # Shuffled, as the vectorized path must not rely on file order
+    return df.sample(frac=1, random_state=0)
+
+
+def test_risk_scores_match_scalar_chain():
+    levels = [np.nan, 0, 54.9, 55, 55.01, 65, 65.5, 75, 80, 85, 85.5, 95, 95.01, 100, -np.inf, np.inf]
+    assert list(reservoir_risk_scores(levels)) == [scalar_risk_score(level) for level in levels]
+
+
+def test_forecasts_match_per_city_loop(tmp_path):
+    df = history_frame()
+    path = tmp_path / 'aggregated_reservoir_data.csv'
+    df.to_csv(path, index=False)
+
+    city_index, forecasts = forecast_all_reservoir_levels(str(path))
+    assert set(city_index) == set(df['City'])
+    for city, city_data in df.groupby('City'):
+        expected = scalar_forecast(city_data.sort_values('Date'))
+        np.testing.assert_allclose(forecasts[city_index[city]], np.array(expected, dtype=float), atol=1e-9)
+
+
+@pytest.mark.parametrize('with_history', [True, False])
+def test_precomputed_overrides(tmp_path, with_history):
+    if with_history:
+        history_frame().to_csv(tmp_path / 'aggregated_reservoir_data.csv', index=False)
+    dates = pd.date_range('2025-08-01', periods=7).strftime('%Y-%m-%d')
+    pd.DataFrame({'City': 'Rising', 'Date': dates[::-1], 'avg_fill': np.arange(7, 0, -1) * 10.0,
+                  'max_fill': 99.0, 'risk_score': 4, 'above_danger': 1}
+                 ).to_csv(tmp_path / 'reservoir_7day_forecasts.csv', index=False)
+
+    forecast = forecast_reservoir_levels('Rising', str(tmp_path / 'aggregated_reservoir_data.csv'))
+    assert [day['avg_fill'] for day in forecast] == [10.0, 20.0, 30.0, 40.0, 50.0, 60.0, 70.0]
+    assert all(day['risk_score'] == 4 and day['above_danger'] == 1 for day in forecast)
+    # Cities without an override keep their trend forecast (or none without history)
+    city_index, _ = forecast_all_reservoir_levels(str(tmp_path / 'aggregated_reservoir_data.csv'))
+    assert ('Falling' in city_index) == with_history
@@ -0,0 +1,153 @@
+"""
+The KD-tree spatial index (spatial_index.py) against brute force: bbox
+row filtering (including boxes across the antimeridian and whole-world
+boxes), nearest-N and radius queries, the bbox= filter of /7day and
+/plotting and /risk-zones, /api/data/nearby, and 400s for invalid
+parameters.
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from app import create_app
+from spatial_index import EARTH_RADIUS_KM, SpatialIndex
+
+
+def random_frame(n=3000, seed=0):
+    """Rows on a few hundred locations worldwide, with duplicates and unindexed rows"""
+    rng = np.random.default_rng(seed)
+    locations = np.column_stack((rng.uniform(-89, 89, 400), rng.uniform(-180, 180, 400)))
+    # Points hugging the antimeridian and the box edges used below
+    locations[:20, 1] = rng.choice([-180, -179.9, 179.9, 180], 20)
+    locations[20:25] = [[10, 20], [10, 30], [20, 20], [20, 30], [15, 25]]
+    picks = rng.integers(0, len(locations), n)
+    lat, lon = locations[picks, 0].copy(), locations[picks, 1].copy()
+    lat[:30] = np.nan
+    lon[30:60] = 0
+    return pd.DataFrame({'City': [f"C{i}" for i in picks], 'Latitude': lat, 'Longitude': lon})
+
+
+def brute_force_bbox(frame, bbox):
+    west, south, east, north = bbox
+    lat, lon = frame['Latitude'].to_numpy(), frame['Longitude'].to_numpy()
+    indexed = np.isfinite(lat) & np.isfinite(lon) & (lat != 0) & (lon != 0)
+    if west <= east:
+        in_lon = (lon >= west) & (lon <= east)
+    else:
+        in_lon = (lon >= west) | (lon <= east)
+    return np.flatnonzero(indexed & (lat >= south) & (lat <= north) & in_lon)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture(scope='module')
+def frame():
+    return random_frame()
+
+
+@pytest.fixture(scope='module')
+def index(frame):
+    return SpatialIndex(frame)
+
+
+BBOXES = [
+    (20, 10, 30, 20),             # edges exactly on indexed points
+    (-10, -10, 10, 10),
+    (170, -30, -170, 30),         # across the antimeridian
+    (179.9, -89, -179.9, 89),
+    (-180, -90, 180, 90),         # whole world
+    (-60, 40, 60, 85),            # wider than it is tall, near the pole
+    (5, 5, 5, 5),                 # a point
+]
+
+
+@pytest.mark.parametrize('bbox', BBOXES)
+def test_bbox_rows_match_brute_force(frame, index, bbox):
+    np.testing.assert_array_equal(index.bbox_rows(bbox), brute_force_bbox(frame, bbox))
+
+
+def test_random_bboxes_match_brute_force(frame, index):
+    rng = np.random.default_rng(1)
+    for _ in range(300):
+        south, north = np.sort(rng.uniform(-90, 90, 2))
+        west, east = rng.uniform(-180, 180, 2)
+        bbox = (west, south, east, north)
+        np.testing.assert_array_equal(index.bbox_rows(bbox), brute_force_bbox(frame, bbox), err_msg=str(bbox))
+
+
+def test_bbox_rows_intersect_given_rows(frame, index):
+    rows = np.arange(0, len(frame), 3)
+    bbox = BBOXES[1]
+    np.testing.assert_array_equal(index.bbox_rows(bbox, rows), np.intersect1d(rows, brute_force_bbox(frame, bbox)))
+
+
+@pytest.mark.parametrize('lat,lon,limit,radius_km', [
+    (15, 25, 5, None), (0, 179.95, 10, None), (-45, -120, 50, 2000.0), (89, 0, 400, None), (0, 0, 3, 1.0),
+])
+def test_nearest_matches_brute_force(index, lat, lon, limit, radius_km):
+    locations, distances = index.nearest(lat, lon, limit, radius_km)
+    all_distances = haversine_km(lat, lon, index.latitudes, index.longitudes)
+    expected = np.sort(all_distances)
+    if radius_km is not None:
+        expected = expected[expected <= radius_km]
+    expected = expected[:limit]
+    np.testing.assert_allclose(distances, expected, atol=1e-6)
+    np.testing.assert_allclose(all_distances[locations], distances, atol=1e-6)
+
+
+@pytest.fixture(scope='module')
+def client():
+    return create_app().test_client()
+
+
+@pytest.mark.parametrize('url,table_key', [
+    ('/api/forecast/7day?group_by_city=false', 'predictions'),
+    ('/api/data/plotting?group_by_city=false', 'plotting_data'),
+    ('/api/data/risk-zones?group_by_city=false', 'risk_zones'),
+])
+@pytest.mark.parametrize('bbox', [(73.5, 18.0, 74.5, 19.0), (72.0, 15.0, 81.0, 23.0), (0.0, 0.0, 1.0, 1.0)])
+def test_bbox_filter_matches_brute_force(client, url, table_key, bbox):
+    rows = client.get(url).get_json()[table_key]
+    response = client.get(f"{url}&bbox={','.join(map(str, bbox))}")
+    assert response.status_code == 200
+    expected = pd.DataFrame(rows).iloc[brute_force_bbox(pd.DataFrame(rows), bbox)].to_dict('records')
+    assert response.get_json()[table_key] == expected
+
+
+def test_nearby_matches_brute_force(client):
+    payload = client.get('/api/data/nearby?lat=18.52&lon=73.85&limit=5').get_json()
+    rows = client.get('/api/forecast/7day?group_by_city=false').get_json()['predictions']
+    points = pd.DataFrame(rows)[['Latitude', 'Longitude']].drop_duplicates()
+    distances = np.sort(haversine_km(18.52, 73.85, points['Latitude'], points['Longitude']))[:5]
+    assert payload['count'] == 5
+    np.testing.assert_allclose([city['distance_km'] for city in payload['cities']], distances, atol=1e-3)
+
+
+@pytest.mark.parametrize('url', [
+    '/api/forecast/7day?bbox=1,2,3',
+    '/api/forecast/7day?bbox=a,b,c,d',
+    '/api/forecast/7day?bbox=0,20,10,10',
+    '/api/data/plotting?bbox=-200,0,10,10',
+    '/api/data/risk-zones?bbox=0,0,10,nan',
+    '/api/data/nearby?lat=18.5',
+    '/api/data/nearby?lat=95&lon=73',
+    '/api/data/nearby?lat=18.5&lon=73&radius_km=-1',
+    '/api/data/nearby?lat=18.5&lon=73&limit=0',
+])
+def test_invalid_spatial_args_are_400(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+    assert 'message' in response.get_json()
@@ -0,0 +1,179 @@
+"""
+Risk-zone vector tiles (vector_tiles.py) decoded with a small independent
+protobuf reader: layer header, point geometry and feature properties of a
+tile against the risk-zones rows, the zoom-0 tile covering every location,
+date filtering, and the 400/404 answers.
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import math
+import os
+import struct
+import sys
+
+import pandas as pd
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'app'))
+
+from app import create_app
+from config import Config
+from vector_tiles import ALERT_LEVELS, LAYER_NAME, MVT_MIMETYPE, RISK_LEVELS
+
+
+def read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return result, pos
+
+
+def fields(data):
+    """(field number, value) pairs of a protobuf message; bytes for length-delimited fields"""
+    pos = 0
+    while pos < len(data):
+        key, pos = read_varint(data, pos)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = struct.unpack('<d', data[pos:pos + 8])[0], pos + 8
+        elif wire_type == 2:
+            length, pos = read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        elif wire_type == 5:
+            value, pos = struct.unpack('<f', data[pos:pos + 4])[0], pos + 4
+        else:
+            raise AssertionError(f"unexpected wire type {wire_type}")
+        yield number, value
+
+
+def packed(data):
+    values, pos = [], 0
+    while pos < len(data):
+        value, pos = read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def decode_value(data):
+    (number, value), = fields(data)
+    if number == 1:
+        return value.decode('utf-8')
+    if number == 6:
+        return unzigzag(value)
+    if number == 7:
+        return bool(value)
+    return value
+
+
+def decode_tile(data):
+    """{layer name: {'version', 'extent', 'features': [(x, y, properties)]}}"""
+    layers = {}
+    for number, layer_data in fields(data):
+        assert number == 3
+        layer = {'features': []}
+        keys, values, raw_features = [], [], []
+        for field, value in fields(layer_data):
+            if field == 15:
+                layer['version'] = value
+            elif field == 1:
+                name = value.decode('utf-8')
+            elif field == 2:
+                raw_features.append(value)
+            elif field == 3:
+                keys.append(value.decode('utf-8'))
+            elif field == 4:
+                values.append(decode_value(value))
+            elif field == 5:
+                layer['extent'] = value
+        for raw in raw_features:
+            feature = dict(fields(raw))
+            assert feature[3] == 1  # POINT
+            command, dx, dy = packed(feature[4])
+            assert command == 9  # MoveTo, one point
+            tags = packed(feature[2])
+            properties = {keys[k]: values[v] for k, v in zip(tags[::2], tags[1::2])}
+            layer['features'].append((unzigzag(dx), unzigzag(dy), properties))
+        layers[name] = layer
+    return layers
+
+
+def tile_for(lat, lon, zoom):
+    """XYZ tile and in-tile pixel position (TILE_EXTENT units) of a point"""
+    x = (lon + 180.0) / 360.0 * (1 << zoom)
+    y = (0.5 - math.log(math.tan(math.pi / 4 + math.radians(lat) / 2)) / (2 * math.pi)) * (1 << zoom)
+    return (int(x), int(y)), ((x - int(x)) * Config.TILE_EXTENT, (y - int(y)) * Config.TILE_EXTENT)
+
+
+@pytest.fixture(scope='module')
+def client():
+    return create_app().test_client()
+
+
+@pytest.fixture(scope='module')
+def risk_zones(client):
+    return pd.DataFrame(client.get('/api/data/risk-zones?group_by_city=false').get_json()['risk_zones'])
+
+
+def get_tile(client, zoom, x, y, query=''):
+    response = client.get(f"/api/tiles/{zoom}/{x}/{y}.mvt{query}")
+    assert response.status_code == 200
+    assert response.mimetype == MVT_MIMETYPE
+    return decode_tile(response.get_data())
+
+
+@pytest.mark.parametrize('date', [None, '2025-08-21'])
+def test_decode_city_tile(client, risk_zones, date):
+    zoom = Config.TILE_MAX_ZOOM
+    pune = risk_zones[risk_zones['City'] == 'Pune']
+    if date:
+        pune = pune[pune['Date'] == date]
+    lat, lon = float(pune['Latitude'].iloc[0]), float(pune['Longitude'].iloc[0])
+    (x, y), (px, py) = tile_for(lat, lon, zoom)
+
+    layer = get_tile(client, zoom, x, y, f"?date={date}" if date else '')[LAYER_NAME]
+    assert layer['version'] == 2
+    assert layer['extent'] == Config.TILE_EXTENT
+    (fx, fy, properties), = [f for f in layer['features'] if f[2].get('city') == 'Pune']
+    assert abs(fx - px) <= 1 and abs(fy - py) <= 1
+
+    assert properties['count'] == 1
+    assert properties['max_probability'] == pytest.approx(round(pune['Flood_Probability'].max(), 3), abs=1e-6)
+    assert properties['mean_probability'] == pytest.approx(round(pune['Flood_Probability'].mean(), 3), abs=1e-6)
+    assert properties['alert_level'] == max(pune['Alert_Level'], key=ALERT_LEVELS.index)
+    assert properties['risk_level'] == max(pune['Risk_Level'], key=RISK_LEVELS.index)
+
+
+def test_zoom_zero_covers_every_location(client, risk_zones):
+    layer = get_tile(client, 0, 0, 0)[LAYER_NAME]
+    locations = risk_zones[['Latitude', 'Longitude']].drop_duplicates()
+    assert sum(properties['count'] for _, _, properties in layer['features']) == len(locations)
+    assert all(0 <= x <= Config.TILE_EXTENT and 0 <= y <= Config.TILE_EXTENT for x, y, _ in layer['features'])
+
+
+def test_empty_tile(client):
+    # Mid-Pacific at zoom 10
+    response = client.get('/api/tiles/10/0/512.mvt')
+    assert response.status_code == 200
+    assert response.get_data() == b''
+
+
+@pytest.mark.parametrize('url,status', [
+    (f"/api/tiles/{Config.TILE_MAX_ZOOM + 1}/0/0.mvt", 400),
+    ('/api/tiles/3/8/0.mvt', 400),
+    ('/api/tiles/3/0/8', 400),
+    ('/api/tiles/0/0/0.mvt?date=1999-01-01', 404),
+])
+def test_invalid_tile_requests(client, url, status):
+    assert client.get(url).status_code == status
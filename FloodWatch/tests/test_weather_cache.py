@@ -0,0 +1,173 @@
+"""
+The on-disk Open-Meteo response cache (training/weather_cache.py): key
+rounding, TTL expiry of forecasts and recent archive ranges, final archive
+ranges that never expire, LRU eviction under the size bound, sharing one
+file between instances, and WeatherClient.fetch_points serving hits
+without a request.
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import datetime
+import os
+import sys
+
+import pytest
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'training'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import weather_cache
+from weather_cache import WeatherCache, cache_key, expiry, print_stats
+from test_weather_client import make_client, open_meteo_stub, point_queries
+
+URL = 'http://stub/forecast'
+FORECAST = {'daily': 'precipitation_sum', 'forecast_days': 7}
+
+
+class Clock:
+    """Stands in for time.time() inside weather_cache"""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(weather_cache.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = WeatherCache(str(tmp_path / 'weather.sqlite3'))
+    yield cache
+    cache.close()
+
+
+def archive(days_ago):
+    end = datetime.date.today() - datetime.timedelta(days=days_ago)
+    return {'daily': 'precipitation_sum', 'start_date': (end - datetime.timedelta(days=14)).isoformat(),
+            'end_date': end.isoformat()}
+
+
+def test_cache_key():
+    # Coordinates round to COORD_DECIMALS; every other parameter counts
+    assert cache_key(URL, FORECAST, 18.5204, 73.8567) == cache_key(URL, FORECAST, 18.52041, 73.85669)
+    assert cache_key(URL, FORECAST, 18.52, 73.85) != cache_key(URL, FORECAST, 18.53, 73.85)
+    assert cache_key(URL, FORECAST, 18.52, 73.85) != cache_key(URL, dict(FORECAST, forecast_days=3), 18.52, 73.85)
+    assert cache_key(URL, FORECAST, 18.52, 73.85) != cache_key(URL + '2', FORECAST, 18.52, 73.85)
+    # The coordinates inside params do not matter, only the point's
+    assert (cache_key(URL, dict(FORECAST, latitude=1, longitude=2), 18.52, 73.85)
+            == cache_key(URL, FORECAST, 18.52, 73.85))
+
+
+def test_expiry_by_kind(clock):
+    assert expiry(FORECAST) == clock.now + weather_cache.FORECAST_TTL
+    assert expiry(archive(weather_cache.ARCHIVE_FINAL_DAYS)) is None
+    assert expiry(archive(400)) is None
+    assert expiry(archive(1)) == clock.now + weather_cache.RECENT_ARCHIVE_TTL
+
+
+def test_forecast_entry_expires_after_ttl(cache, clock):
+    cache.put_many([('k', {'daily': {'a': [1]}}, expiry(FORECAST))])
+    clock.now += weather_cache.FORECAST_TTL - 1
+    assert cache.get_many(['k']) == {'k': {'daily': {'a': [1]}}}
+    clock.now += 2
+    assert cache.get_many(['k']) == {}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_recent_archive_expires_and_final_archive_does_not(cache, clock):
+    cache.put_many([('recent', {'r': 1}, expiry(archive(1))), ('final', {'f': 1}, expiry(archive(30)))])
+    clock.now += weather_cache.RECENT_ARCHIVE_TTL + 1
+    assert cache.get_many(['recent', 'final']) == {'final': {'f': 1}}
+    clock.now += 10 * 365 * 86400
+    assert cache.get_many(['final']) == {'final': {'f': 1}}
+
+
+def test_expired_entries_are_purged_on_write(cache, clock):
+    cache.put_many([('old', {'x': 1}, clock.now + 10)])
+    clock.now += 20
+    cache.put_many([('new', {'x': 2}, None)])
+    assert cache.stats()['entries'] == 1
+
+
+def test_lru_eviction_keeps_recently_used(cache, clock):
+    body = {'values': list(range(200))}
+    for i in range(10):
+        clock.now += 1
+        cache.put_many([(f"k{i}", dict(body, i=i), None)])
+    entry_size = cache.stats()['bytes'] // 10
+
+    # Touch the oldest entries so they become the most recently used
+    clock.now += 1
+    assert len(cache.get_many(['k0', 'k1'])) == 2
+
+    cache.max_bytes = entry_size * 6
+    clock.now += 1
+    cache.put_many([('k10', dict(body, i=10), None)])
+    stats = cache.stats()
+    assert stats['bytes'] <= cache.max_bytes
+    assert stats['evictions'] > 0
+    kept = cache.get_many([f"k{i}" for i in range(11)])
+    assert {'k0', 'k1', 'k10'} <= set(kept)
+    # Evicted in least-recently-used order
+    evicted = sorted(set(f"k{i}" for i in range(11)) - set(kept), key=lambda key: int(key[1:]))
+    assert evicted == [f"k{i}" for i in range(2, 2 + len(evicted))]
+
+
+def test_instances_share_the_file(tmp_path):
+    path = str(tmp_path / 'shared.sqlite3')
+    writer, reader = WeatherCache(path), WeatherCache(path)
+    writer.put_many([('k', {'v': 1}, None)])
+    assert reader.get_many(['k']) == {'k': {'v': 1}}
+    reader.clear()
+    assert writer.get_many(['k']) == {}
+    writer.close()
+    reader.close()
+
+
+def test_fetch_points_serves_hits_from_cache(cache):
+    queries = point_queries(12)
+    client = make_client(open_meteo_stub())
+    client.cache = cache
+    first = client.fetch_points(URL, queries)
+    requests_made = len(client.session.calls)
+    assert requests_made >= 1
+
+    # A new client on the same file: only the uncached points are requested
+    other = make_client(open_meteo_stub())
+    other.cache = cache
+    assert other.fetch_points(URL, queries) == first
+    assert other.session.calls == []
+    more = other.fetch_points(URL, queries + point_queries(15)[12:])
+    assert more[:12] == first
+    latitudes = other.session.calls[0][1]['latitude'].split(',')
+    assert len(other.session.calls) == 1 and len(latitudes) == 3
+    client.close()
+    other.close()
+
+
+def test_failed_points_are_not_cached(cache):
+    queries = point_queries(3)
+    client = make_client(open_meteo_stub(bad_latitudes={queries[1][1]}))
+    client.cache = cache
+    assert client.fetch_points(URL, queries)[1] is None
+    assert cache.stats()['entries'] == 2
+    client.close()
+
+
+def test_print_stats(cache, capsys):
+    cache.put_many([('k', {}, None)])
+    cache.get_many(['k', 'missing'])
+    print_stats(cache)
+    print_stats(None)
+    out = capsys.readouterr().out.splitlines()
+    assert out[0].startswith('Weather cache: 1 hits, 1 misses (hit rate 50%), 0 evicted; 1 entries')
+    assert out[1] == 'Weather cache: disabled'
@@ -0,0 +1,255 @@
+"""
+The pooled Open-Meteo client (training/weather_client.py) against a
+stubbed requests session: concurrent fetch_many results and the
+concurrency bound, retries of 429/5xx/network errors, the shared thread
+pool and its shutdown, the rate limiter, and multi-location batching
+(packing, splitting and the point-by-point retry of a failed batch).
+
+Run from the FloodWatch directory:
+    python -m pytest tests
+"""
+import os
+import sys
+import threading
+import time
+
+import pytest
+import requests
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, 'training'))
+
+import weather_client
+from weather_client import RateLimiter, WeatherClient
+
+
+class StubResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        if isinstance(self._data, Exception):
+            raise self._data
+        return self._data
+
+
+class StubSession:
+    """Stands in for requests.Session: answer(url, params) gives a StubResponse or raises"""
+
+    def __init__(self, answer, delay=0.0):
+        self.answer = answer
+        self.delay = delay
+        self.calls = []
+        self.in_flight = self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self._lock:
+            self.calls.append((url, dict(params or {})))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            return self.answer(url, params)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(weather_client, 'RETRY_BACKOFF', 0)
+    monkeypatch.setattr(weather_client, 'RETRIES', 2)
+
+
+def make_client(answer, delay=0.0, **kwargs):
+    client = WeatherClient(rate_limit_calls=0, cache=False, **kwargs)
+    client.session = StubSession(answer, delay)
+    return client
+
+
+def test_fetch_many_returns_results_in_order():
+    client = make_client(lambda url, params: StubResponse(200, {'n': params['n']}))
+    jobs = {f"job{n}": ('http://stub/forecast', {'n': n}) for n in range(50)}
+    results = client.fetch_many(jobs)
+    assert list(results) == list(jobs)
+    assert all(results[f"job{n}"] == {'n': n} for n in range(50))
+    client.close()
+
+
+def test_concurrency_is_bounded():
+    client = make_client(lambda url, params: StubResponse(200, {}), delay=0.02, max_concurrency=4)
+    client.fetch_many({n: ('http://stub/forecast', {'n': n}) for n in range(40)})
+    assert client.session.max_in_flight == 4
+    client.close()
+
+
+@pytest.mark.parametrize('failure', [
+    StubResponse(500), StubResponse(503), StubResponse(429), StubResponse(200, ValueError('bad JSON')),
+    requests.exceptions.ConnectionError('reset'), requests.exceptions.Timeout('slow'),
+])
+def test_transient_failures_are_retried(failure):
+    attempts = []
+
+    def answer(url, params):
+        attempts.append(1)
+        if len(attempts) <= weather_client.RETRIES:
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+        return StubResponse(200, {'ok': True})
+
+    client = make_client(answer)
+    assert client.get_json('http://stub/forecast', {}) == {'ok': True}
+    assert len(attempts) == weather_client.RETRIES + 1
+    client.close()
+
+
+def test_gives_up_after_retries():
+    client = make_client(lambda url, params: StubResponse(502))
+    assert client.get_json('http://stub/forecast', {}) is None
+    assert len(client.session.calls) == weather_client.RETRIES + 1
+    assert client.get_json('http://stub/forecast', {}, retries=0) is None
+    assert len(client.session.calls) == weather_client.RETRIES + 2
+    client.close()
+
+
+def test_client_errors_are_not_retried():
+    client = make_client(lambda url, params: StubResponse(400))
+    assert client.get_json('http://stub/forecast', {}) is None
+    assert len(client.session.calls) == 1
+    client.close()
+
+
+def test_one_failure_does_not_sink_the_others():
+    client = make_client(lambda url, params: StubResponse(500) if params['n'] == 3 else StubResponse(200, params))
+    results = client.fetch_many({n: ('http://stub/forecast', {'n': n}) for n in range(8)})
+    assert results[3] is None
+    assert all(results[n] == {'n': n} for n in range(8) if n != 3)
+    client.close()
+
+
+def test_pool_is_shared_and_shut_down_on_close():
+    client = make_client(lambda url, params: StubResponse(200, {}), max_concurrency=3)
+    pool = client._pool
+    for _ in range(5):
+        client.fetch_many({n: ('http://stub/forecast', {'n': n}) for n in range(10)})
+    assert client._pool is pool
+    workers = [t for t in threading.enumerate() if t.name.startswith('weather-fetch')]
+    assert len(workers) <= 3
+    client.close()
+    with pytest.raises(RuntimeError):
+        client.fetch_many({0: ('http://stub/forecast', {})})
+
+
+def test_rate_limiter_waits_for_the_window():
+    limiter = RateLimiter(max_calls=4, window=0.2)
+    start = time.monotonic()
+    for _ in range(4):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.1
+    limiter.acquire(2)
+    assert time.monotonic() - start >= 0.2
+
+
+def test_rate_limiter_disabled():
+    limiter = RateLimiter(max_calls=0, window=60)
+    start = time.monotonic()
+    for _ in range(1000):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.5
+
+
+# Multi-location batching (fetch_points, pack_batches, split_batch_response)
+
+def point_queries(n, params=None):
+    params = params or {'daily': 'precipitation_sum', 'forecast_days': 7}
+    return [(params, 15.0 + i * 0.01, 73.0 + i * 0.01) for i in range(n)]
+
+
+def open_meteo_stub(bad_latitudes=()):
+    """One result per location, in order; a 500 for any batch holding a bad latitude"""
+    def answer(url, params):
+        latitudes = [float(lat) for lat in str(params['latitude']).split(',')]
+        longitudes = [float(lon) for lon in str(params['longitude']).split(',')]
+        if any(lat in bad_latitudes for lat in latitudes):
+            return StubResponse(500)
+        results = [{'latitude': lat, 'longitude': lon, 'daily': {}} for lat, lon in zip(latitudes, longitudes)]
+        return StubResponse(200, results[0] if len(results) == 1 else results)
+    return answer
+
+
+def test_pack_batches_respects_size_and_url_limits(monkeypatch):
+    monkeypatch.setattr(weather_client, 'MAX_BATCH_LOCATIONS', 7)
+    queries = point_queries(50)
+    url = 'http://stub/forecast'
+    batches = weather_client.pack_batches(url, queries[0][0], queries, list(range(50)))
+    assert [i for batch in batches for i in batch] == list(range(50))
+    assert all(len(batch) <= 7 for batch in batches)
+
+    monkeypatch.setattr(weather_client, 'MAX_BATCH_LOCATIONS', 1000)
+    monkeypatch.setattr(weather_client, 'MAX_URL_LENGTH', 400)
+    batches = weather_client.pack_batches(url, queries[0][0], queries, list(range(50)))
+    assert [i for batch in batches for i in batch] == list(range(50))
+    assert len(batches) > 1
+    for batch in batches:
+        request = requests.Request('GET', url, params=weather_client.batch_params(queries, batch)).prepare()
+        assert len(request.url) <= 400
+
+
+def test_split_batch_response():
+    split = weather_client.split_batch_response
+    assert split({'daily': {}}, 1) == [{'daily': {}}]
+    assert split([{'a': 1}, {'a': 2}], 2) == [{'a': 1}, {'a': 2}]
+    assert split([{'a': 1}], 2) is None
+    assert split([{'a': 1}, 'error'], 2) is None
+    assert split({'error': True, 'reason': 'x'}, 2) is None
+    assert split(None, 1) is None
+    assert split(None, 3) is None
+
+
+def test_fetch_points_splits_batches_per_point(monkeypatch):
+    monkeypatch.setattr(weather_client, 'MAX_BATCH_LOCATIONS', 10)
+    client = make_client(open_meteo_stub())
+    queries = point_queries(35)
+    results = client.fetch_points('http://stub/forecast', queries)
+    assert [(r['latitude'], r['longitude']) for r in results] == [(lat, lon) for _, lat, lon in queries]
+    assert len(client.session.calls) == 4
+    client.close()
+
+
+def test_points_with_different_params_are_not_batched_together():
+    client = make_client(open_meteo_stub())
+    queries = point_queries(4) + point_queries(4, {'daily': 'precipitation_sum', 'forecast_days': 3})
+    results = client.fetch_points('http://stub/forecast', queries)
+    assert all(result is not None for result in results)
+    sent = sorted((params['forecast_days'], params['latitude'].count(',') + 1) for _, params in client.session.calls)
+    assert sent == [(3, 4), (7, 4)]
+    client.close()
+
+
+def test_failed_batch_is_retried_point_by_point(monkeypatch):
+    monkeypatch.setattr(weather_client, 'MAX_BATCH_LOCATIONS', 10)
+    queries = point_queries(30)
+    bad = queries[13][1]
+    client = make_client(open_meteo_stub(bad_latitudes={bad}))
+    results = client.fetch_points('http://stub/forecast', queries)
+
+    assert results[13] is None
+    assert all(results[i] is not None and results[i]['latitude'] == queries[i][1] for i in range(30) if i != 13)
+    sizes = [params['latitude'].count(',') + 1 for _, params in client.session.calls]
+    # Three batches of 10, the failed one not retried whole; then its 10
+    # points alone, the bad one with its own retries
+    assert sorted(size for size in sizes if size > 1) == [10, 10, 10]
+    assert sizes.count(1) == 10 + weather_client.RETRIES
+    client.close()
+
+
+def test_get_point():
+    client = make_client(open_meteo_stub())
+    assert client.get_point('http://stub/forecast', {'daily': 'x'}, 18.5, 73.8)['latitude'] == 18.5
+    client.close()
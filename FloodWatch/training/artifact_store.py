@@ -0,0 +1,165 @@
+import os
+import shutil
+from datetime import datetime, timezone
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+# Rows per Parquet row group. Each row group stores min/max statistics per
+# column, so readers can skip whole groups outside a requested date range.
+ROW_GROUP_SIZE = int(os.environ.get('FLOODWATCH_ROW_GROUP_SIZE', '16384'))
+
+# CSV copies are kept for spreadsheets and older consumers; set
+# FLOODWATCH_EXPORT_CSV=0 to write Parquet only
+EXPORT_CSV = os.environ.get('FLOODWATCH_EXPORT_CSV', '1').lower() in ('1', 'true', 'yes')
+
+# Each pipeline run writes its outputs to data/runs/<run id>/; the API serves
+# the run named in data/CURRENT, which is only switched once a run is complete.
+RUNS_DIR = 'runs'
+CURRENT_POINTER = 'CURRENT'
+# Written into a run directory once enhanced_forecast.py has finished staging
+# it; runs without it (crashed or still running) are never published
+STAGED_MARKER = 'STAGED'
+# Published runs kept on disk (the current one is never removed)
+KEEP_RUNS = int(os.environ.get('FLOODWATCH_KEEP_RUNS', '5'))
+
+
+def parquet_path(csv_path):
+    """Parquet file written alongside a CSV artifact (same name, .parquet)"""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+
+def write_artifact(df, csv_path, index=False, export_csv=None):
+    """
+    Write a pipeline output as Parquet (primary) and optionally as CSV.
+
+    Rows keep their order; string columns with repeated values (City, Date,
+    categories) are dictionary-encoded and every column gets min/max
+    statistics. Falls back to CSV only when pyarrow is not installed.
+    """
+    if export_csv is None:
+        export_csv = EXPORT_CSV
+    if index:
+        df = df.reset_index()
+
+    if pq is None:
+        print("pyarrow not installed; writing CSV only")
+        export_csv = True
+
+    written = []
+    # CSV first: readers pick the Parquet file only when it is at least as new
+    if export_csv:
+        df.to_csv(csv_path, index=False)
+        written.append(csv_path)
+
+    if pq is not None:
+        path = parquet_path(csv_path)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Write to a temporary file first so readers never see a partial file
+        tmp_path = path + '.tmp'
+        pq.write_table(
+            table, tmp_path,
+            row_group_size=ROW_GROUP_SIZE,
+            use_dictionary=True,
+            write_statistics=True,
+            compression='zstd'
+        )
+        os.replace(tmp_path, path)
+        written.append(path)
+    return written
+
+
+def read_artifact(csv_path, columns=None):
+    """
+    Read a pipeline output, preferring its Parquet file when that is at least
+    as new as the CSV (memory-mapped; only the requested columns are read).
+    """
+    path = parquet_path(csv_path)
+    if pq is not None and os.path.exists(path):
+        csv_mtime = os.path.getmtime(csv_path) if os.path.exists(csv_path) else 0
+        if os.path.getmtime(path) >= csv_mtime:
+            return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+    return pd.read_csv(csv_path, usecols=columns)
+
+
+def new_run_dir(data_dir):
+    """Create and return a fresh staging directory data/runs/<timestamp>-<pid>"""
+    run_id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    run_dir = os.path.join(data_dir, RUNS_DIR, run_id)
+    os.makedirs(run_dir)
+    return run_dir
+
+
+def _run_ids(data_dir):
+    runs_dir = os.path.join(data_dir, RUNS_DIR)
+    if not os.path.isdir(runs_dir):
+        return []
+    # Run ids start with a UTC timestamp, so name order is creation order
+    return sorted(name for name in os.listdir(runs_dir)
+                  if os.path.isdir(os.path.join(runs_dir, name)))
+
+
+def current_run_id(data_dir):
+    """Run id named by data/CURRENT, or None before the first publish"""
+    try:
+        with open(os.path.join(data_dir, CURRENT_POINTER)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def mark_run_staged(run_dir):
+    """Record that every file of a staged run has been written"""
+    marker = os.path.join(run_dir, STAGED_MARKER)
+    tmp_marker = f"{marker}.{os.getpid()}.tmp"
+    with open(tmp_marker, 'w') as f:
+        f.write(datetime.now(timezone.utc).isoformat() + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_marker, marker)
+
+
+def is_run_staged(run_dir):
+    return os.path.exists(os.path.join(run_dir, STAGED_MARKER))
+
+
+def latest_run_dir(data_dir):
+    """Newest completely staged run directory (published or not), or None"""
+    for run_id in reversed(_run_ids(data_dir)):
+        run_dir = os.path.join(data_dir, RUNS_DIR, run_id)
+        if is_run_staged(run_dir):
+            return run_dir
+    return None
+
+
+def publish_run(data_dir, run_dir, keep=None):
+    """
+    Point data/CURRENT at a completed run directory.
+
+    The pointer is written to a temporary file and renamed over CURRENT, so
+    the API sees either the previous run or this one, never a mix of files
+    from both. Older runs beyond `keep` are removed afterwards.
+    """
+    if not is_run_staged(run_dir):
+        raise ValueError(f"Run {run_dir} was not completely staged; refusing to publish it")
+    run_id = os.path.basename(os.path.normpath(run_dir))
+    pointer = os.path.join(data_dir, CURRENT_POINTER)
+    tmp_pointer = f"{pointer}.{os.getpid()}.tmp"
+    with open(tmp_pointer, 'w') as f:
+        f.write(run_id + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_pointer, pointer)
+
+    keep = KEEP_RUNS if keep is None else keep
+    # Only runs older than the one just published; newer ones may still be staging
+    older = [name for name in _run_ids(data_dir) if name < run_id]
+    for name in older[:max(len(older) - (keep - 1), 0)]:
+        shutil.rmtree(os.path.join(data_dir, RUNS_DIR, name), ignore_errors=True)
+    return run_id
@@ -3,33 +3,52 @@ import os
 import numpy as np
 from datetime import datetime, timedelta
 import pandas as pd
-import requests
 import pickle
+from artifact_store import mark_run_staged, new_run_dir, write_artifact
+from weather_cache import print_stats
+from weather_client import DAILY_VARIABLES, FORECAST_URL, default_client
 
-def get_daily_weather_forecasts(lat, lon, city_name):
+# Open-Meteo query for a 7-day daily forecast, without the coordinates
+FORECAST_PARAMS = {
+    'daily': DAILY_VARIABLES,
+    'forecast_days': 7,  # Changed to 7 days
+    'timezone': 'auto'
+}
+
+def forecast_params(lat, lon):
+    """Open-Meteo query for a 7-day daily forecast at one point"""
+    return {'latitude': lat, 'longitude': lon, **FORECAST_PARAMS}
+
+def get_daily_weather_forecasts(lat, lon, city_name, client=None):
     """
     Get 7-day daily weather forecasts (not averaged)
     """
-    BASE_URL = "https://api.open-meteo.com/v1/forecast"
-    
-    params = {
-        'latitude': lat,
-        'longitude': lon,
-        'daily': 'temperature_2m_mean,temperature_2m_max,wind_speed_10m_max,cloud_cover_mean,precipitation_sum,relative_humidity_2m_mean',
-        'forecast_days': 7,  # Changed to 7 days
-        'timezone': 'auto'
-    }
-    
+    client = client or default_client()
+    print(f"Fetching 7-day forecast for {city_name}...")
+    return parse_daily_weather_forecasts(client.get_point(FORECAST_URL, FORECAST_PARAMS, lat, lon, city_name))
+
+def fetch_daily_weather_forecasts(cities_coords, client=None):
+    """
+    Get 7-day daily weather forecasts for many cities, packed into
+    multi-location requests that run concurrently.
+    Returns {city: forecasts}; a city that could not be fetched maps to [].
+    """
+    client = client or default_client()
+    cities = list(cities_coords)
+    print(f"Fetching 7-day forecasts for {len(cities)} cities...")
+    responses = client.fetch_points(
+        FORECAST_URL,
+        [(FORECAST_PARAMS, cities_coords[city]['lat'], cities_coords[city]['lon']) for city in cities],
+        labels=cities
+    )
+    return {city: parse_daily_weather_forecasts(data) for city, data in zip(cities, responses)}
+
+def parse_daily_weather_forecasts(data):
+    """
+    Per-day weather feature rows from an Open-Meteo daily forecast response
+    """
     try:
-        print(f"Fetching 7-day forecast for {city_name}...")
-        response = requests.get(BASE_URL, params=params, timeout=10)
-        
-        if response.status_code != 200:
-            print(f"Forecast API Error: {response.status_code}")
-            return []
-        
-        data = response.json()
-        if 'daily' not in data:
+        if not data or 'daily' not in data:
             return []
         
         daily_data = data['daily']
@@ -62,95 +81,154 @@ def get_daily_weather_forecasts(lat, lon, city_name):
         return daily_forecasts
         
     except Exception as e:
-        print(f"Error fetching forecast: {e}")
+        print(f"Error parsing forecast: {e}")
         return []
 
+# Fields of a reservoir forecast, in the order of the forecast array's last axis
+RESERVOIR_FIELDS = ('avg_fill', 'max_fill', 'risk_score', 'above_danger')
+# Fill levels (%) that a forecast must exceed for risk scores 1-5
+RESERVOIR_RISK_THRESHOLDS = np.array([55, 65, 75, 85, 95])
+# Days of history needed for the 7/14-day trend
+MIN_RESERVOIR_HISTORY = 14
+
+_reservoir_forecasts = {}
+
+def seasonal_adjustment(month):
+    """Daily fill change (x10) expected from the season"""
+    if 6 <= month <= 9:  # Monsoon season
+        return 2  # Slight increase expected
+    elif 3 <= month <= 5:  # Pre-monsoon
+        return -1  # Slight decrease expected
+    return 0
+
+def _precomputed_reservoir_forecasts(aggregated_reservoir_path, days):
+    """{city: (days, 4) array} from reservoir_7day_forecasts.csv next to the history, if present"""
+    precomputed_path = os.path.join(os.path.dirname(aggregated_reservoir_path), 'reservoir_7day_forecasts.csv')
+    if not os.path.exists(precomputed_path):
+        return {}
+    try:
+        df_fc = pd.read_csv(precomputed_path)
+        forecasts = {}
+        for city, df_fc_city in df_fc.groupby('City', sort=False):
+            if len(df_fc_city) >= days:
+                df_fc_city = df_fc_city.sort_values('Date').head(days)
+                forecasts[city] = np.column_stack([
+                    df_fc_city[field].to_numpy(dtype=float) if field in df_fc_city else np.zeros(days)
+                    for field in RESERVOIR_FIELDS
+                ])
+        return forecasts
+    except Exception:
+        return {}  # If precomputed read fails, fall back to the trend forecast
+
+def reservoir_risk_scores(levels):
+    """Risk score 0-5 per fill level: the number of RESERVOIR_RISK_THRESHOLDS it exceeds (0 for NaN)"""
+    levels = np.asarray(levels, dtype=float)
+    scores = np.searchsorted(RESERVOIR_RISK_THRESHOLDS, levels, side='left')
+    # NaN sorts after every threshold, but exceeds none of them
+    return np.where(np.isnan(levels), 0, scores)
+
+def _history_reservoir_forecasts(aggregated_reservoir_path, days):
+    """(cities, (cities, days, 4) array) extrapolated from the reservoir history"""
+    reservoir_df = pd.read_csv(aggregated_reservoir_path, usecols=[
+        'City', 'Date', 'Avg_Reservoir_Fill', 'Max_Reservoir_Fill',
+        'Reservoir_Risk_Score', 'Reservoirs_Above_Danger'
+    ])
+    reservoir_df['Date'] = pd.to_datetime(reservoir_df['Date'])
+    reservoir_df = reservoir_df.sort_values(['City', 'Date'], kind='stable')
+    codes, cities = pd.factorize(reservoir_df['City'])
+    counts = np.bincount(codes, minlength=len(cities))
+    ends = np.cumsum(counts)
+    last = ends - 1
+
+    # Trend: mean of the last 7 days minus the mean of the 7 days before
+    fill_levels = reservoir_df['Avg_Reservoir_Fill'].to_numpy(dtype=float)
+    from_end = np.repeat(ends, counts) - 1 - np.arange(len(reservoir_df))
+    recent = np.bincount(codes, weights=np.where(from_end < 7, fill_levels, 0), minlength=len(cities)) / 7
+    earlier = np.bincount(codes, weights=np.where((from_end >= 7) & (from_end < 14), fill_levels, 0),
+                          minlength=len(cities)) / 7
+    recent_trend = recent - earlier
+
+    # Deterministic prediction with trend and seasonal component
+    steps = np.arange(1, days + 1)
+    predicted_level = (fill_levels[last][:, None] + recent_trend[:, None] * steps
+                       + seasonal_adjustment(datetime.now().month) * steps * 0.1)
+    predicted_level = np.clip(predicted_level, 0, 100)  # Clamp to valid range
+
+    forecasts = np.stack([
+        predicted_level,
+        np.minimum(100, predicted_level + 5),  # Assume max is slightly higher
+        reservoir_risk_scores(predicted_level),
+        predicted_level > 80
+    ], axis=-1).astype(float)
+
+    # Too little history for a trend: repeat the last known values
+    short = counts < MIN_RESERVOIR_HISTORY
+    if short.any():
+        last_known = reservoir_df[['Avg_Reservoir_Fill', 'Max_Reservoir_Fill', 'Reservoir_Risk_Score',
+                                   'Reservoirs_Above_Danger']].to_numpy(dtype=float)[last[short]]
+        forecasts[short] = last_known[:, None, :]
+        for city in cities[short]:
+            print(f"Insufficient reservoir data for {city}, using last known values")
+    return list(cities), forecasts
+
+def forecast_all_reservoir_levels(aggregated_reservoir_path, days=7):
+    """
+    Forecast reservoir levels for the next days for every city at once using
+    deterministic trend analysis.
+
+    Returns (city_index, forecasts): forecasts has shape (cities, days, 4)
+    with RESERVOIR_FIELDS along the last axis and city_index maps a city to
+    its row. Cities in reservoir_7day_forecasts.csv take its forecast, with
+    or without a history file. Both files are read once per version and day.
+    """
+    precomputed_path = os.path.join(os.path.dirname(aggregated_reservoir_path), 'reservoir_7day_forecasts.csv')
+    key = (os.path.abspath(aggregated_reservoir_path),
+           os.path.getmtime(aggregated_reservoir_path) if os.path.exists(aggregated_reservoir_path) else None,
+           os.path.getmtime(precomputed_path) if os.path.exists(precomputed_path) else None,
+           days, datetime.now().date())
+    if key in _reservoir_forecasts:
+        return _reservoir_forecasts[key]
+
+    cities, forecasts = [], np.zeros((0, days, len(RESERVOIR_FIELDS)))
+    if os.path.exists(aggregated_reservoir_path):
+        try:
+            cities, forecasts = _history_reservoir_forecasts(aggregated_reservoir_path, days)
+        except Exception as e:
+            print(f"Error forecasting reservoir levels: {e}")
+
+    city_index = {city: row for row, city in enumerate(cities)}
+    precomputed = _precomputed_reservoir_forecasts(aggregated_reservoir_path, days)
+    if precomputed:
+        extra = [city for city in precomputed if city not in city_index]
+        city_index.update({city: len(city_index) + i for i, city in enumerate(extra)})
+        forecasts = np.concatenate([forecasts, np.zeros((len(extra), days, len(RESERVOIR_FIELDS)))])
+        for city, values in precomputed.items():
+            forecasts[city_index[city]] = values
+
+    _reservoir_forecasts.clear()
+    _reservoir_forecasts[key] = (city_index, forecasts)
+    return city_index, forecasts
+
+def reservoir_forecast_records(values):
+    """Per-day dicts for one city's (days, 4) reservoir forecast"""
+    return [{
+        'avg_fill': float(avg_fill),
+        'max_fill': float(max_fill),
+        'risk_score': int(risk_score),
+        'above_danger': int(above_danger)
+    } for avg_fill, max_fill, risk_score, above_danger in values]
+
 def forecast_reservoir_levels(city, aggregated_reservoir_path, days=7):
     """
     Forecast reservoir levels for next 7 days using deterministic trend analysis
+    (one city's view of forecast_all_reservoir_levels)
     """
-    try:
-        # First, try to read precomputed forecasts from CSV in the same directory
-        data_dir = os.path.dirname(aggregated_reservoir_path)
-        precomputed_path = os.path.join(data_dir, 'reservoir_7day_forecasts.csv')
-        if os.path.exists(precomputed_path):
-            try:
-                df_fc = pd.read_csv(precomputed_path)
-                df_fc_city = df_fc[df_fc['City'] == city]
-                if len(df_fc_city) >= days:
-                    df_fc_city = df_fc_city.sort_values('Date').head(days)
-                    predictions = []
-                    for _, r in df_fc_city.iterrows():
-                        predictions.append({
-                            'avg_fill': float(r.get('avg_fill', 0)),
-                            'max_fill': float(r.get('max_fill', 0)),
-                            'risk_score': int(r.get('risk_score', 0)),
-                            'above_danger': int(r.get('above_danger', 0))
-                        })
-                    if len(predictions) == days:
-                        return predictions
-            except Exception:
-                pass  # If precomputed read fails, fall back below
-
-        reservoir_df = pd.read_csv(aggregated_reservoir_path)
-        reservoir_df['Date'] = pd.to_datetime(reservoir_df['Date'])
-        
-        # Get city data
-        city_data = reservoir_df[reservoir_df['City'] == city].sort_values('Date')
-        if len(city_data) < 14:  # Need minimum data for trend analysis
-            print(f"Insufficient reservoir data for {city}, using last known values")
-            if not city_data.empty:
-                last_row = city_data.iloc[-1]
-                return [{
-                    'avg_fill': last_row['Avg_Reservoir_Fill'],
-                    'max_fill': last_row['Max_Reservoir_Fill'],
-                    'risk_score': last_row['Reservoir_Risk_Score'],
-                    'above_danger': last_row['Reservoirs_Above_Danger']
-                }] * 7
-            else:
-                return [{'avg_fill': 0, 'max_fill': 0, 'risk_score': 0, 'above_danger': 0}] * 7
-        
-        # Prepare data for deterministic forecasting
-        fill_levels = city_data['Avg_Reservoir_Fill'].values[-30:]  # Use last 30 days
-        
-        # Calculate trend using rolling averages (more stable than random)
-        recent_trend = np.mean(fill_levels[-7:]) - np.mean(fill_levels[-14:-7])
-        last_level = fill_levels[-1]
-        
-        # Calculate seasonal adjustment based on historical patterns
-        month = datetime.now().month
-        seasonal_adjustment = 0
-        if 6 <= month <= 9:  # Monsoon season
-            seasonal_adjustment = 2  # Slight increase expected
-        elif 3 <= month <= 5:  # Pre-monsoon
-            seasonal_adjustment = -1  # Slight decrease expected
-        
-        predictions = []
-        for day in range(7):
-            # Deterministic prediction with trend and seasonal component
-            predicted_level = last_level + (recent_trend * (day + 1)) + (seasonal_adjustment * (day + 1) * 0.1)
-            predicted_level = max(0, min(100, predicted_level))  # Clamp to valid range
-            
-            # Calculate derived metrics
-            risk_score = 0
-            if predicted_level > 95: risk_score = 5
-            elif predicted_level > 85: risk_score = 4
-            elif predicted_level > 75: risk_score = 3
-            elif predicted_level > 65: risk_score = 2
-            elif predicted_level > 55: risk_score = 1
-            
-            predictions.append({
-                'avg_fill': predicted_level,
-                'max_fill': min(100, predicted_level + 5),  # Assume max is slightly higher
-                'risk_score': risk_score,
-                'above_danger': 1 if predicted_level > 80 else 0
-            })
-        
-        return predictions
-        
-    except Exception as e:
-        print(f"Error forecasting reservoir levels for {city}: {e}")
-        return [{'avg_fill': 0, 'max_fill': 0, 'risk_score': 0, 'above_danger': 0}] * 7
+    city_index, forecasts = forecast_all_reservoir_levels(aggregated_reservoir_path, days)
+    row = city_index.get(city)
+    if row is None:
+        print(f"Insufficient reservoir data for {city}, using last known values")
+        return [{'avg_fill': 0, 'max_fill': 0, 'risk_score': 0, 'above_danger': 0}] * days
+    return reservoir_forecast_records(forecasts[row])
 
 def determine_forecast_confidence(day):
     """
@@ -190,101 +268,120 @@ def categorize_flood_risk(probability, weather_precip=0, reservoir_risk=0):
     return category
 
 
-def make_daily_flood_predictions(daily_weather_forecasts, daily_reservoir_forecasts, model):
+# Training feature order used in enhanced_scraper.py, for models without feature names
+FEATURE_COLUMNS = [
+    'temp_avg', 'temp_max', 'wind_speed', 'cloud_cover', 'precipitation',
+    'humidity', 'precip_cover', 'avg_reservoir_fill', 'max_reservoir_fill',
+    'reservoir_risk_score', 'reservoirs_above_danger'
+]
+
+def predict_flood_probabilities(model, features):
     """
-    Make flood predictions for each of the next 7 days with probability scores and risk categories
+    (predictions, flood probabilities) for a feature matrix, from a single
+    predict_proba call; the class is the most probable one, as model.predict
+    would return
     """
-    daily_predictions = []
-    
-    for day in range(7):
-        try:
-            weather_features = daily_weather_forecasts[day]['weather']
-            reservoir_features = [
-                daily_reservoir_forecasts[day]['avg_fill'],
-                daily_reservoir_forecasts[day]['max_fill'], 
-                daily_reservoir_forecasts[day]['risk_score'],
-                daily_reservoir_forecasts[day]['above_danger']
-            ]
-            
-            # Combine features and ensure valid feature names
-            combined_features = weather_features + reservoir_features
-
-            # Determine expected feature columns
-            if hasattr(model, 'feature_names_in_'):
-                expected_cols = list(model.feature_names_in_)
-            else:
-                # Fallback to the training feature order used in enhanced_scraper.py
-                expected_cols = [
-                    'temp_avg', 'temp_max', 'wind_speed', 'cloud_cover', 'precipitation',
-                    'humidity', 'precip_cover', 'avg_reservoir_fill', 'max_reservoir_fill',
-                    'reservoir_risk_score', 'reservoirs_above_danger'
-                ]
+    # Determine expected feature columns
+    expected_cols = list(model.feature_names_in_) if hasattr(model, 'feature_names_in_') else FEATURE_COLUMNS
+    X_infer = pd.DataFrame(features, columns=expected_cols)
 
-            # Create a single-row DataFrame with proper column names
-            X_infer = pd.DataFrame([combined_features], columns=expected_cols)
+    try:
+        probabilities = model.predict_proba(X_infer)
+        predictions = np.asarray(model.classes_)[np.argmax(probabilities, axis=1)]
+        flood_probabilities = probabilities[:, 1]  # Probability of flood (class 1)
+    except Exception:
+        # If model doesn't support predict_proba, use its predictions
+        predictions = np.asarray(model.predict(X_infer))
+        flood_probabilities = np.where(predictions == 1, 0.8, 0.2)
+    return predictions, flood_probabilities
+
+def describe_daily_prediction(day, date, features, prediction, flood_probability):
+    """
+    Prediction record for one day with its risk category, confidence and explanation
+    """
+    precipitation, max_reservoir_fill, reservoir_risk = features[4], features[8], features[9]
+    risk_category = categorize_flood_risk(flood_probability, precipitation, reservoir_risk)
+    if flood_probability > 0.7 or flood_probability < 0.3:
+        confidence = "High"
+    else:
+        confidence = "Medium" if day <= 3 else "Low"
+    # Explainability: why this risk category was assigned
+    reason = []
+    if precipitation > 80:
+        reason.append(f"Heavy rainfall {precipitation:.1f}mm")
+    elif precipitation > 40:
+        reason.append(f"Moderate rainfall {precipitation:.1f}mm")
+
+    if max_reservoir_fill > 90:
+        reason.append(f"Reservoir critical {max_reservoir_fill:.1f}%")
+    elif max_reservoir_fill > 75:
+        reason.append(f"Reservoir high {max_reservoir_fill:.1f}%")
+
+    if not reason:
+        reason = ["Normal conditions"]
+
+    return {
+        'date': date,
+        'flood_prediction': int(prediction),
+        'flood_probability': float(flood_probability),
+        'risk_category': risk_category,
+        'confidence': confidence,
+        'weather_precip': precipitation,
+        'max_reservoir_fill': max_reservoir_fill,
+        'explanation': "; ".join(reason)
+    }
+
+def failed_daily_prediction(day):
+    return {
+        'date': f"Day_{day+1}",
+        'flood_prediction': 0,
+        'flood_probability': 0.0,
+        'risk_category': 'Low',
+        'confidence': 'Low',
+        'weather_precip': 0,
+        'max_reservoir_fill': 0,
+        'explanation': ""
+    }
 
-            # Get prediction and probability
-            prediction = model.predict(X_infer)[0]
+def make_flood_predictions_for_cities(city_forecasts, model, days=7):
+    """
+    Make flood predictions for every city and each of the next days with a
+    single model call over one feature matrix.
 
+    city_forecasts is a list of (daily_weather_forecasts, daily_reservoir_forecasts)
+    per city; returns a list of daily predictions per city, in the same order.
+    """
+    features, slots = [], []
+    for c, (daily_weather_forecasts, daily_reservoir_forecasts) in enumerate(city_forecasts):
+        for day in range(days):
             try:
-                # Get probability scores
-                probabilities = model.predict_proba(X_infer)[0]
-                flood_probability = probabilities[1]  # Probability of flood (class 1)
-            except Exception:
-                # If model doesn't support predict_proba, use decision function or default
-                flood_probability = 0.8 if prediction == 1 else 0.2
-            
-            risk_category = categorize_flood_risk(
-                flood_probability,
-                weather_features[4],                # precipitation
-                daily_reservoir_forecasts[day]['risk_score']  # reservoir
-            )   
-            if flood_probability > 0.7 or flood_probability < 0.3:
-                confidence = "High"
-            else:
-                confidence = "Medium" if day <= 3 else "Low"    
-            # Explainability: why this risk category was assigned
-            reason = []
-            if weather_features[4] > 80:   # precipitation
-                reason.append(f"Heavy rainfall {weather_features[4]:.1f}mm")
-            elif weather_features[4] > 40:
-                reason.append(f"Moderate rainfall {weather_features[4]:.1f}mm")
-
-            if reservoir_features[1] > 90:  # max reservoir fill
-                reason.append(f"Reservoir critical {reservoir_features[1]:.1f}%")
-            elif reservoir_features[1] > 75:
-                reason.append(f"Reservoir high {reservoir_features[1]:.1f}%")
-
-            if not reason:
-                reason = ["Normal conditions"]
-
-            explanation = "; ".join(reason)
-    
-            daily_predictions.append({
-                'date': daily_weather_forecasts[day]['date'],
-                'flood_prediction': int(prediction),
-                'flood_probability': float(flood_probability),
-                'risk_category': risk_category,
-                'confidence': confidence,
-                'weather_precip': weather_features[4],
-                'max_reservoir_fill': reservoir_features[1],
-                'explanation': explanation
-            })
-            
-        except Exception as e:
-            print(f"Error predicting day {day+1}: {e}")
-            daily_predictions.append({
-                'date': f"Day_{day+1}",
-                'flood_prediction': 0,
-                'flood_probability': 0.0,
-                'risk_category': 'Low',
-                'confidence': 'Low',
-                'weather_precip': 0,
-                'max_reservoir_fill': 0,
-                'explanation': ""
-            })
-    
-    return daily_predictions
+                weather_features = daily_weather_forecasts[day]['weather']
+                reservoir_features = [daily_reservoir_forecasts[day][field] for field in RESERVOIR_FIELDS]
+                features.append(weather_features + reservoir_features)
+                slots.append((c, day))
+            except (IndexError, KeyError, TypeError) as e:
+                print(f"Error predicting day {day+1}: {e}")
+
+    results = [[failed_daily_prediction(day) for day in range(days)] for _ in city_forecasts]
+    if not features:
+        return results
+    try:
+        predictions, flood_probabilities = predict_flood_probabilities(model, features)
+    except Exception as e:
+        print(f"Error predicting {len(features)} city-days: {e}")
+        return results
+
+    # Scatter the batch back to each city's days
+    for (c, day), row, prediction, flood_probability in zip(slots, features, predictions, flood_probabilities):
+        date = city_forecasts[c][0][day]['date']
+        results[c][day] = describe_daily_prediction(day, date, row, prediction, flood_probability)
+    return results
+
+def make_daily_flood_predictions(daily_weather_forecasts, daily_reservoir_forecasts, model):
+    """
+    Make flood predictions for each of the next 7 days with probability scores and risk categories
+    """
+    return make_flood_predictions_for_cities([(daily_weather_forecasts, daily_reservoir_forecasts)], model)[0]
 
 def generate_7day_predictions_for_cities(cities_path, reservoir_data_path, model_path):
     """
@@ -313,25 +410,30 @@ def generate_7day_predictions_for_cities(cities_path, reservoir_data_path, model
     
     all_predictions = []
     
-    for city_name, coords in cities_coords.items():
+    # Get 7-day weather forecasts for every city up front; requests run
+    # concurrently and a failed city only loses its own forecast
+    weather_by_city = fetch_daily_weather_forecasts(cities_coords)
+    
+    forecast_cities, city_forecasts = [], []
+    for city_name in cities_coords:
         print(f"Processing 7-day forecast for {city_name}...")
         
-        # Get 7-day weather forecasts
-        daily_weather_forecasts = get_daily_weather_forecasts(
-            coords['lat'], coords['lon'], city_name
-        )
+        daily_weather_forecasts = weather_by_city[city_name]
         
         if not daily_weather_forecasts:
             print(f"No weather data available for {city_name}")
             continue
         
-        # Get 7-day reservoir forecasts
+        # Get 7-day reservoir forecasts (a view of the all-city forecast, computed once)
         daily_reservoir_forecasts = forecast_reservoir_levels(city_name, reservoir_data_path)
-        
-        # Make daily predictions
-        daily_predictions = make_daily_flood_predictions(
-            daily_weather_forecasts, daily_reservoir_forecasts, model
-        )
+        forecast_cities.append(city_name)
+        city_forecasts.append((daily_weather_forecasts, daily_reservoir_forecasts))
+    
+    # Make daily predictions for every city-day in one model call
+    predictions_by_city = make_flood_predictions_for_cities(city_forecasts, model)
+    
+    for city_name, daily_predictions in zip(forecast_cities, predictions_by_city):
+        coords = cities_coords[city_name]
         
         # Store results for each day
         for day_pred in daily_predictions:
@@ -365,15 +467,15 @@ def generate_7day_predictions_for_cities(cities_path, reservoir_data_path, model
 
 def save_7day_predictions(predictions, output_path):
     """
-    Save 7-day predictions to CSV file with enhanced metrics
+    Save 7-day predictions as Parquet (plus an optional CSV export) with enhanced metrics
     """
     if not predictions:
         print("No predictions to save")
         return
     
     df = pd.DataFrame(predictions)
-    df.to_csv(output_path, index=False)
-    print(f"Saved {len(predictions)} daily predictions to {output_path}")
+    written = write_artifact(df, output_path)
+    print(f"Saved {len(predictions)} daily predictions to {', '.join(written)}")
     
     # Print comprehensive summary
     total_city_days = len(df)
@@ -421,10 +523,18 @@ if __name__ == "__main__":
     cities_path = os.path.join(project_root, 'data', 'cities.csv')
     reservoir_path = os.path.join(project_root, 'data', 'aggregated_reservoir_data.csv')
     model_path = os.path.join(project_root, 'model.pickle')
-    output_path = os.path.join(project_root, 'data', '7day_flood_predictions.csv')
     
     # Generate 7-day predictions
     predictions = generate_7day_predictions_for_cities(cities_path, reservoir_path, model_path)
     
-    # Save results
-    save_7day_predictions(predictions, output_path)
\ No newline at end of file
+    # Save results into a new run directory; enhanced_plotting.py adds the
+    # derived files to the same run and publishes it to the API
+    if predictions:
+        run_dir = new_run_dir(os.path.join(project_root, 'data'))
+        save_7day_predictions(predictions, os.path.join(run_dir, '7day_flood_predictions.csv'))
+        mark_run_staged(run_dir)
+        print(f"\nRun staged in {run_dir}; run enhanced_plotting.py "
+              f"{os.path.basename(run_dir)} to publish it")
+    else:
+        print("No predictions to save")
+    print_stats(default_client().cache)
@@ -2,6 +2,12 @@ import csv
 import pickle
 import pandas as pd
 import os
+import shutil
+import sys
+from artifact_store import (
+    RUNS_DIR, current_run_id, is_run_staged, latest_run_dir, mark_run_staged, new_run_dir, parquet_path,
+    publish_run, read_artifact, write_artifact
+)
 
 def load_model_and_data():
     """
@@ -25,17 +31,18 @@ def load_model_and_data():
     
     return cities
 
-def get_7day_prediction_data():
+def get_7day_prediction_data(predictions_path=None):
     """
     Load 7-day predictions generated by enhanced_forecast.py
     """
-    script_dir = os.path.dirname(__file__)
-    project_root = os.path.dirname(script_dir)
-    predictions_path = os.path.join(project_root, 'data', '7day_flood_predictions.csv')
+    if predictions_path is None:
+        script_dir = os.path.dirname(__file__)
+        project_root = os.path.dirname(script_dir)
+        predictions_path = os.path.join(project_root, 'data', '7day_flood_predictions.csv')
     
     try:
         # Load 7-day predictions
-        predictions_df = pd.read_csv(predictions_path)
+        predictions_df = read_artifact(predictions_path)
         print(f"Loaded {len(predictions_df)} 7-day prediction records")
         print(f"Data covers {predictions_df['City'].nunique()} cities over {predictions_df['Date'].nunique()} days")
         
@@ -66,15 +73,15 @@ def get_7day_prediction_data():
         print(f"Error loading 7-day predictions: {e}")
         return []
 
-def create_plotting_csv(plotting_data):
+def create_plotting_csv(plotting_data, output_dir=None):
     """
-    Create CSV file for map visualization with 7-day data including risk categories
+    Create plotting data (Parquet + CSV export) for map visualization with 7-day data including risk categories
     """
     script_dir = os.path.dirname(__file__)
     project_root = os.path.dirname(script_dir)
     
     # Create data directory if it doesn't exist
-    data_dir = os.path.join(project_root, 'data')
+    data_dir = output_dir or os.path.join(project_root, 'data')
     if not os.path.exists(data_dir):
         os.makedirs(data_dir)
     
@@ -86,13 +93,10 @@ def create_plotting_csv(plotting_data):
         'Risk_Category', 'Confidence', 'explanation'
     ]
     
-    with open(output_path, 'w', newline='', encoding='UTF-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        writer.writerows(plotting_data)
+    written = write_artifact(pd.DataFrame(plotting_data, columns=headers), output_path)
     
     print(f"Created plotting data with {len(plotting_data)} city-day records")
-    print(f"Saved to: {output_path}")
+    print(f"Saved to: {', '.join(written)}")
 
 def generate_risk_summary(plotting_data):
     """
@@ -183,13 +187,13 @@ def generate_risk_summary(plotting_data):
         high_conf = int(stats['High_Confidence_Cities'])
         print(f"{date:<12} | {high_risk:>4}/{total:<6} | {critical:>8}/7 | {avg_prob:>8.3f} | {high_conf:>8}/7")
 
-def create_risk_zones_data(plotting_data):
+def create_risk_zones_data(plotting_data, output_dir=None):
     """
     Create enhanced risk zones with categories and confidence levels
     """
     script_dir = os.path.dirname(__file__)
     project_root = os.path.dirname(script_dir)
-    data_dir = os.path.join(project_root, 'data')
+    data_dir = output_dir or os.path.join(project_root, 'data')
     if not os.path.exists(data_dir):
         os.makedirs(data_dir)
     
@@ -244,20 +248,17 @@ def create_risk_zones_data(plotting_data):
         'Confidence', 'Precipitation_mm', 'Max_Reservoir_Fill_Percent', 'Flood_Probability', 'Binary_Risk', 'Explanation'
     ]
     
-    with open(output_path, 'w', newline='', encoding='UTF-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(headers)
-        writer.writerows(risk_zones)
+    written = write_artifact(pd.DataFrame(risk_zones, columns=headers), output_path)
     
-    print(f"Created enhanced 7-day risk zones data: {output_path}")
+    print(f"Created enhanced 7-day risk zones data: {', '.join(written)}")
 
-def create_daily_summary(plotting_data):
+def create_daily_summary(plotting_data, output_dir=None):
     """
     Create day-wise summary for 7-day forecast with categories and confidence
     """
     script_dir = os.path.dirname(__file__)
     project_root = os.path.dirname(script_dir)
-    data_dir = os.path.join(project_root, 'data')
+    data_dir = output_dir or os.path.join(project_root, 'data')
     if not os.path.exists(data_dir):
         os.makedirs(data_dir)
         
@@ -287,16 +288,16 @@ def create_daily_summary(plotting_data):
         'Critical_Risk_Cities', 'High_Confidence_Cities'
     ]
     
-    daily_stats.to_csv(output_path)
-    print(f"Created enhanced daily summary: {output_path}")
+    written = write_artifact(daily_stats, output_path, index=True)
+    print(f"Created enhanced daily summary: {', '.join(written)}")
 
-def create_city_summary(plotting_data):
+def create_city_summary(plotting_data, output_dir=None):
     """
     Create city-wise summary showing risk trend over 7 days with categories
     """
     script_dir = os.path.dirname(__file__)
     project_root = os.path.dirname(script_dir)
-    data_dir = os.path.join(project_root, 'data')
+    data_dir = output_dir or os.path.join(project_root, 'data')
     if not os.path.exists(data_dir):
         os.makedirs(data_dir)
         
@@ -341,12 +342,13 @@ def create_city_summary(plotting_data):
     # Sort by average flood probability
     city_stats = city_stats.sort_values('Avg_Flood_Probability', ascending=False)
     
-    city_stats.to_csv(output_path)
-    print(f"Created enhanced city-wise summary: {output_path}")
+    written = write_artifact(city_stats, output_path, index=True)
+    print(f"Created enhanced city-wise summary: {', '.join(written)}")
 
-def main():
+def main(run_id=None):
     """
-    Main function to process 7-day flood predictions with enhanced risk categorization
+    Main function to process 7-day flood predictions with enhanced risk categorization.
+    run_id names the staged run to process (default: the newest completely staged one)
     """
     print("Processing enhanced 7-day flood predictions for visualization...")
     
@@ -354,8 +356,31 @@ def main():
     cities = load_model_and_data()
     print(f"Loaded {len(cities)} cities for reference")
     
+    # Continue a run completely staged by enhanced_forecast.py (half-written
+    # runs of a crashed forecast are skipped); without one (older layout) the
+    # files are written straight to data/ as before
+    data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+    if run_id is not None:
+        run_dir = os.path.join(data_dir, RUNS_DIR, run_id)
+        if not is_run_staged(run_dir):
+            print(f"\nERROR: Run {run_id} is missing or was not completely staged by enhanced_forecast.py")
+            return
+    else:
+        run_dir = latest_run_dir(data_dir)
+    if run_dir is not None and os.path.basename(run_dir) == current_run_id(data_dir):
+        # Never rewrite files the API is serving: re-process into a fresh run
+        source_dir, run_dir = run_dir, new_run_dir(data_dir)
+        source_csv = os.path.join(source_dir, '7day_flood_predictions.csv')
+        for path in (source_csv, parquet_path(source_csv)):
+            if os.path.exists(path):
+                shutil.copy2(path, run_dir)
+        mark_run_staged(run_dir)
+    if run_dir is not None:
+        print(f"Processing run {os.path.basename(run_dir)}")
+    
     # Get 7-day prediction data from enhanced_forecast.py
-    plotting_data = get_7day_prediction_data()
+    predictions_path = os.path.join(run_dir, '7day_flood_predictions.csv') if run_dir else None
+    plotting_data = get_7day_prediction_data(predictions_path)
     
     if not plotting_data:
         print("\nERROR: No 7-day prediction data available!")
@@ -367,26 +392,32 @@ def main():
     print("\nCreating enhanced visualization and analysis files...")
     
     # Create plotting CSV for map visualization
-    create_plotting_csv(plotting_data)
+    create_plotting_csv(plotting_data, run_dir)
     
     # Generate comprehensive risk summary with categories
     generate_risk_summary(plotting_data)
     
     # Create enhanced risk zones with alert levels and confidence
-    create_risk_zones_data(plotting_data)
+    create_risk_zones_data(plotting_data, run_dir)
     
     # Create daily and city summaries with new metrics
-    create_daily_summary(plotting_data)
-    create_city_summary(plotting_data)
+    create_daily_summary(plotting_data, run_dir)
+    create_city_summary(plotting_data, run_dir)
+    
+    # Switch the API to the completed run in one step
+    if run_dir is not None:
+        run_id = publish_run(data_dir, run_dir)
+        print(f"\nPublished run {run_id} (data/CURRENT)")
     
     print("\n" + "="*60)
     print("ENHANCED 7-DAY FLOOD PREDICTION PROCESSING COMPLETE!")
     print("="*60)
     print("Files created for visualization and analysis:")
-    print("• final_plot.csv        - Main data with risk categories & confidence")
-    print("• risk_zones.csv        - Enhanced risk zones with alert levels") 
-    print("• daily_summary.csv     - Day-wise forecast with confidence metrics")
-    print("• city_summary.csv      - City-wise analysis with risk categories")
+    print("• final_plot.parquet    - Main data with risk categories & confidence")
+    print("• risk_zones.parquet    - Enhanced risk zones with alert levels") 
+    print("• daily_summary.parquet - Day-wise forecast with confidence metrics")
+    print("• city_summary.parquet  - City-wise analysis with risk categories")
+    print("  (plus .csv exports unless FLOODWATCH_EXPORT_CSV=0)")
     print("\nEnhancements include:")
     print("• Risk categorization: Critical/High/Medium/Low")
     print("• Confidence levels: High (Days 1-3) / Low (Days 4-7)")
@@ -399,4 +430,4 @@ def main():
     print("- Real-time alert system integration")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
\ No newline at end of file
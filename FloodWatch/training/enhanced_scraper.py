@@ -1,10 +1,11 @@
-import requests
 import datetime
 import csv
 import pandas as pd
 import os
 import numpy as np
 from city_reservoir_mapper import get_district_for_city
+from weather_cache import print_stats
+from weather_client import ARCHIVE_URL, DAILY_VARIABLES, default_client
 
 def load_flood_events(flood_events_path):
     """Load real flood events from CSV for accurate labeling."""
@@ -21,31 +22,42 @@ def load_flood_events(flood_events_path):
     return flood_events
 
 
-def get_weather_data(day, month, year, days, lat, lon, city_name):
-    """Fetch historical weather data from Open-Meteo API."""
+def archive_params(day, month, year, days):
+    """Open-Meteo archive query (without coordinates) for the days before a date"""
     a = datetime.date(year, month, day)
     b = a - datetime.timedelta(days)
-
-    BASE_URL = "https://archive-api.open-meteo.com/v1/archive"
-    start_date = b.strftime('%Y-%m-%d')
-    end_date = a.strftime('%Y-%m-%d')
-
-    params = {
-        'latitude': lat,
-        'longitude': lon,
-        'start_date': start_date,
-        'end_date': end_date,
-        'daily': 'temperature_2m_mean,temperature_2m_max,wind_speed_10m_max,cloud_cover_mean,precipitation_sum,relative_humidity_2m_mean',
+    return {
+        'start_date': b.strftime('%Y-%m-%d'),
+        'end_date': a.strftime('%Y-%m-%d'),
+        'daily': DAILY_VARIABLES,
         'timezone': 'auto'
     }
 
-    try:
-        response = requests.get(BASE_URL, params=params, timeout=10)
-        if response.status_code != 200:
-            return [0, 0, 0, 0, 0, 0, 0]
 
-        data = response.json()
-        if 'daily' not in data:
+def get_weather_data(day, month, year, days, lat, lon, city_name):
+    """Fetch historical weather data from Open-Meteo API."""
+    params = archive_params(day, month, year, days)
+    return summarize_weather(default_client().get_point(ARCHIVE_URL, params, lat, lon, city_name))
+
+
+def get_weather_data_many(samples):
+    """get_weather_data for many (day, month, year, days, lat, lon, city_name) samples.
+
+    Samples with the same date window are packed into multi-location
+    requests, which run concurrently.
+    """
+    responses = default_client().fetch_points(
+        ARCHIVE_URL,
+        [(archive_params(day, month, year, days), lat, lon) for day, month, year, days, lat, lon, _ in samples],
+        labels=[f"{city_name} {year}-{month:02d}-{day:02d}" for day, month, year, _, _, _, city_name in samples]
+    )
+    return [summarize_weather(data) for data in responses]
+
+
+def summarize_weather(data):
+    """Window averages/totals from an Open-Meteo daily archive response."""
+    try:
+        if not data or 'daily' not in data:
             return [0, 0, 0, 0, 0, 0, 0]
 
         daily_data = data['daily']
@@ -114,13 +126,29 @@ def create_enhanced_training_data(cities_coords_path, aggregated_reservoir_path,
     real_event_labels = 0
     heuristic_labels = 0
 
+    # Draw every sample first so all their weather can be fetched in one
+    # batched pass (the random draws happen in the same order as before)
+    event_samples = [(city, event_date) for city, event_date in flood_events if city in cities_coords]
+    all_cities = list(cities_coords.keys())
+    samples_per_city = 20 if len(all_cities) > 50 else 30
+    random_samples = []
+    for city in all_cities:
+        for _ in range(samples_per_city):
+            year = np.random.randint(2019, 2025)
+            month = np.random.randint(1, 13)
+            day = np.random.randint(1, 29)
+            random_samples.append((city, datetime.date(year, month, day)))
+
+    print(f"Fetching weather for {len(event_samples) + len(random_samples)} samples...")
+    weather = get_weather_data_many([
+        (d.day, d.month, d.year, 15, cities_coords[city]['lat'], cities_coords[city]['lon'], city)
+        for city, d in event_samples + random_samples
+    ])
+    event_weather, random_weather = weather[:len(event_samples)], weather[len(event_samples):]
+
     # --- 1. Add samples from real flood events ---
-    for city, event_date in flood_events:
-        if city not in cities_coords:
-            continue
-        coords = cities_coords[city]
+    for (city, event_date), weather_data in zip(event_samples, event_weather):
         print(f"Generating training data for {city}...")
-        weather_data = get_weather_data(event_date.day, event_date.month, event_date.year, 15, coords['lat'], coords['lon'], city)
         reservoir_data = get_reservoir_data_for_date(city, event_date, reservoir_df)
 
         if sum(weather_data) == 0 or sum(reservoir_data) == 0:
@@ -131,35 +159,25 @@ def create_enhanced_training_data(cities_coords_path, aggregated_reservoir_path,
         real_event_labels += 1
 
     # --- 2. Add heuristic/random samples for negatives + balance ---
-    all_cities = list(cities_coords.keys())
-    samples_per_city = 20 if len(all_cities) > 50 else 30
-    for city in all_cities:
-        coords = cities_coords[city]
-        for _ in range(samples_per_city):
-            year = np.random.randint(2019, 2025)
-            month = np.random.randint(1, 13)
-            day = np.random.randint(1, 29)
-            target_date = datetime.date(year, month, day)
-
-            weather_data = get_weather_data(day, month, year, 15, coords['lat'], coords['lon'], city)
-            reservoir_data = get_reservoir_data_for_date(city, target_date, reservoir_df)
+    for (city, target_date), weather_data in zip(random_samples, random_weather):
+        reservoir_data = get_reservoir_data_for_date(city, target_date, reservoir_df)
 
-            if sum(weather_data) == 0 or sum(reservoir_data) == 0:
-                continue
+        if sum(weather_data) == 0 or sum(reservoir_data) == 0:
+            continue
 
-            # Label = 1 if near a real event, else 0
-            label = 0
-            for event_city, event_date in flood_events:
-                if event_city == city and abs((target_date - event_date).days) <= 7:
-                    label = 1
-                    break
+        # Label = 1 if near a real event, else 0
+        label = 0
+        for event_city, event_date in flood_events:
+            if event_city == city and abs((target_date - event_date).days) <= 7:
+                label = 1
+                break
 
-            combined_features = weather_data + reservoir_data + [label]
-            training_data.append(combined_features)
-            if label == 1:
-                real_event_labels += 1
-            else:
-                heuristic_labels += 1
+        combined_features = weather_data + reservoir_data + [label]
+        training_data.append(combined_features)
+        if label == 1:
+            real_event_labels += 1
+        else:
+            heuristic_labels += 1
 
     print(f"\nLabeling Stats → Real events: {real_event_labels}, Heuristic: {heuristic_labels}, Total samples: {len(training_data)}")
     return training_data
@@ -185,3 +203,4 @@ if __name__ == "__main__":
         writer.writerows(training_data)
 
     print(f"✅ Created {len(training_data)} samples → saved to {output_path}")
+    print_stats(default_client().cache)
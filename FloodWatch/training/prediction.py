@@ -1,32 +1,35 @@
 import csv
 import datetime
 import pickle
-import requests
 import os
 
+from weather_client import DAILY_VARIABLES, FORECAST_URL, default_client
+
+# Open-Meteo query for a 15-day daily forecast, without the coordinates
+FORECAST_PARAMS = {
+    'daily': DAILY_VARIABLES,
+    'forecast_days': 15,
+    'timezone': 'auto'
+}
+
 def get_data(lat, lon):
     # Open-Meteo API for forecast data
-    BASE_URL = "https://api.open-meteo.com/v1/forecast"
-    
-    params = {
-        'latitude': lat,
-        'longitude': lon,
-        'daily': 'temperature_2m_mean,temperature_2m_max,wind_speed_10m_max,cloud_cover_mean,precipitation_sum,relative_humidity_2m_mean',
-        'forecast_days': 15,
-        'timezone': 'auto'
-    }
-    
+    print(f"Fetching forecast for lat: {lat}, lon: {lon}")
+    return summarize_forecast(default_client().get_point(FORECAST_URL, FORECAST_PARAMS, lat, lon))
+
+def get_data_many(points):
+    """get_data for many (lat, lon) points, packed into multi-location requests"""
+    print(f"Fetching forecasts for {len(points)} locations")
+    responses = default_client().fetch_points(
+        FORECAST_URL, [(FORECAST_PARAMS, lat, lon) for lat, lon in points]
+    )
+    return [summarize_forecast(data) for data in responses]
+
+def summarize_forecast(data):
     try:
-        print(f"Fetching forecast for lat: {lat}, lon: {lon}")
-        response = requests.get(BASE_URL, params=params, timeout=10)
-        
-        if response.status_code != 200:
-            print(f"API Error: Status {response.status_code}")
-            print(f"Response: {response.text}")
+        if data is None:
             return [0, 0, 0, 0, 0, 0]
-        
-        data = response.json()
-        
+
         if 'daily' not in data:
             print(f"No daily data in response: {data}")
             return [0, 0, 0, 0, 0, 0]
@@ -58,12 +61,6 @@ def get_data(lat, lon):
         print(f"Success: {final}")
         return final
         
-    except requests.exceptions.Timeout:
-        print("Request timeout")
-        return [0, 0, 0, 0, 0, 0]
-    except requests.exceptions.RequestException as e:
-        print(f"Request error: {e}")
-        return [0, 0, 0, 0, 0, 0]
     except Exception as e:
         print(f"Error fetching forecast data: {e}")
         return [0, 0, 0, 0, 0, 0]
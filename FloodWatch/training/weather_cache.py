@@ -0,0 +1,218 @@
+"""
+Persistent on-disk cache of Open-Meteo responses, shared by every process.
+
+Entries live in one SQLite file in WAL mode, so concurrent pipeline runs,
+scraper workers and API processes can read while one of them writes; writes
+take the database lock for a single short transaction and wait (up to
+BUSY_TIMEOUT seconds) for each other instead of failing.
+
+A response is stored per location under a key made of the endpoint, the
+coordinates rounded to COORD_DECIMALS (about 1 km, finer than the weather
+grid) and every other query parameter (variables, forecast days or date
+range, timezone). How long it stays fresh depends on the data:
+  - forecasts: FORECAST_TTL seconds (1 hour), so re-runs within the hour
+    never re-download
+  - archive ranges ending ARCHIVE_FINAL_DAYS or more before today: never
+    expire, as Open-Meteo no longer revises them
+  - archive ranges closer to today: RECENT_ARCHIVE_TTL seconds
+Once the file holds more than MAX_BYTES of responses, the least recently
+used entries are evicted. hits/misses count lookups in this process;
+stats() adds the size of the whole cache, and the pipeline scripts print
+it at the end of each run.
+"""
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# Cache file; set FLOODWATCH_WEATHER_CACHE to '' or 0 to disable caching
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'data', 'weather_cache.sqlite3')
+CACHE_PATH = os.environ.get('FLOODWATCH_WEATHER_CACHE', DEFAULT_PATH)
+MAX_BYTES = int(float(os.environ.get('FLOODWATCH_WEATHER_CACHE_MB', '256')) * 1024 * 1024)
+FORECAST_TTL = float(os.environ.get('FLOODWATCH_FORECAST_CACHE_TTL', '3600'))
+RECENT_ARCHIVE_TTL = float(os.environ.get('FLOODWATCH_ARCHIVE_CACHE_TTL', '86400'))
+# Archive days older than this are final
+ARCHIVE_FINAL_DAYS = 7
+COORD_DECIMALS = 2
+BUSY_TIMEOUT = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def cache_key(url, params, lat, lon):
+    """Key of one location's response: endpoint, rounded coordinates, other params"""
+    query = sorted((name, str(value)) for name, value in params.items()
+                   if name not in ('latitude', 'longitude'))
+    raw = json.dumps([url, round(float(lat), COORD_DECIMALS), round(float(lon), COORD_DECIMALS), query])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def expiry(params, now=None):
+    """Expiry time for a response to params, or None if it never expires"""
+    now = time.time() if now is None else now
+    end_date = params.get('end_date')
+    if end_date is None:
+        return now + FORECAST_TTL
+    try:
+        end = datetime.date.fromisoformat(str(end_date))
+    except ValueError:
+        return now + FORECAST_TTL
+    if (datetime.date.today() - end).days >= ARCHIVE_FINAL_DAYS:
+        return None
+    return now + RECENT_ARCHIVE_TTL
+
+
+class WeatherCache:
+    """SQLite-backed response cache, safe to share between threads and processes"""
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # A connection must not cross a fork
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get_many(self, keys):
+        """{key: JSON} for the keys with a fresh entry"""
+        if not keys:
+            return {}
+        now = time.time()
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            unique = list(dict.fromkeys(keys))
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT key, body FROM responses WHERE key IN ({','.join('?' * len(chunk))}) "
+                    "AND (expires IS NULL OR expires > ?)", chunk + [now]
+                ).fetchall()
+                for key, body in rows:
+                    found[key] = json.loads(zlib.decompress(body))
+            if found:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany('UPDATE responses SET accessed = ? WHERE key = ?',
+                                 [(now, key) for key in found])
+                conn.execute('COMMIT')
+            self.hits += sum(1 for key in keys if key in found)
+            self.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, entries):
+        """Store (key, JSON, expires) entries, then evict down to max_bytes"""
+        if not entries:
+            return
+        now = time.time()
+        rows = []
+        for key, data, expires in entries:
+            body = zlib.compress(json.dumps(data, separators=(',', ':')).encode(), 6)
+            rows.append((key, body, len(body), expires, now))
+        with self._lock:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)', rows)
+                conn.execute('DELETE FROM responses WHERE expires IS NOT NULL AND expires <= ?', (now,))
+                self._evict(conn)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict to 90% of the bound so the next writes do not evict again
+        excess = total - int(self.max_bytes * 0.9)
+        freed, victims = 0, []
+        for key, size in conn.execute('SELECT key, size FROM responses ORDER BY accessed'):
+            if freed >= excess:
+                break
+            victims.append((key,))
+            freed += size
+        conn.executemany('DELETE FROM responses WHERE key = ?', victims)
+        self.evictions += len(victims)
+
+    def stats(self):
+        """Hit/miss counters of this process plus entries and bytes on disk"""
+        with self._lock:
+            entries, size = self._connection().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses').fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': size
+        }
+
+    def clear(self):
+        with self._lock:
+            self._connection().execute('DELETE FROM responses')
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+
+def print_stats(cache):
+    """One-line summary of cache.stats() for the end of a pipeline run"""
+    if cache is None:
+        print("Weather cache: disabled")
+        return
+    stats = cache.stats()
+    hit_rate = f"{stats['hit_rate']:.0%}" if stats['hit_rate'] is not None else 'n/a'
+    print(f"Weather cache: {stats['hits']} hits, {stats['misses']} misses (hit rate {hit_rate}), "
+          f"{stats['evictions']} evicted; {stats['entries']} entries, "
+          f"{stats['bytes'] / 1024 / 1024:.1f} MB on disk")
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    """Process-wide WeatherCache at CACHE_PATH, or None when caching is disabled"""
+    global _default_cache
+    if CACHE_PATH in ('', '0'):
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = WeatherCache()
+        return _default_cache
@@ -0,0 +1,265 @@
+"""
+Shared Open-Meteo HTTP client for the forecast and training scripts.
+
+One WeatherClient holds a keep-alive requests.Session whose connection
+pool matches the concurrency limit, so a run pays for TCP/TLS setup once
+per connection instead of once per city. fetch_many() issues many
+requests from a bounded thread pool. Every request also passes a global
+semaphore (MAX_CONCURRENCY in flight) and a sliding-window rate limiter
+(RATE_LIMIT_CALLS per RATE_LIMIT_WINDOW seconds, Open-Meteo's free-tier
+limit by default). A request that fails, times out or returns bad JSON
+only loses its own result after RETRIES attempts; the other requests
+carry on.
+
+fetch_points() packs many coordinates into one multi-location request
+(Open-Meteo takes comma-separated latitude/longitude lists and answers
+with one result per location, in order), up to MAX_BATCH_LOCATIONS and
+MAX_URL_LENGTH. It splits the answer back per point and retries the
+points of a failed batch one by one. A batch counts as one rate-limit
+call per location, as Open-Meteo counts it.
+
+Points are first looked up in the on-disk WeatherCache (weather_cache.py),
+so only locations without a fresh cached response are requested.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from weather_cache import cache_key, default_cache, expiry
+
+# Endpoints can be pointed at a self-hosted Open-Meteo (or a local stub)
+FORECAST_URL = os.environ.get('OPEN_METEO_FORECAST_URL', 'https://api.open-meteo.com/v1/forecast')
+ARCHIVE_URL = os.environ.get('OPEN_METEO_ARCHIVE_URL', 'https://archive-api.open-meteo.com/v1/archive')
+
+DAILY_VARIABLES = ('temperature_2m_mean,temperature_2m_max,wind_speed_10m_max,cloud_cover_mean,'
+                   'precipitation_sum,relative_humidity_2m_mean')
+
+# Requests in flight at once, across all threads using the client
+MAX_CONCURRENCY = int(os.environ.get('FLOODWATCH_WEATHER_CONCURRENCY', '32'))
+# At most RATE_LIMIT_CALLS requests in any RATE_LIMIT_WINDOW seconds (0 disables)
+RATE_LIMIT_CALLS = int(os.environ.get('FLOODWATCH_WEATHER_RATE_CALLS', '600'))
+RATE_LIMIT_WINDOW = float(os.environ.get('FLOODWATCH_WEATHER_RATE_WINDOW', '60'))
+# (connect, read) timeouts in seconds, and attempts after the first for 429/5xx/network errors
+TIMEOUT = (5, 10)
+RETRIES = int(os.environ.get('FLOODWATCH_WEATHER_RETRIES', '2'))
+RETRY_BACKOFF = 0.5
+# Locations packed into one multi-location request, and the longest URL sent
+MAX_BATCH_LOCATIONS = int(os.environ.get('FLOODWATCH_WEATHER_BATCH_SIZE', '100'))
+MAX_URL_LENGTH = 8000
+
+
+class RateLimiter:
+    """Blocks callers so at most max_calls start in any window seconds"""
+
+    def __init__(self, max_calls, window):
+        self.max_calls = max_calls
+        self.window = window
+        self._calls = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, weight=1):
+        """Wait until weight more calls fit in the window, then record them"""
+        if self.max_calls <= 0:
+            return
+        weight = min(weight, self.max_calls)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._calls and now - self._calls[0] >= self.window:
+                    self._calls.popleft()
+                if len(self._calls) + weight <= self.max_calls:
+                    self._calls.extend([now] * weight)
+                    return
+                wait = self.window - (now - self._calls[len(self._calls) + weight - self.max_calls - 1])
+            time.sleep(wait)
+
+
+class WeatherClient:
+    """Pooled, rate-limited Open-Meteo client, safe to share between threads"""
+
+    def __init__(self, max_concurrency=None, rate_limit_calls=None, rate_limit_window=None, cache=None):
+        self.max_concurrency = max_concurrency or MAX_CONCURRENCY
+        # cache=None uses the shared on-disk cache, cache=False disables it
+        self.cache = default_cache() if cache is None else (cache or None)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        # One pool for every fetch_many call, sized like the connection pool
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='weather-fetch')
+        self._limiter = RateLimiter(
+            RATE_LIMIT_CALLS if rate_limit_calls is None else rate_limit_calls,
+            RATE_LIMIT_WINDOW if rate_limit_window is None else rate_limit_window
+        )
+
+    def get_json(self, url, params, label=None, weight=1, retries=None):
+        """Decoded JSON body of a GET, or None after retries (default RETRIES) failed attempts.
+
+        weight is the number of rate-limit calls the request counts as.
+        """
+        label = label or url
+        for attempt in range((RETRIES if retries is None else retries) + 1):
+            if attempt:
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+            self._limiter.acquire(weight)
+            try:
+                with self._slots:
+                    response = self.session.get(url, params=params, timeout=TIMEOUT)
+                if response.status_code == 200:
+                    return response.json()
+                print(f"Weather API error for {label}: {response.status_code}")
+                if response.status_code != 429 and response.status_code < 500:
+                    return None
+            except (requests.exceptions.RequestException, ValueError) as e:
+                print(f"Error fetching weather for {label}: {e}")
+        return None
+
+    def fetch_many(self, jobs, weights=None, labels=None, retries=None):
+        """Run get_json for many requests concurrently.
+
+        jobs maps a key to (url, params); weights, labels and retries
+        optionally map a key to its rate-limit weight, its name in log
+        messages and its number of retries.
+        Returns {key: JSON or None} with keys in the order given.
+        """
+        if not jobs:
+            return {}
+        weights = weights or {}
+        labels = labels or {}
+        retries = retries or {}
+        futures = {
+            key: self._pool.submit(self.get_json, url, params, labels.get(key, str(key)), weights.get(key, 1), retries.get(key))
+            for key, (url, params) in jobs.items()
+        }
+        return {key: future.result() for key, future in futures.items()}
+
+    def get_point(self, url, params, lat, lon, label=None):
+        """JSON result for one point (cached), or None if it could not be fetched"""
+        return self.fetch_points(url, [(params, lat, lon)], [label or f"{lat},{lon}"])[0]
+
+    def fetch_points(self, url, queries, labels=None):
+        """JSON result per point, packing points into multi-location requests.
+
+        queries is a list of (params, lat, lon); points whose params are
+        equal share requests. labels optionally names each point in log
+        messages. Returns a list aligned with queries, None where a point
+        could not be fetched.
+        """
+        labels = labels or [f"{lat},{lon}" for _, lat, lon in queries]
+        if self.cache is None:
+            return self._fetch_points(url, queries, labels)
+
+        keys = [cache_key(url, params, lat, lon) for params, lat, lon in queries]
+        cached = self.cache.get_many(keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if len(queries) > 1 and cached:
+            print(f"Weather cache: {len(queries) - len(missing)} of {len(queries)} locations cached")
+        fetched = self._fetch_points(url, [queries[i] for i in missing], [labels[i] for i in missing])
+        self.cache.put_many([(keys[i], data, expiry(queries[i][0]))
+                             for i, data in zip(missing, fetched) if data is not None])
+
+        results = [cached.get(key) for key in keys]
+        for i, data in zip(missing, fetched):
+            results[i] = data
+        return results
+
+    def _fetch_points(self, url, queries, labels):
+        if not queries:
+            return []
+        groups = {}
+        for i, (params, _, _) in enumerate(queries):
+            groups.setdefault(tuple(sorted(params.items())), []).append(i)
+
+        batches = [batch for members in groups.values()
+                   for batch in pack_batches(url, queries[members[0]][0], queries, members)]
+        # A multi-location batch is not retried as a whole: its points are
+        # retried one by one instead, so one bad location cannot sink it
+        responses = self.fetch_many(
+            {b: (url, batch_params(queries, batch)) for b, batch in enumerate(batches)},
+            weights={b: len(batch) for b, batch in enumerate(batches)},
+            labels={b: labels[batch[0]] if len(batch) == 1 else f"batch of {len(batch)} locations"
+                    for b, batch in enumerate(batches)},
+            retries={b: 0 for b, batch in enumerate(batches) if len(batch) > 1}
+        )
+
+        results = [None] * len(queries)
+        retry = []
+        for b, batch in enumerate(batches):
+            parts = split_batch_response(responses[b], len(batch))
+            if parts is None and len(batch) > 1:
+                retry.extend(batch)
+                continue
+            for i, part in zip(batch, parts or [None]):
+                results[i] = part
+
+        if retry:
+            print(f"Retrying {len(retry)} locations of failed batches one by one")
+            singles = self.fetch_many({i: (url, batch_params(queries, [i])) for i in retry},
+                                      labels={i: labels[i] for i in retry})
+            for i, data in singles.items():
+                parts = split_batch_response(data, 1)
+                results[i] = parts[0] if parts else None
+        return results
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        self.session.close()
+
+
+def _coordinate_list(values):
+    return ','.join(str(float(value)) for value in values)
+
+
+def batch_params(queries, batch):
+    """Query parameters of a multi-location request for the given query indexes"""
+    params = dict(queries[batch[0]][0])
+    params['latitude'] = _coordinate_list(queries[i][1] for i in batch)
+    params['longitude'] = _coordinate_list(queries[i][2] for i in batch)
+    return params
+
+
+def pack_batches(url, params, queries, members):
+    """Split query indexes into batches within MAX_BATCH_LOCATIONS and MAX_URL_LENGTH"""
+    # Commas are sent percent-encoded (3 characters each)
+    base = len(url) + 1 + len(urlencode(params)) + len('&latitude=&longitude=')
+    batches, batch, length = [], [], base
+    for i in members:
+        extra = len(str(float(queries[i][1]))) + len(str(float(queries[i][2]))) + (6 if batch else 0)
+        if batch and (len(batch) >= MAX_BATCH_LOCATIONS or length + extra > MAX_URL_LENGTH):
+            batches.append(batch)
+            batch, length = [], base
+            extra -= 6
+        batch.append(i)
+        length += extra
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def split_batch_response(data, size):
+    """Per-location results of a multi-location response, or None if it does not match"""
+    if size == 1 and isinstance(data, dict):
+        return [data]
+    if isinstance(data, list) and len(data) == size and all(isinstance(part, dict) for part in data):
+        return data
+    return None
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def default_client():
+    """Process-wide WeatherClient, so every caller shares one pool and one rate limit"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = WeatherClient()
+        return _default_client
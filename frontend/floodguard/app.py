@@ -14,6 +14,13 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# The pipeline's pooled, disk-cached Open-Meteo client, when FloodWatch/training
+# is on PYTHONPATH; otherwise forecasts are fetched with plain requests
+try:
+    from weather_client import default_client as weather_client
+except ImportError:
+    weather_client = None
+
 # Get the directory where this script is located
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -70,21 +77,24 @@ def get_current_weather_forecast(lat, lon, city_name):
     BASE_URL = "https://api.open-meteo.com/v1/forecast"
     
     params = {
-        'latitude': lat,
-        'longitude': lon,
         'daily': 'temperature_2m_mean,temperature_2m_max,wind_speed_10m_max,cloud_cover_mean,precipitation_sum,relative_humidity_2m_mean',
         'forecast_days': 15,
         'timezone': 'auto'
     }
     
     try:
-        response = requests.get(BASE_URL, params=params, timeout=10)
-        
-        if response.status_code != 200:
-            print(f"Forecast API Error: {response.status_code}")
-            return [0, 0, 0, 0, 0, 0, 0]
-        
-        data = response.json()
+        if weather_client is not None:
+            data = weather_client().get_point(BASE_URL, params, lat, lon, city_name)
+            if data is None:
+                return [0, 0, 0, 0, 0, 0, 0]
+        else:
+            response = requests.get(BASE_URL, params={'latitude': lat, 'longitude': lon, **params}, timeout=10)
+            
+            if response.status_code != 200:
+                print(f"Forecast API Error: {response.status_code}")
+                return [0, 0, 0, 0, 0, 0, 0]
+            
+            data = response.json()
         if 'daily' not in data:
             return [0, 0, 0, 0, 0, 0, 0]
         
@@ -63,6 +63,24 @@ export const api = {
   // Get available dates and summaries (Flask: /api/data/dates)
   getAvailableDates: () => apiCall<any>("/api/data/dates"),
 
+  // Nearest monitored cities to a point, optionally within radiusKm (Flask: /api/data/nearby)
+  getNearbyCities: (lat: number, lon: number, limit?: number, radiusKm?: number) => {
+    const params = new URLSearchParams({ lat: String(lat), lon: String(lon) });
+    if (limit !== undefined) params.set("limit", String(limit));
+    if (radiusKm !== undefined) params.set("radius_km", String(radiusKm));
+    return apiCall<any>(`/api/data/nearby?${params}`);
+  },
+
+  // City clusters for a map zoom and optional [west, south, east, north] viewport (Flask: /api/data/clusters)
+  getClusters: (zoom: number, bbox?: [number, number, number, number], date?: string) => {
+    const params = new URLSearchParams({ zoom: String(zoom) });
+    if (bbox) params.set("bbox", bbox.join(","));
+    if (date) params.set("date", date);
+    return apiCall<any>(`/api/data/clusters?${params}`);
+  },
+  getClusterChildren: (id: number, date?: string) =>
+    apiCall<any>(`/api/data/clusters/${id}/children${date ? `?date=${encodeURIComponent(date)}` : ""}`),
+
   // Forecast endpoints (available if needed by UI)
   get7DayForecast: () => apiCall<any>("/api/forecast/7day"),
   getDailySummary: () => apiCall<any>("/api/forecast/daily-summary"),
@@ -71,6 +89,13 @@ export const api = {
   getCityForecast: (city: string) => apiCall<any>(`/api/forecast/city/${encodeURIComponent(city)}`),
   // Date forecast: /api/forecast/date/<date>
   getDateForecast: (date: string) => apiCall<any>(`/api/forecast/date/${encodeURIComponent(date)}`),
+  // Several city/date forecasts, coordinates and summaries in one request: /api/batch
+  // e.g. batch([{ type: "city_forecast", city: "Pune" }, { type: "date_forecast", date: "2025-08-21" }])
+  batch: (queries: Array<Record<string, any>>, fields?: string[]) =>
+    apiCall<any>("/api/batch", {
+      method: "POST",
+      body: JSON.stringify(fields ? { queries, fields } : { queries }),
+    }),
 
   // Analysis endpoints (available if needed by UI)
   getAnalysisOverview: () => apiCall<any>("/api/analysis/overview"),
@@ -80,6 +105,13 @@ export const api = {
   healthCheck: () => apiCall<any>("/api/health"),
 };
 
+// Vector tile URL template for risk-zone points (Flask: /api/tiles/<z>/<x>/<y>.mvt),
+// for MVT-capable map layers such as Leaflet.VectorGrid
+export function riskZoneTileUrl(date?: string): string {
+  const url = `${API_BASE_URL}/api/tiles/{z}/{x}/{y}.mvt`;
+  return date ? `${url}?date=${encodeURIComponent(date)}` : url;
+}
+
 // Error handling utilities
 export function handleApiError(error: any): string {
   if (typeof error === "string") {